@@ -5,15 +5,14 @@
 # SPDX-License-Identifier: MIT
 """Add installation cells on top of the notebook."""
 
-import copy
-import sys
+import argparse
 
 import nbformat
 
-from open_in_cloud_workflow.get_fem_on_cloud_installation_cell_code import get_fem_on_cloud_installation_cell_code
-from open_in_cloud_workflow.get_pip_installation_cell_code import get_pip_installation_cell_code
-from open_in_cloud_workflow.glob_files import glob_files
-from open_in_cloud_workflow.packages_str_to_lists import packages_str_to_lists
+from open_in_cloud_workflow.get_imported_modules import get_imported_modules
+from open_in_cloud_workflow.installation_plan import InstallationPlan
+from open_in_cloud_workflow.process_notebooks import (
+    add_process_notebooks_arguments, NotebookStageBaseClass, process_notebooks)
 
 
 def add_installation_cells(
@@ -21,56 +20,25 @@ def add_installation_cells(
     pip_packages_str: str
 ) -> tuple[list[nbformat.NotebookNode], list[int]]:
     """Add installation cells on top of the notebook, and return updated notebook content and list of insertions."""
-    (fem_on_cloud_packages_name, fem_on_cloud_packages_version, fem_on_cloud_packages_url,
-        fem_on_cloud_packages_import, fem_on_cloud_packages_dependent_imports,
-        fem_on_cloud_packages_install_command_line_options, fem_on_cloud_packages_extra_commands_before_install) = (
-            packages_str_to_lists(fem_on_cloud_packages_str))
-    (pip_packages_name, pip_packages_version, pip_packages_url,
-        pip_packages_import, pip_packages_dependent_imports, pip_packages_install_command_line_options,
-        pip_packages_extra_commands_before_install) = (
-            packages_str_to_lists(pip_packages_str))
-
-    packages_name = fem_on_cloud_packages_name + pip_packages_name
-    packages_install_code = [
-        get_fem_on_cloud_installation_cell_code(
-            cloud_provider, package_name, package_version, package_url, package_import,
-            package_install_command_line_options, package_extra_commands_before_install
-        ) for (
-            package_name, package_version, package_url, package_import, package_install_command_line_options,
-            package_extra_commands_before_install
-        ) in zip(
-            fem_on_cloud_packages_name, fem_on_cloud_packages_version, fem_on_cloud_packages_url,
-            fem_on_cloud_packages_import, fem_on_cloud_packages_install_command_line_options,
-            fem_on_cloud_packages_extra_commands_before_install
-        )
-    ] + [
-        get_pip_installation_cell_code(
-            package_name, package_version, package_url, package_import, package_install_command_line_options,
-            package_extra_commands_before_install
-        ) for (
-            package_name, package_version, package_url, package_import, package_install_command_line_options,
-            package_extra_commands_before_install
-        ) in zip(
-            pip_packages_name, pip_packages_version, pip_packages_url, pip_packages_import,
-            pip_packages_install_command_line_options, pip_packages_extra_commands_before_install
-        )
-    ]
-    packages_import = fem_on_cloud_packages_import + pip_packages_import
-    packages_dependent_imports = fem_on_cloud_packages_dependent_imports + pip_packages_dependent_imports
-
-    need_installation_cell = {package_import: False for package_import in packages_import}
-    for package_import, package_dependent_imports in zip(packages_import, packages_dependent_imports):
-        for cell in nb_cells:
-            if cell.cell_type == "code":
-                if _package_is_imported(package_import, cell):
-                    need_installation_cell[package_import] = True
-                    break
-                elif package_dependent_imports != "" and any([
-                    _package_is_imported(package_dependent_import, cell)
-                    for package_dependent_import in package_dependent_imports.split(" ")
-                ]):
-                    need_installation_cell[package_import] = True
-                    break
+    return add_installation_cells_from_plan(
+        nb_cells, InstallationPlan(cloud_provider, fem_on_cloud_packages_str, pip_packages_str))
+
+
+def add_installation_cells_from_plan(
+    nb_cells: list[nbformat.NotebookNode], installation_plan: InstallationPlan
+) -> tuple[list[nbformat.NotebookNode], list[int]]:
+    """Add installation cells prepared by an installation plan on top of the notebook."""
+    imported_modules = set().union(*[
+        get_imported_modules(cell.source) for cell in nb_cells if cell.cell_type == "code"])
+    # An empty import name requires the installation cell in any notebook which imports at least one module
+    need_installation_cell = {
+        package.import_name: (
+            package.import_name in imported_modules or (package.import_name == "" and len(imported_modules) > 0)
+            or any([
+                package_dependent_import in imported_modules
+                for package_dependent_import in package.dependent_imports]))
+        for package in installation_plan.packages
+    }
 
     first_code_cell_position = 0
     for cell in nb_cells:
@@ -79,36 +47,71 @@ def add_installation_cells(
         else:
             first_code_cell_position += 1
 
-    updated_nb_cells = copy.deepcopy(nb_cells)
+    # Cells are never modified, hence they are shared with the original notebook
+    updated_nb_cells = list(nb_cells)
     new_cells_position = list()
-    for (package_name, package_install_code, package_import) in zip(
-            packages_name, packages_install_code, packages_import):
-        if need_installation_cell[package_import]:
+    for (package, package_install_code) in zip(installation_plan.packages, installation_plan.packages_install_code):
+        if need_installation_cell[package.import_name]:
             package_install_cell = nbformat.v4.new_code_cell(package_install_code)  # type: ignore[no-untyped-call]
-            package_install_cell.id = package_name.replace(" ", "_") + "_install"
+            package_install_cell.id = package.name.replace(" ", "_") + "_install"
             updated_nb_cells.insert(first_code_cell_position, package_install_cell)
             new_cells_position.append(first_code_cell_position)
             first_code_cell_position += 1
     return updated_nb_cells, new_cells_position
 
 
-def _package_is_imported(package_import: str, cell: nbformat.NotebookNode) -> bool:
-    """Auxiliary function to determine if the cell contains the import of the package."""
-    return f"import {package_import}" in cell.source or f"from {package_import}" in cell.source
+class AddInstallationCellsStage(NotebookStageBaseClass):
+    """Stage which adds installation cells on top of the notebook."""
+
+    def __init__(self, cloud_provider: str, fem_on_cloud_packages: str, pip_packages: str) -> None:
+        self.cloud_provider = cloud_provider
+        self.fem_on_cloud_packages = fem_on_cloud_packages
+        self.pip_packages = pip_packages
+        self.installation_plan = InstallationPlan(cloud_provider, fem_on_cloud_packages, pip_packages)
+
+    def update_cells(
+        self, nb_cells: list[nbformat.NotebookNode], nb_filename: str
+    ) -> tuple[list[nbformat.NotebookNode], int]:
+        """Add installation cells on top of the notebook, which requires no substitution."""
+        updated_nb_cells, _ = add_installation_cells_from_plan(nb_cells, self.installation_plan)
+        return updated_nb_cells, 0
+
+    def get_dependencies(self, nb_filename: str, nb_content: str) -> dict[str, str]:
+        """Return the installation cell code of every package, which may change with the current commit of remotes."""
+        return {
+            package.name: package_install_code for (package, package_install_code) in zip(
+                self.installation_plan.packages, self.installation_plan.packages_install_code)
+        }
+
+    def get_name(self) -> str:
+        """Return the name of the stage, which identifies its entries in the manifest."""
+        return "add_installation_cells"
+
+    def __str__(self) -> str:
+        """Print private attributes as attribute_name=attribute_value, one attribute per line."""
+        return f"""stage={self.get_name()}
+cloud_provider={self.cloud_provider}
+fem_on_cloud_packages={self.fem_on_cloud_packages!r}
+pip_packages={self.pip_packages!r}"""
 
 
 def __main__(  # noqa: N807
-    work_dir: str, nb_pattern: str, cloud_provider: str, fem_on_cloud_packages: str, pip_packages: str
+    work_dir: str, nb_pattern: str, cloud_provider: str, fem_on_cloud_packages: str, pip_packages: str,
+    jobs: int | str = 1, manifest_directory: str | None = None, fast_io: bool = False,
+    validate_notebooks: bool = False
 ) -> None:
     """Add installation cells on top of every notebook in the work directory matching the prescribed pattern."""
-    for nb_filename in glob_files(work_dir, nb_pattern):
-        with open(nb_filename) as f:
-            nb = nbformat.read(f, as_version=4)  # type: ignore[no-untyped-call]
-        nb.cells, _ = add_installation_cells(nb.cells, cloud_provider, fem_on_cloud_packages, pip_packages)
-        with open(nb_filename, "w") as f:
-            nbformat.write(nb, f)  # type: ignore[no-untyped-call]
+    process_notebooks(
+        work_dir, nb_pattern, AddInstallationCellsStage(cloud_provider, fem_on_cloud_packages, pip_packages), jobs,
+        manifest_directory, fast_io, validate_notebooks)
 
 
 if __name__ == "__main__":  # pragma: no cover
-    assert len(sys.argv) == 6
-    __main__(*sys.argv[1:])
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("work_dir")
+    parser.add_argument("nb_pattern")
+    parser.add_argument("cloud_provider")
+    parser.add_argument("fem_on_cloud_packages")
+    parser.add_argument("pip_packages")
+    add_process_notebooks_arguments(parser)
+    __main__(**vars(parser.parse_args()))
@@ -0,0 +1,99 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Store on disk the PNG images converted by a previous run, together with their base64 representation."""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from open_in_cloud_workflow.image_to_base64 import image_to_base64_chunks
+
+CONVERSION_CACHE_SIZE = 512 * 1024 * 1024
+
+
+class ConversionCache:
+    """
+    Content-addressed cache of converted images.
+
+    Converted images are indexed by the hash of the content of the original image and of the conversion commands,
+    so that they are converted again when the original image changes. The cache directory contains an index.json
+    file, which associates to every key the size of the stored files and the time at which they were last used,
+    and an objects subdirectory, which contains the PNG image and its base64 representation. Least recently used
+    entries are evicted when the cache is saved, so that its size does not exceed the prescribed size (in bytes).
+    """
+
+    def __init__(self, cache_directory: str, max_size: int) -> None:
+        self.cache_directory = cache_directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.keys: dict[str, str] = dict()
+        self.entries: dict[str, dict[str, float]] = dict()
+        os.makedirs(os.path.join(cache_directory, "objects"), exist_ok=True)
+        index_file = os.path.join(cache_directory, "index.json")
+        if os.path.isfile(index_file):
+            with open(index_file) as f:
+                self.entries = json.load(f)
+
+    def key(self, image_file: str, image_convert: list[str]) -> str:
+        """Return the key associated to the content of an image and to its conversion commands."""
+        content_hash = hashlib.sha256()
+        with open(image_file, "rb") as f:
+            content_hash.update(f.read())
+        content_hash.update("\n".join(image_convert).encode("utf-8"))
+        self.keys[image_file] = content_hash.hexdigest()
+        return self.keys[image_file]
+
+    def restore(self, key: str, image_file_png: str) -> bool:
+        """Copy the stored PNG image to the provided path, and return whether it was available."""
+        object_file = self._object_file(key, ".png")
+        if key in self.entries and os.path.isfile(object_file):
+            shutil.copyfile(object_file, image_file_png)
+            self.entries[key]["last_used"] = time.time()
+            self.hits += 1
+            self.bytes_saved += os.path.getsize(object_file)
+            return True
+        else:
+            self.misses += 1
+            return False
+
+    def restore_base64(self, image_file: str) -> str | None:
+        """Return the stored base64 representation of an image converted by this run, or None if not available."""
+        if image_file in self.keys and os.path.isfile(self._object_file(self.keys[image_file], ".base64")):
+            with open(self._object_file(self.keys[image_file], ".base64")) as f:
+                return f.read()
+        else:
+            return None
+
+    def store(self, key: str, image_file_png: str) -> None:
+        """Store a converted PNG image and its base64 representation."""
+        shutil.copyfile(image_file_png, self._object_file(key, ".png"))
+        with open(self._object_file(key, ".base64"), "w") as f:
+            f.writelines(image_to_base64_chunks(image_file_png))
+        self.entries[key] = {
+            "size": sum(os.path.getsize(self._object_file(key, extension)) for extension in (".png", ".base64")),
+            "last_used": time.time()
+        }
+
+    def save(self) -> None:
+        """Save the index to disk, evicting least recently used entries which exceed the cache size."""
+        total_size = sum(entry["size"] for entry in self.entries.values())
+        for key in sorted(self.entries, key=lambda key: self.entries[key]["last_used"]):
+            if total_size <= self.max_size:
+                break
+            total_size -= self.entries.pop(key)["size"]
+            for extension in (".png", ".base64"):
+                if os.path.isfile(self._object_file(key, extension)):
+                    os.remove(self._object_file(key, extension))
+        with open(os.path.join(self.cache_directory, "index.json"), "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+    def _object_file(self, key: str, extension: str) -> str:
+        """Return the path of the file storing a converted image or its base64 representation."""
+        return os.path.join(self.cache_directory, "objects", key + extension)
@@ -0,0 +1,81 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Convert images to PNG."""
+
+import collections.abc
+import concurrent.futures
+import os
+
+from open_in_cloud_workflow.conversion_cache import ConversionCache
+from open_in_cloud_workflow.image_converters import get_image_converter, ImageConverterBaseClass
+
+
+def convert_images(
+    image_files: list[str], jobs: int | str = 1, timeout: float | None = None,
+    conversion_cache: ConversionCache | None = None, image_converters: list[ImageConverterBaseClass] | None = None,
+    png_files: collections.abc.Container[str] | None = None
+) -> dict[str, str]:
+    """
+    Convert images to PNG, and return the path of the PNG image associated to every image.
+
+    Conversion is skipped when a PNG image with the same name already exists, according to the png_files container
+    if provided, or to the file system otherwise. Conversions run over a pool of jobs
+    threads, or over as many threads as available CPUs if jobs is auto, and each conversion command is stopped
+    after timeout seconds. Errors are collected and reported per image once every image has been converted.
+
+    If a conversion cache is provided, the PNG image is instead always restored from the cache or converted again,
+    so that it is never stale with respect to the original image.
+
+    Every image is converted by the first of the image converters which supports its extension, defaulting to
+    the backends detected when open_in_cloud_workflow.image_converters was imported.
+    """
+    if jobs == "auto":
+        jobs = os.cpu_count() or 1
+    else:
+        jobs = int(jobs)
+        assert jobs > 0, "Please provide a positive number of jobs"
+    images_png = {image_file: os.path.splitext(image_file)[0] + ".png" for image_file in image_files}
+    # Convert only once images with the same name and a different extension, since they share the same PNG image
+    images_to_convert = list({
+        image_file_png: image_file for (image_file, image_file_png) in reversed(images_png.items())
+        if image_file != image_file_png and (conversion_cache is not None or not (
+            image_file_png in png_files if png_files is not None else os.path.isfile(image_file_png)))
+    }.values())
+    converters = {
+        extension: get_image_converter(extension, image_converters)
+        for extension in {os.path.splitext(image_file)[1] for image_file in images_to_convert}}
+    if conversion_cache is not None:
+        images_to_convert = [
+            image_file for image_file in images_to_convert
+            if (converter := converters[os.path.splitext(image_file)[1]]) is None or not conversion_cache.restore(
+                conversion_cache.key(image_file, converter.describe(os.path.splitext(image_file)[1])),
+                images_png[image_file])
+        ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        errors = list(executor.map(
+            lambda image_file: _convert_image(
+                converters[os.path.splitext(image_file)[1]], image_file, images_png[image_file], timeout),
+            images_to_convert))
+    if conversion_cache is not None:
+        for (image_file, error) in zip(images_to_convert, errors):
+            if error is None:
+                conversion_cache.store(conversion_cache.keys[image_file], images_png[image_file])
+    failures = [(image_file, error) for (image_file, error) in zip(images_to_convert, errors) if error is not None]
+    if len(failures) > 0:
+        raise RuntimeError(
+            f"Image conversion failed for {len(failures)} image(s):\n"
+            + "\n".join(f"{image_file}:\n{error}" for (image_file, error) in failures))
+    return images_png
+
+
+def _convert_image(
+    converter: ImageConverterBaseClass | None, image_file: str, image_file_png: str, timeout: float | None
+) -> str | None:
+    """Convert an image to PNG with the provided converter, and return the errors if the conversion fails."""
+    if converter is None:
+        return f"    no converter is available for {os.path.splitext(image_file)[1]} images"
+    else:
+        return converter.convert(image_file, image_file_png, timeout)
@@ -0,0 +1,18 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Copy a notebook cell, updating some of its fields."""
+
+import nbformat
+
+
+def copy_cell(cell: nbformat.NotebookNode, **updates: object) -> nbformat.NotebookNode:
+    """
+    Return a shallow copy of the cell, with the provided fields updated.
+
+    Fields which are not updated (e.g., outputs and metadata) are shared with the original cell rather than copied,
+    hence they must be replaced rather than modified in place.
+    """
+    return nbformat.NotebookNode({**cell, **updates})  # type: ignore[no-untyped-call]
@@ -0,0 +1,68 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Store on disk the URLs that files have on Google Drive, so that they can be reused by later runs."""
+
+import json
+import os
+import time
+
+DRIVE_URLS_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+class DriveURLsCache:
+    """
+    Persistent cache of the URLs that files have on Google Drive.
+
+    URLs are stored in a JSON file, and are indexed by the Google Drive root directory and by the path of the file
+    relative to the root directory. Every URL is stored together with the time at which it was obtained, and it is
+    discarded once it is older than the prescribed time to live (in seconds).
+    """
+
+    def __init__(self, cache_file: str, ttl: float) -> None:
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.entries: dict[str, dict[str, tuple[str, float]]] = dict()
+        if os.path.isfile(cache_file):
+            with open(cache_file) as f:
+                self.entries = {
+                    drive_root_directory: {
+                        relative_path: (url, timestamp) for (relative_path, (url, timestamp)) in urls.items()}
+                    for (drive_root_directory, urls) in json.load(f).items()
+                }
+
+    def get(self, drive_root_directory: str, relative_path: str) -> str | None:
+        """Return the cached URL of a file, or None if the URL is not cached or if it has expired."""
+        entry = self.entries.get(drive_root_directory, {}).get(relative_path)
+        if entry is not None and time.time() - entry[1] <= self.ttl:
+            self.hits += 1
+            return entry[0]
+        else:
+            self.misses += 1
+            return None
+
+    def set(self, drive_root_directory: str, relative_path: str, url: str) -> None:
+        """Store the URL of a file."""
+        self.entries.setdefault(drive_root_directory, {})[relative_path] = (url, time.time())
+
+    def invalidate(self, drive_root_directory: str, relative_paths: list[str]) -> None:
+        """Discard the cached URLs of files, e.g. because they have been created anew."""
+        urls = self.entries.get(drive_root_directory, {})
+        for relative_path in relative_paths:
+            urls.pop(relative_path, None)
+
+    def save(self) -> None:
+        """Save the cache to disk, discarding expired URLs."""
+        now = time.time()
+        with open(self.cache_file, "w") as f:
+            json.dump({
+                drive_root_directory: {
+                    relative_path: (url, timestamp) for (relative_path, (url, timestamp)) in urls.items()
+                    if now - timestamp <= self.ttl}
+                for (drive_root_directory, urls) in self.entries.items()
+            }, f, indent=1, sort_keys=True)
+
@@ -0,0 +1,112 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Read and write a notebook with the json module, skipping nbformat conversion, validation and reformatting."""
+
+import json
+import re
+import typing
+import uuid
+
+import nbformat
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    has_orjson = False
+else:
+    has_orjson = True
+
+
+class FastNotebook:
+    """
+    Notebook parsed with the json module (or with orjson, if available), rather than with nbformat.
+
+    Only the cells are wrapped as notebook nodes, and their source is joined into a single string, since these
+    are the only parts of the notebook which stages read or update. Validation is skipped, unless explicitly requested.
+    When the notebook is written back, cells read from the notebook content preserve their key order and, if their
+    source is unchanged, the original split of their source into lines. Cells added or updated by stages are
+    written with sorted keys and with their source split into lines, as nbformat would do. The indentation and the
+    trailing newline of the notebook content are preserved as well. Notebooks stored in nbformat 4.4 or earlier are
+    upgraded to nbformat 4.5 when a stage adds a cell with an id, see upgrade_for_cell_ids.
+    """
+
+    def __init__(self, nb_content: str) -> None:
+        self.nb = loads_notebook(nb_content)
+        assert self.nb.get("nbformat") == 4, (
+            "Please disable fast notebook I/O for notebooks which are not stored in nbformat 4")
+        indent_match = re.match(r"\{\n( +)\S", nb_content)
+        self.indent = len(indent_match.group(1)) if indent_match is not None else None
+        self.trailing_newline = nb_content.endswith("\n")
+        self._read_cells = [nbformat.NotebookNode(cell) for cell in self.nb["cells"]]  # type: ignore[no-untyped-call]
+        self.split_lines = len(self._read_cells) == 0 or any(
+            isinstance(cell.source, list) for cell in self._read_cells)
+        self._split_sources: dict[str, list[str]] = dict()
+        for cell in self._read_cells:
+            if isinstance(cell.source, list):
+                joined_source = "".join(cell.source)
+                self._split_sources[joined_source] = cell.source
+                cell.source = joined_source
+        self.cells: list[nbformat.NotebookNode] = list(self._read_cells)
+
+    def validate(self) -> None:
+        """Validate the notebook, as updated by the stages, against the nbformat schema."""
+        nbformat.validate(self._to_dict())
+
+    def writes(self) -> str:
+        """Return the content of the notebook, as updated by the stages."""
+        nb_content = json.dumps(self._to_dict(), indent=self.indent, ensure_ascii=False)
+        if self.trailing_newline:
+            nb_content += "\n"
+        return nb_content
+
+    def _to_dict(self) -> dict[str, typing.Any]:
+        """Return the notebook, as updated by the stages, as stored on file."""
+        read_cells = {id(cell) for cell in self._read_cells}
+        cells = list()
+        for cell in self.cells:
+            stored_cell: dict[str, typing.Any] = cell
+            if cell.source in self._split_sources:
+                stored_cell = {**cell, "source": self._split_sources[cell.source]}
+            elif self.split_lines:
+                stored_cell = {**cell, "source": cell.source.splitlines(keepends=True)}
+            if id(cell) not in read_cells:
+                stored_cell = _sort_keys(stored_cell)
+            cells.append(stored_cell)
+        return upgrade_for_cell_ids({**self.nb, "cells": cells})
+
+
+def loads_notebook(nb_content: str) -> dict[str, typing.Any]:
+    """Parse the notebook content with orjson, if available, or with the json module otherwise."""
+    if has_orjson:
+        return orjson.loads(nb_content)  # type: ignore[no-any-return]
+    else:
+        return json.loads(nb_content)  # type: ignore[no-any-return]
+
+
+def upgrade_for_cell_ids(nb: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """
+    Upgrade the notebook to nbformat 4.5 if any of its cells has an id, since cell ids require nbformat 4.5.
+
+    As nbformat would do, cells without an id are assigned a random one. The notebook is returned unchanged if it
+    requires no upgrade, or upgraded as a copy otherwise.
+    """
+    if nb["nbformat_minor"] < 5 and any("id" in cell for cell in nb["cells"]):
+        return {
+            **nb, "nbformat_minor": 5,
+            "cells": [cell if "id" in cell else {**cell, "id": uuid.uuid4().hex[:8]} for cell in nb["cells"]]
+        }
+    else:
+        return nb
+
+
+def _sort_keys(value: typing.Any) -> typing.Any:  # noqa: ANN401
+    """Return a copy of the value in which every dictionary has sorted keys."""
+    if isinstance(value, dict):
+        return {key: _sort_keys(value[key]) for key in sorted(value)}
+    elif isinstance(value, list):
+        return [_sort_keys(item) for item in value]
+    else:
+        return value
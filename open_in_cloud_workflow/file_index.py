@@ -0,0 +1,159 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Index files in the work directory, so that several patterns are matched against a single walk."""
+
+import fnmatch
+import functools
+import glob
+import os
+import re
+
+
+class FileIndex:
+    """
+    Index of files and directories in the work directory.
+
+    The work directory is walked once, skipping hidden files and directories as in a recursive glob, and the listing
+    of every directory is stored together with its modification time. When the index is refreshed, only directories
+    whose modification time changed since they were listed (i.e., which had entries added, removed or renamed)
+    are listed again, while every other directory only costs a stat call.
+
+    Directories whose name or path relative to the work directory matches at least one of the newline separated
+    exclusion patterns are pruned from the walk: they are neither listed nor stat-ed, and their content is not indexed.
+    """
+
+    def __init__(self, work_dir: str, exclude_pattern: str = "") -> None:
+        assert work_dir.startswith(os.sep), "Please provide the absolute path of the work directory."
+        self.work_dir = work_dir
+        self.exclude_patterns = [pattern for pattern in exclude_pattern.strip("\n").split("\n") if pattern != ""]
+        self.directories: dict[str, tuple[int, list[str], list[str]]] = dict()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """List again every directory which changed since it was last listed."""
+        visited: set[str] = set()
+        self._refresh_directory("", visited)
+        for relative_directory in set(self.directories) - visited:
+            del self.directories[relative_directory]
+
+    def _refresh_directory(self, relative_directory: str, visited: set[str]) -> None:
+        """List the directory if it changed since it was last listed, and refresh its subdirectories."""
+        directory = os.path.join(self.work_dir, relative_directory)
+        mtime = os.stat(directory).st_mtime_ns
+        if relative_directory not in self.directories or self.directories[relative_directory][0] != mtime:
+            subdirectories = list()
+            files = list()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.startswith("."):
+                        if entry.is_dir():
+                            if not self._is_excluded(entry.name, os.path.join(relative_directory, entry.name)):
+                                subdirectories.append(os.path.join(relative_directory, entry.name))
+                        else:
+                            files.append(os.path.join(relative_directory, entry.name))
+            self.directories[relative_directory] = (mtime, sorted(subdirectories), sorted(files))
+        visited.add(relative_directory)
+        for subdirectory in self.directories[relative_directory][1]:
+            self._refresh_directory(subdirectory, visited)
+
+    def _is_excluded(self, name: str, relative_path: str) -> bool:
+        """Return whether the directory matches at least one exclusion pattern."""
+        return any(
+            fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relative_path, pattern)
+            for pattern in self.exclude_patterns)
+
+    def paths(self) -> list[str]:
+        """Return the path relative to the work directory of every file and directory, in sorted order."""
+        return sorted(
+            path for (_, subdirectories, files) in self.directories.values() for path in subdirectories + files)
+
+    def glob(self, pattern: str) -> list[str]:
+        """
+        Get absolute path of all files in the work directory which match at least one pattern, in sorted order.
+
+        Patterns which do not contain wildcards, which are absolute, or which explicitly refer to hidden or parent
+        directories are delegated to glob, since they may match files which are not stored in the index. Patterns
+        with a trailing separator are delegated to glob as well, since they match directories only.
+        """
+        matches: set[str] = set()
+        indexed_patterns = list()
+        for pattern_ in pattern.strip("\n").split("\n"):
+            if (
+                not glob.has_magic(pattern_) or os.path.isabs(pattern_) or pattern_.endswith(os.sep)
+                or any(segment.startswith(".") for segment in pattern_.split(os.sep))
+            ):
+                matches.update(glob.glob(os.path.join(self.work_dir, pattern_), recursive=True))
+            else:
+                indexed_patterns.append(_compile_pattern(pattern_))
+        if len(indexed_patterns) > 0:
+            matches.update(
+                os.path.join(self.work_dir, path) for path in self.paths()
+                if any(compiled_pattern.match(path) is not None for compiled_pattern in indexed_patterns))
+        return sorted(matches)
+
+
+@functools.cache
+def _compile_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile a recursive glob pattern, relative to the work directory, into a regular expression."""
+    separator = re.escape(os.sep)
+    segments = pattern.split(os.sep)
+    regex = ""
+    for (s, segment) in enumerate(segments):
+        if segment == "**" and s < len(segments) - 1:
+            # Match zero or more directories
+            regex += f"(?:[^{separator}]+{separator})*"
+        elif segment == "**" and s > 0:
+            # Match the parent directory, and every file and directory it contains
+            regex = regex.removesuffix(separator) + f"(?:{separator}[^{separator}]+)*"
+        elif segment == "**":
+            # Match every file and directory
+            regex += f"[^{separator}]+(?:{separator}[^{separator}]+)*"
+        else:
+            regex += _translate_segment(segment)
+            if s < len(segments) - 1:
+                regex += separator
+    return re.compile(regex + r"\Z", flags=re.DOTALL)
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate a glob pattern which does not contain any separator into a regular expression."""
+    separator = re.escape(os.sep)
+    regex = ""
+    c = 0
+    while c < len(segment):
+        if segment[c] == "*":
+            regex += f"[^{separator}]*"
+        elif segment[c] == "?":
+            regex += f"[^{separator}]"
+        elif segment[c] == "[" and (end := segment.find("]", c + 2)) > 0:
+            # Escape characters which are literal in glob, but which denote nested sets or set operations in re
+            character_class = re.sub(r"([\\\[&~|])", r"\\\1", segment[c + 1:end])
+            if character_class.startswith("!"):
+                character_class = "^" + character_class[1:]
+            elif character_class.startswith("^"):
+                character_class = "\\" + character_class
+            regex += f"[{character_class}]"
+            c = end
+        else:
+            regex += re.escape(segment[c])
+        c += 1
+    return regex
+
+
+_file_indices: dict[tuple[str, str], FileIndex] = dict()
+
+
+def get_file_index(work_dir: str, exclude_pattern: str = "") -> FileIndex:
+    """
+    Return the index of the work directory shared by the current process, refreshing it if already available.
+
+    Indices pruned with different exclusion patterns are stored separately.
+    """
+    if (work_dir, exclude_pattern) in _file_indices:
+        _file_indices[work_dir, exclude_pattern].refresh()
+    else:
+        _file_indices[work_dir, exclude_pattern] = FileIndex(work_dir, exclude_pattern)
+    return _file_indices[work_dir, exclude_pattern]
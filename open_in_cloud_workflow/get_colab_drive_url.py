@@ -9,11 +9,17 @@
 from open_in_cloud_workflow.get_drive_url import get_drive_url
 
 
-def get_colab_drive_url(relative_path: str, drive_root_directory: str) -> str | None:
+def get_colab_drive_url(
+    relative_path: str, drive_root_directory: str, drive_urls: dict[str, str] | None = None
+) -> str | None:
     """Get the URL that a file will have on Google Colab when hosted on Google Drive."""
-    drive_url = get_drive_url(relative_path, drive_root_directory)
+    drive_url = get_drive_url(relative_path, drive_root_directory, drive_urls)
     if drive_url is not None:
-        return drive_url.replace(
-            "https://drive.google.com/open?id=", "https://colab.research.google.com/drive/")
+        return drive_url_to_colab_url(drive_url)
     else:
         return None
+
+
+def drive_url_to_colab_url(drive_url: str) -> str:
+    """Convert the URL of a file on Google Drive to the URL that the file will have on Google Colab."""
+    return drive_url.replace("https://drive.google.com/open?id=", "https://colab.research.google.com/drive/")
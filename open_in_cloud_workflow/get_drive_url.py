@@ -11,8 +11,17 @@ import subprocess
 from open_in_cloud_workflow.get_rclone_env import get_rclone_env
 
 
-def get_drive_url(relative_path: str, drive_root_directory: str) -> str | None:
-    """Get the URL that a file will have on Google Drive."""
+def get_drive_url(
+    relative_path: str, drive_root_directory: str, drive_urls: dict[str, str] | None = None
+) -> str | None:
+    """
+    Get the URL that a file will have on Google Drive.
+
+    If provided, the URLs obtained by listing the root directory are used first, and rclone is run only for files
+    which were missing when the root directory was listed.
+    """
+    if drive_urls is not None and relative_path in drive_urls:
+        return drive_urls[relative_path]
     try:
         return subprocess.run(
             f"rclone -q link drive:{os.path.join(drive_root_directory, relative_path)}".split(" "),
@@ -0,0 +1,25 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Get the URL that every file in a Google Drive directory has."""
+
+import json
+import subprocess
+
+from open_in_cloud_workflow.get_rclone_env import get_rclone_env
+
+
+def get_drive_urls(drive_root_directory: str) -> dict[str, str]:
+    """Get the URL that every file in a Google Drive directory has, listing the directory only once."""
+    try:
+        drive_files = json.loads(subprocess.run(
+            f"rclone -q lsjson --recursive --files-only drive:{drive_root_directory}".split(" "),
+            capture_output=True, check=True, env=get_rclone_env()).stdout.decode("utf-8"))
+    except subprocess.CalledProcessError:
+        return {}
+    return {
+        drive_file["Path"]: "https://drive.google.com/open?id=" + drive_file["ID"]
+        for drive_file in drive_files if "ID" in drive_file
+    }
@@ -5,11 +5,29 @@
 # SPDX-License-Identifier: MIT
 """Get the hash of the HEAD commit of a Git repository."""
 
+import concurrent.futures
 import subprocess
 
+_git_head_hashes: dict[tuple[str, str], str] = dict()
+
 
 def get_git_head_hash(repo_url: str, branch: str) -> str:
-    """Get the hash of an HEAD commit of a Git repository."""
-    return subprocess.run(
-        f"git ls-remote {repo_url} {branch} | cut -f1".split(" "),
-        capture_output=True, check=True).stdout.decode("utf-8").strip("\n")[:7]
+    """
+    Get the hash of an HEAD commit of a Git repository.
+
+    The hash is memoized, so that every remote is contacted at most once per run.
+    """
+    if (repo_url, branch) not in _git_head_hashes:
+        _git_head_hashes[repo_url, branch] = subprocess.run(
+            f"git ls-remote {repo_url} {branch} | cut -f1".split(" "),
+            capture_output=True, check=True).stdout.decode("utf-8").strip("\n")[:7]
+    return _git_head_hashes[repo_url, branch]
+
+
+def prefetch_git_head_hashes(remotes: set[tuple[str, str]]) -> None:
+    """Get the hash of the HEAD commit of several Git repositories concurrently, and memoize them."""
+    remotes = {remote for remote in remotes if remote not in _git_head_hashes}
+    if len(remotes) > 0:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(remotes)) as executor:
+            # Consume the results, so that any exception is raised here
+            list(executor.map(lambda remote: get_git_head_hash(*remote), remotes))
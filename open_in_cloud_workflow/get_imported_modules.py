@@ -0,0 +1,35 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Get the modules imported by a code cell."""
+
+import re
+
+_import_statement = re.compile(
+    r"(?:^|[;:])[ \t]*(?:from[ \t]+(?P<from_module>[\w.]+)[ \t]+import\b|import[ \t]+(?P<import_modules>[^;#\n]+))",
+    re.MULTILINE)
+
+
+def get_imported_modules(source: str) -> set[str]:
+    """
+    Get the modules imported by a code cell, scanning its source only once.
+
+    Both the import and from forms are detected, including aliases and comma separated imports, at the beginning of
+    a line or after a semicolon or a colon (e.g., try: import a, or if condition: import a). Every dotted
+    module is returned together with its parent modules, e.g. import a.b returns both a and a.b.
+    Relative imports are ignored.
+    """
+    imported_modules: set[str] = set()
+    for match in _import_statement.finditer(source.replace("\\\n", " ")):
+        if match.group("from_module") is not None:
+            modules = [match.group("from_module")]
+        else:
+            modules = [
+                module.strip().split(" ")[0] for module in match.group("import_modules").strip("()").split(",")]
+        for module in modules:
+            if module != "" and not module.startswith("."):
+                module_parts = module.split(".")
+                imported_modules.update(".".join(module_parts[:p]) for p in range(1, len(module_parts) + 1))
+    return imported_modules
@@ -9,12 +9,18 @@
 from open_in_cloud_workflow.get_drive_url import get_drive_url
 
 
-def get_kaggle_drive_url(relative_path: str, drive_root_directory: str) -> str | None:
+def get_kaggle_drive_url(
+    relative_path: str, drive_root_directory: str, drive_urls: dict[str, str] | None = None
+) -> str | None:
     """Get the URL that a file will have on Kaggle when hosted on Google Drive."""
-    drive_url = get_drive_url(relative_path, drive_root_directory)
+    drive_url = get_drive_url(relative_path, drive_root_directory, drive_urls)
     if drive_url is not None:
-        return drive_url.replace(
-            "https://drive.google.com/open?id=",
-            "https://kaggle.com/kernels/welcome?src=https://drive.google.com/uc?id=")
+        return drive_url_to_kaggle_url(drive_url)
     else:
         return None
+
+
+def drive_url_to_kaggle_url(drive_url: str) -> str:
+    """Convert the URL of a file on Google Drive to the URL that the file will have on Kaggle."""
+    return drive_url.replace(
+        "https://drive.google.com/open?id=", "https://kaggle.com/kernels/welcome?src=https://drive.google.com/uc?id=")
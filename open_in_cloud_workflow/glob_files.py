@@ -5,14 +5,17 @@
 # SPDX-License-Identifier: MIT
 """Get absolute path of all files in the work directory which match at least one patterns."""
 
-import glob
 import os
 
+from open_in_cloud_workflow.file_index import get_file_index
 
-def glob_files(work_dir: str, pattern: str) -> set[str]:
-    """Get absolute path of all files in the work directory which match at least one pattern."""
+
+def glob_files(work_dir: str, pattern: str) -> list[str]:
+    """
+    Get absolute path of all files in the work directory which match at least one pattern, in sorted order.
+
+    Patterns are matched against the index of the work directory shared by the current process, which is walked
+    only once regardless of the number of patterns, and is refreshed rather than walked again by later calls.
+    """
     assert work_dir.startswith(os.sep), "Please provide the absolute path of the work directory."
-    return set().union(*[
-        {f for f in glob.glob(os.path.join(work_dir, pattern_), recursive=True)}
-        for pattern_ in pattern.strip("\n").split("\n")
-    ])
+    return get_file_index(work_dir).glob(pattern)
@@ -5,46 +5,36 @@
 # SPDX-License-Identifier: MIT
 """Look for images in the work directory, and compute their base64 representation."""
 
-import base64
-import os
-import subprocess
+import tempfile
 
-from open_in_cloud_workflow.glob_files import glob_files
+from open_in_cloud_workflow.convert_images import convert_images
+from open_in_cloud_workflow.image_index import ImageIndex
+from open_in_cloud_workflow.image_optimizer import ImageOptimizer
+from open_in_cloud_workflow.image_to_base64 import image_to_base64
 
 
-def glob_images(work_dir: str) -> dict[str, str]:
-    """Look for images in the work directory, and compute their base64 representation."""
-    images_as_base64 = dict()
-    image_convert: list[str]
-    for (image_ext, image_convert) in (
-        ("png", []),
-        ("jpg", ["convert {image_file} {image_file_png}"]),
-        ("svg",
-         ["inkscape -e {image_file_png} {image_file}", "inkscape --export-filename={image_file_png} {image_file}"])
-    ):
-        for image_file in glob_files(work_dir, os.path.join("**", f"*.{image_ext}")):
-            image_prefix, _ = os.path.splitext(image_file)
-            image_file_png = image_prefix + ".png"
-            if not os.path.isfile(image_file_png):
-                for image_convert_ in image_convert:
-                    try:
-                        subprocess.check_call(
-                            image_convert_.format(image_file=image_file, image_file_png=image_file_png).split(" "),
-                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    except subprocess.CalledProcessError:  # pragma: no cover
-                        pass
-                    else:
-                        break
-                else:  # pragma: no cover
-                    raise RuntimeError(f"Image conversion failed for {image_file}")
-            assert image_file not in images_as_base64
-            images_as_base64[image_file] = _to_base64(image_file_png)
-    return images_as_base64
+def glob_images(
+    work_dir: str, image_files: set[str] | None = None, image_optimizer: ImageOptimizer | None = None,
+    exclude_pattern: str = ""
+) -> dict[str, str]:
+    """
+    Look for images in the work directory, and compute their base64 representation.
 
-
-def _to_base64(image_file: str) -> str:
-    """Convert the PNG image to its base64 representation."""
-    assert image_file.endswith(".png")
-    with open(image_file, "rb") as f:
-        image_content = base64.b64encode(f.read()).decode("utf-8")
-    return "data:image/png;base64," + image_content
+    If provided, only images whose absolute path belongs to the image_files set are converted and encoded.
+    If an image optimizer is provided, images are optimized before computing their base64 representation.
+    Directories matching the newline separated exclusion patterns are not searched for images.
+    """
+    image_index = ImageIndex(work_dir, exclude_pattern)
+    found_image_files = image_index.all()
+    if image_files is not None:
+        found_image_files &= image_files
+    images_png = convert_images(sorted(found_image_files), png_files=image_index.png_files())
+    if image_optimizer is not None:
+        with tempfile.TemporaryDirectory() as optimized_directory:
+            return {
+                image_file: image_to_base64(image_file_optimized)
+                for (image_file, image_file_optimized) in image_optimizer.optimize_images(
+                    images_png, work_dir, optimized_directory).items()
+            }
+    else:
+        return {image_file: image_to_base64(image_file_png) for (image_file, image_file_png) in images_png.items()}
@@ -0,0 +1,131 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Backends which convert images to PNG."""
+
+import abc
+import os
+import shutil
+import subprocess
+
+try:
+    import PIL
+    import PIL.Image
+except ImportError:  # pragma: no cover
+    has_pillow = False
+else:
+    has_pillow = True
+
+
+class ImageConverterBaseClass(abc.ABC):
+    """Base class for a backend which converts images to PNG."""
+
+    @abc.abstractmethod
+    def supports(self, extension: str) -> bool:  # pragma: no cover
+        """Return whether images with the provided extension can be converted by this backend."""
+        pass
+
+    @abc.abstractmethod
+    def describe(self, extension: str) -> list[str]:  # pragma: no cover
+        """Return the description of the conversion of images with the provided extension."""
+        pass
+
+    @abc.abstractmethod
+    def convert(self, image_file: str, image_file_png: str, timeout: float | None) -> str | None:  # pragma: no cover
+        """Convert an image to PNG, and return the errors if the conversion fails."""
+        pass
+
+
+class SubprocessImageConverter(ImageConverterBaseClass):
+    """
+    Backend which converts images to PNG running external commands, one process per image.
+
+    Commands whose executable is not available are discarded when the backend is created. Every remaining command
+    is tried in turn, and each of them is stopped after timeout seconds.
+    """
+
+    def __init__(self, image_convert: dict[str, list[str]]) -> None:
+        self.image_convert = image_convert
+        self.available_image_convert = {
+            extension: [
+                image_convert_ for image_convert_ in image_convert_list
+                if shutil.which(image_convert_.split(" ")[0]) is not None]
+            for (extension, image_convert_list) in image_convert.items()
+        }
+
+    def supports(self, extension: str) -> bool:
+        """Return whether any command converting images with the provided extension is available."""
+        return len(self.available_image_convert.get(extension, [])) > 0
+
+    def describe(self, extension: str) -> list[str]:
+        """Return the commands converting images with the provided extension."""
+        return self.image_convert[extension]
+
+    def convert(self, image_file: str, image_file_png: str, timeout: float | None) -> str | None:
+        """Convert an image to PNG, trying every available command in turn, and return the errors if all fail."""
+        errors = list()
+        for image_convert_ in self.available_image_convert[os.path.splitext(image_file)[1]]:
+            command = image_convert_.format(image_file=image_file, image_file_png=image_file_png)
+            try:
+                subprocess.run(
+                    command.split(" "), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True,
+                    timeout=timeout)
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+                errors.append(f"    {command}: {e}")
+            else:
+                return None
+        return "\n".join(errors)
+
+
+class PillowImageConverter(ImageConverterBaseClass):
+    """
+    Backend which converts raster images to PNG within the current process, using Pillow.
+
+    Since no process is started, the timeout is ignored.
+    """
+
+    extensions = (".jpg", )
+
+    def supports(self, extension: str) -> bool:
+        """Return whether images with the provided extension can be read by Pillow."""
+        return extension in self.extensions
+
+    def describe(self, extension: str) -> list[str]:
+        """Return the version of Pillow."""
+        return [f"PIL {PIL.__version__}"]
+
+    def convert(self, image_file: str, image_file_png: str, timeout: float | None) -> str | None:
+        """Convert an image to PNG, and return the error if Pillow fails to read or write it."""
+        try:
+            with PIL.Image.open(image_file) as image:
+                # PNG does not support the CMYK color space used by some JPEG images
+                (image.convert("RGB") if image.mode == "CMYK" else image).save(image_file_png, format="PNG")
+        except (OSError, ValueError) as e:
+            return f"    PIL: {e}"
+        else:
+            return None
+
+
+_image_convert = {
+    ".png": [],
+    ".jpg": ["convert {image_file} {image_file_png}"],
+    ".svg": ["inkscape -e {image_file_png} {image_file}", "inkscape --export-filename={image_file_png} {image_file}"]
+}
+
+IMAGE_CONVERTERS: list[ImageConverterBaseClass] = [SubprocessImageConverter(_image_convert)]
+if has_pillow:
+    IMAGE_CONVERTERS.insert(0, PillowImageConverter())
+
+
+def get_image_converter(
+    extension: str, image_converters: list[ImageConverterBaseClass] | None = None
+) -> ImageConverterBaseClass | None:
+    """Return the first backend which converts images with the provided extension, or None if none is available."""
+    if image_converters is None:
+        image_converters = IMAGE_CONVERTERS
+    for image_converter in image_converters:
+        if image_converter.supports(extension):
+            return image_converter
+    return None
@@ -0,0 +1,41 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Index images in the work directory by extension, walking the work directory only once."""
+
+import os
+
+from open_in_cloud_workflow.file_index import get_file_index
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".svg")
+
+
+class ImageIndex:
+    """
+    Index of images in the work directory.
+
+    Images are classified by extension while traversing the index of the work directory shared by the current
+    process. Hidden files and directories are skipped, as in a recursive glob. Directories whose name or path
+    relative to the work directory matches at least one of the newline separated exclusion patterns are pruned
+    from the walk of the index, so that their content is never listed nor stat-ed.
+    """
+
+    def __init__(self, work_dir: str, exclude_pattern: str = "") -> None:
+        assert work_dir.startswith(os.sep), "Please provide the absolute path of the work directory."
+        self.work_dir = work_dir
+        self.image_files: dict[str, set[str]] = {extension: set() for extension in IMAGE_EXTENSIONS}
+        for (_, _, files) in get_file_index(work_dir, exclude_pattern).directories.values():
+            for file_ in files:
+                extension = os.path.splitext(file_)[1]
+                if extension in self.image_files:
+                    self.image_files[extension].add(os.path.join(self.work_dir, file_))
+
+    def all(self) -> set[str]:
+        """Return the absolute path of every image."""
+        return set().union(*self.image_files.values())
+
+    def png_files(self) -> set[str]:
+        """Return the absolute path of every PNG image, e.g. to check whether an image has already been converted."""
+        return self.image_files[".png"]
@@ -0,0 +1,99 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Downscale and recompress PNG images before computing their base64 representation."""
+
+import os
+import tempfile
+
+from open_in_cloud_workflow.image_converters import has_pillow
+
+if has_pillow:
+    import PIL.Image
+
+IMAGE_OPTIMIZER_FORMATS = ("png", "jpeg", "webp")
+
+IMAGE_OPTIMIZER_QUALITY = 85
+
+
+class ImageOptimizer:
+    """
+    Downscale and recompress PNG images, using Pillow.
+
+    Images whose width or height exceeds max_dimension pixels are downscaled preserving their aspect ratio.
+    Images are then compressed again losslessly as PNG, or lossily as JPEG or WebP with the prescribed quality.
+    Since JPEG does not support transparency, transparent pixels are filled with white when compressing as JPEG.
+    The original PNG image is kept whenever the optimized image is not smaller.
+    """
+
+    def __init__(
+        self, max_dimension: int | None = None, image_format: str = "png", quality: int = IMAGE_OPTIMIZER_QUALITY
+    ) -> None:
+        assert has_pillow, "Please install Pillow to optimize images"
+        assert max_dimension is None or max_dimension > 0, "Please provide a positive maximum dimension"
+        assert image_format in IMAGE_OPTIMIZER_FORMATS, f"Please provide an image format in {IMAGE_OPTIMIZER_FORMATS}"
+        assert 0 <= quality <= 100, "Please provide a quality between 0 and 100"
+        self.max_dimension = max_dimension
+        self.image_format = image_format
+        self.quality = quality
+
+    def optimize(self, image_file_png: str, output_directory: str) -> str:
+        """
+        Write the optimized image to the output directory, and return its path.
+
+        The format of the optimized image is given by the extension of the returned path. The path of the original
+        PNG image is returned instead whenever the optimized image is not smaller.
+        """
+        assert image_file_png.endswith(".png")
+        with (
+            PIL.Image.open(image_file_png) as image,
+            tempfile.NamedTemporaryFile(dir=output_directory, suffix="." + self.image_format, delete=False) as f
+        ):
+            if self.max_dimension is not None:
+                image.thumbnail((self.max_dimension, self.max_dimension))
+            if self.image_format == "png":
+                image.save(f, format="PNG", optimize=True)
+            elif self.image_format == "jpeg":
+                _composite_on_white(image).save(f, format="JPEG", quality=self.quality, optimize=True)
+            else:
+                image.save(f, format="WEBP", quality=self.quality)
+        if os.path.getsize(f.name) < os.path.getsize(image_file_png):
+            return f.name
+        else:
+            os.remove(f.name)
+            return image_file_png
+
+    def optimize_images(self, images_png: dict[str, str], work_dir: str, output_directory: str) -> dict[str, str]:
+        """
+        Optimize the PNG image associated to every image, and return the path of the optimized image.
+
+        Optimized images are written to the output directory rather than kept in memory. The size of every image
+        before and after optimization is printed.
+        """
+        images_optimized = dict()
+        for image_file in sorted(images_png):
+            images_optimized[image_file] = self.optimize(images_png[image_file], output_directory)
+            print(
+                f"{os.path.relpath(image_file, work_dir)}: {os.path.getsize(images_png[image_file])} bytes -> "
+                + f"{os.path.getsize(images_optimized[image_file])} bytes "
+                + f"({os.path.splitext(images_optimized[image_file])[1][1:]})")
+        return images_optimized
+
+    def __str__(self) -> str:
+        """Print private attributes as attribute_name=attribute_value, one attribute per line."""
+        return f"""max_dimension={self.max_dimension}
+image_format={self.image_format}
+quality={self.quality}"""
+
+
+def _composite_on_white(image: "PIL.Image.Image") -> "PIL.Image.Image":
+    """Convert the image to RGB, as required by JPEG, filling transparent pixels with white rather than black."""
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        image_rgba = image.convert("RGBA")
+        image_rgb = PIL.Image.new("RGB", image_rgba.size, (255, 255, 255))
+        image_rgb.paste(image_rgba, mask=image_rgba.getchannel("A"))
+        return image_rgb
+    else:
+        return image.convert("RGB")
@@ -0,0 +1,35 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Convert a PNG, JPEG or WebP image to its base64 representation."""
+
+import binascii
+import collections.abc
+import os
+
+IMAGE_TO_BASE64_FORMATS = ("png", "jpeg", "webp")
+
+IMAGE_TO_BASE64_CHUNK_SIZE = 3 * 256 * 1024
+
+
+def image_to_base64(image_file: str) -> str:
+    """Convert the PNG, JPEG or WebP image to its base64 representation."""
+    return "".join(image_to_base64_chunks(image_file))
+
+
+def image_to_base64_chunks(image_file: str) -> collections.abc.Iterator[str]:
+    """
+    Convert the PNG, JPEG or WebP image to its base64 representation, one chunk at a time.
+
+    The format of the image is given by its extension. The image is read in chunks whose size is a multiple of three
+    bytes, so that every chunk is encoded independently without padding, except for the last one. The whole image
+    content is never loaded in memory at once.
+    """
+    image_format = os.path.splitext(image_file)[1][1:]
+    assert image_format in IMAGE_TO_BASE64_FORMATS
+    yield f"data:image/{image_format};base64,"
+    with open(image_file, "rb") as f:
+        while len(chunk := f.read(IMAGE_TO_BASE64_CHUNK_SIZE)) > 0:
+            yield binascii.b2a_base64(chunk, newline=False).decode("ascii")
@@ -0,0 +1,69 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Store on disk the hashes of the notebooks processed by a previous run, to skip unchanged notebooks."""
+
+import hashlib
+import json
+import os
+import tempfile
+
+
+class IncrementalManifest:
+    """
+    Manifest of the notebooks processed by a previous run.
+
+    The manifest directory contains a manifest.json file, which associates to the names of the stages and the path
+    of every notebook (relative to the work directory) the hash of the input notebook, of the stage options, of the
+    dependencies referenced by the notebook and of the output notebook. Output notebooks are stored in the objects
+    subdirectory, using their hash as file name, so that they can be restored when the input notebook is unchanged.
+    """
+
+    def __init__(self, manifest_directory: str) -> None:
+        self.manifest_directory = manifest_directory
+        self.entries: dict[str, dict[str, str]] = dict()
+        os.makedirs(os.path.join(manifest_directory, "objects"), exist_ok=True)
+        manifest_file = os.path.join(manifest_directory, "manifest.json")
+        if os.path.isfile(manifest_file):
+            with open(manifest_file) as f:
+                self.entries = json.load(f)
+
+    def store(self, content: str) -> str:
+        """Store the content of an output notebook, and return its hash."""
+        content_hash = hash_content(content)
+        object_file = self._object_file(content_hash)
+        if not os.path.isfile(object_file):
+            # Write to a temporary file first, since several processes may store the same object concurrently
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(object_file), delete=False) as f:
+                f.write(content)
+            os.replace(f.name, object_file)
+        return content_hash
+
+    def restore(self, content_hash: str) -> str | None:
+        """Return the content of a stored output notebook, or None if it is not available."""
+        object_file = self._object_file(content_hash)
+        if os.path.isfile(object_file):
+            with open(object_file) as f:
+                return f.read()
+        else:
+            return None
+
+    def save(self) -> None:
+        """Save the manifest to disk, and remove stored outputs that are not referenced anymore."""
+        with open(os.path.join(self.manifest_directory, "manifest.json"), "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        referenced_objects = {entry["output"] + ".ipynb" for entry in self.entries.values()}
+        for object_filename in os.listdir(os.path.join(self.manifest_directory, "objects")):
+            if object_filename not in referenced_objects:
+                os.remove(os.path.join(self.manifest_directory, "objects", object_filename))
+
+    def _object_file(self, content_hash: str) -> str:
+        """Return the path of the file storing an output notebook."""
+        return os.path.join(self.manifest_directory, "objects", content_hash + ".ipynb")
+
+
+def hash_content(content: str) -> str:
+    """Return the hash of a string."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -0,0 +1,47 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Prepare once the installation cells of every package, so that they can be added to several notebooks."""
+
+from open_in_cloud_workflow.get_fem_on_cloud_installation_cell_code import get_fem_on_cloud_installation_cell_code
+from open_in_cloud_workflow.get_git_head_hash import prefetch_git_head_hashes
+from open_in_cloud_workflow.get_pip_installation_cell_code import get_pip_installation_cell_code
+from open_in_cloud_workflow.package_spec import package_specs
+
+
+class InstallationPlan:
+    """
+    Installation cells of every package, together with the imports which require them.
+
+    Package specifications are parsed only once, and installation cell code is generated only once, so that
+    environment variables are hardcoded and the current commit of Git remotes is resolved only once per run.
+    """
+
+    def __init__(self, cloud_provider: str, fem_on_cloud_packages_str: str, pip_packages_str: str) -> None:
+        fem_on_cloud_packages = package_specs(fem_on_cloud_packages_str)
+        pip_packages = package_specs(pip_packages_str)
+
+        # Resolve concurrently every package which should be installed at the current commit
+        remotes = set()
+        if any(package.url == "current" for package in fem_on_cloud_packages):
+            remotes.add(
+                (f"https://github.com/fem-on-{cloud_provider}/fem-on-{cloud_provider}.github.io.git", "gh-pages"))
+        for package in pip_packages:
+            if package.url.endswith("@current"):
+                remotes.add((package.url.replace("@current", ""), "HEAD"))
+        prefetch_git_head_hashes(remotes)
+
+        self.packages = fem_on_cloud_packages + pip_packages
+        self.packages_install_code = [
+            get_fem_on_cloud_installation_cell_code(
+                cloud_provider, package.name, package.version, package.url, package.import_name,
+                package.install_command_line_options, package.extra_commands_before_install
+            ) for package in fem_on_cloud_packages
+        ] + [
+            get_pip_installation_cell_code(
+                package.name, package.version, package.url, package.import_name,
+                package.install_command_line_options, package.extra_commands_before_install
+            ) for package in pip_packages
+        ]
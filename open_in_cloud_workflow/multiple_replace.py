@@ -0,0 +1,65 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Replace several substrings at once, scanning the text only once."""
+
+import collections.abc
+import re
+
+import nbformat
+
+from open_in_cloud_workflow.copy_cell import copy_cell
+
+
+class MultipleReplace:
+    """
+    Replace several substrings at once.
+
+    Substrings are compiled once into a single alternation regular expression, sorted from the longest to the shortest,
+    so that the text is scanned only once and the longest substring is replaced when several ones start at the same
+    position (e.g., sub/a.ipynb rather than a.ipynb). Replaced text is never scanned again.
+    """
+
+    def __init__(self, replacements: collections.abc.Mapping[str, str]) -> None:
+        self.replacements = replacements
+        if len(replacements) > 0:
+            self.pattern: re.Pattern[str] | None = re.compile(
+                "|".join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)))
+        else:
+            self.pattern = None
+
+    def find(self, text: str) -> set[str]:
+        """Find which substrings occur in the text, without computing their replacement."""
+        if self.pattern is None:
+            return set()
+        else:
+            return set(self.pattern.findall(text))
+
+    def replace(self, text: str) -> tuple[str, int]:
+        """Replace every substring in the text, and return the updated text and the number of substitutions."""
+        if self.pattern is None:
+            return text, 0
+        else:
+            return self.pattern.subn(lambda match: self.replacements[match.group(0)], text)
+
+    def replace_in_markdown(self, nb_cells: list[nbformat.NotebookNode]) -> tuple[list[nbformat.NotebookNode], int]:
+        """
+        Replace every substring in markdown cells, and return the updated cells and the number of substitutions.
+
+        Only cells whose source changes are copied, while every other cell is shared with the original notebook.
+        """
+        updated_nb_cells = list()
+        substitutions = 0
+        for cell in nb_cells:
+            if cell.cell_type == "markdown":
+                (updated_source, cell_substitutions) = self.replace(cell.source)
+                substitutions += cell_substitutions
+            else:
+                updated_source = cell.source
+            if updated_source != cell.source:
+                updated_nb_cells.append(copy_cell(cell, source=updated_source))
+            else:
+                updated_nb_cells.append(cell)
+        return updated_nb_cells, substitutions
@@ -0,0 +1,142 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Specification of the packages to be installed, provided as a string or as a structured file."""
+
+import dataclasses
+import json
+import os
+import typing
+
+from open_in_cloud_workflow.packages_str_to_lists import packages_str_to_tuples
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover
+    has_tomllib = False
+else:
+    has_tomllib = True
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover
+    has_yaml = False
+else:
+    has_yaml = True
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PackageSpec:
+    """
+    Specification of a package to be installed.
+
+    An empty import name requires the package in any notebook which imports at least one module.
+    """
+
+    name: str
+    version: str
+    url: str
+    import_name: str
+    dependent_imports: tuple[str, ...] = ()
+    install_command_line_options: str = ""
+    extra_commands_before_install: str = ""
+
+
+PACKAGE_SPEC_FILE_EXTENSIONS = (".json", ".toml", ".yaml", ".yml")
+
+# Key in a structured file, associated to the field of the specification and to the expected type
+_package_spec_schema: dict[str, tuple[str, type]] = {
+    "name": ("name", str),
+    "version": ("version", str),
+    "url": ("url", str),
+    "import": ("import_name", str),
+    "dependent_imports": ("dependent_imports", list),
+    "install_command_line_options": ("install_command_line_options", str),
+    "extra_commands_before_install": ("extra_commands_before_install", str)
+}
+
+_version_operators = ("==", ">=", ">", "<=", "<", "[")
+
+
+def package_specs(packages: str) -> list[PackageSpec]:
+    """
+    Get the specification of every package.
+
+    The packages are provided either as a newline separated string formatted with @, $, %, £ and € special characters
+    (see packages_str_to_tuples), or as the path of an existing JSON, TOML or YAML file containing a list of packages,
+    either at the top level or under the packages key. A string which does not refer to an existing file is always
+    converted with the legacy format, so that packages named as a file (e.g., ruamel.yaml) are still supported.
+    Every package in a file is a table with a mandatory name key, and optional version, url, import (defaulting to
+    the name), dependent_imports, install_command_line_options and extra_commands_before_install keys. The file is
+    validated once it is read, reporting the package and the key of the first invalid entry.
+    """
+    if (
+        "\n" not in packages.strip("\n") and packages.strip("\n").endswith(PACKAGE_SPEC_FILE_EXTENSIONS)
+        and os.path.isfile(packages.strip("\n"))
+    ):
+        return _package_specs_from_file(packages.strip("\n"))
+    else:
+        return [
+            PackageSpec(
+                package_name, package_version, package_url, package_import,
+                tuple(package_dependent_imports.split(" ")) if package_dependent_imports != "" else (),
+                package_install_command_line_options, package_extra_commands_before_install)
+            for (
+                package_name, package_version, package_url, package_import, package_dependent_imports,
+                package_install_command_line_options, package_extra_commands_before_install
+            ) in packages_str_to_tuples(packages)
+        ]
+
+
+def _package_specs_from_file(packages_file: str) -> list[PackageSpec]:
+    """Read and validate the specification of every package stored in a structured file."""
+    extension = os.path.splitext(packages_file)[1]
+    with open(packages_file, "rb") as f:
+        if extension == ".json":
+            content: typing.Any = json.load(f)
+        elif extension == ".toml":
+            if not has_tomllib:  # pragma: no cover
+                raise RuntimeError(f"{packages_file}: reading TOML files requires Python 3.11 or later")
+            content = tomllib.load(f)
+        else:
+            if not has_yaml:  # pragma: no cover
+                raise RuntimeError(f"{packages_file}: reading YAML files requires PyYAML")
+            content = yaml.safe_load(f)
+    if isinstance(content, dict) and set(content) == {"packages"}:
+        content = content["packages"]
+    if not isinstance(content, list):
+        raise RuntimeError(f"{packages_file}: expected a list of packages, possibly stored under the packages key")
+    return [_package_spec_from_dict(package, f"{packages_file}: packages[{p}]") for (p, package) in enumerate(content)]
+
+
+def _package_spec_from_dict(package: typing.Any, location: str) -> PackageSpec:  # noqa: ANN401
+    """Validate the specification of a package stored as a table in a structured file."""
+    if not isinstance(package, dict):
+        raise RuntimeError(f"{location}: expected a table, got {type(package).__name__}")
+    if "name" not in package:
+        raise RuntimeError(f"{location}: missing mandatory key name")
+    fields: dict[str, typing.Any] = dict()
+    for (key, value) in package.items():
+        if key not in _package_spec_schema:
+            raise RuntimeError(
+                f"{location}: unknown key {key}, expected one of " + ", ".join(_package_spec_schema))
+        (field, field_type) = _package_spec_schema[key]
+        if field_type is list and isinstance(value, list) and all(isinstance(item, str) for item in value):
+            fields[field] = tuple(value)
+        elif field_type is str and isinstance(value, str):
+            fields[field] = value
+        else:
+            expected = "a list of strings" if field_type is list else "a string"
+            raise RuntimeError(f"{location}.{key}: expected {expected}, got {value!r}")
+    if fields["name"] == "":
+        raise RuntimeError(f"{location}.name: expected a non-empty string")
+    fields.setdefault("version", "")
+    if fields["version"] != "" and not fields["version"].startswith(_version_operators):
+        raise RuntimeError(
+            f"{location}.version: expected a string starting with one of " + ", ".join(_version_operators)
+            + f", got {fields['version']!r}")
+    fields.setdefault("url", "")
+    fields.setdefault("import_name", fields["name"])
+    return PackageSpec(**fields)
@@ -5,6 +5,48 @@
 # SPDX-License-Identifier: MIT
 """Convert a string representing a list of packages."""
 
+import collections.abc
+import re
+
+# Grammar of a single package: every field excludes the special characters which start the same or a later field,
+# with the only exception of the package url, which may contain a single @ (e.g., to denote a Git tag)
+_package_str_grammar = re.compile(
+    r"(?P<name>(?:[^@$%£€=<>\[]|=(?!=))*)"
+    r"(?P<version>[^@$%£€]*)"
+    r"(?:@(?P<url>[^@$%£€]*(?:@[^@$%£€]*)?))?"
+    r"(?:\$(?P<import>[^$%£€]*))?"
+    r"(?:%(?P<dependent_imports>[^%£€]*))?"
+    r"(?:£(?P<install_command_line_options>[^£€]*))?"
+    r"(?:€(?P<extra_commands_before_install>[^€]*))?"
+)
+
+
+def packages_str_to_tuples(packages_str: str) -> collections.abc.Iterator[
+        tuple[str, str, str, str, str, str, str]]:
+    """
+    Convert a newline separated string formatted with @, $, %, £ and € special characters, one package at a time.
+
+    Every package is scanned only once, and converted to a tuple containing the package name, version, url, import,
+    dependent imports, install command line options and extra commands before install.
+    """
+    if packages_str != "":
+        for (line, package_str) in enumerate(packages_str.strip("\n").split("\n")):
+            package_match = _package_str_grammar.match(package_str)
+            assert package_match is not None
+            if package_match.end() != len(package_str):
+                raise RuntimeError(
+                    f"Invalid package {package_str!r} at line {line + 1}, column {package_match.end() + 1}: "
+                    + f"unexpected {package_str[package_match.end()]}")
+            (
+                package_name, package_version, package_url, package_import, package_dependent_imports,
+                package_install_command_line_options, package_extra_commands_before_install
+            ) = package_match.groups(default="")
+            if package_match.group("import") is None:
+                package_import = package_name
+            yield (
+                package_name, package_version, package_url, package_import, package_dependent_imports,
+                package_install_command_line_options, package_extra_commands_before_install
+            )
 
 
 def packages_str_to_lists(packages_str: str) -> tuple[
@@ -25,68 +67,17 @@ def packages_str_to_lists(packages_str: str) -> tuple[
     packages_dependent_imports = list()
     packages_install_command_line_options = list()
     packages_extra_commands_before_install = list()
-    if packages_str != "":
-        for package_str in packages_str.strip("\n").split("\n"):
-            split_at_euro = package_str.split("€")
-            assert len(split_at_euro) in (1, 2)
-            if len(split_at_euro) == 1:
-                package_name_version_url_import_depimports_commandlineoptions = split_at_euro[0]
-                package_extra_commands_before_install = ""
-            elif len(split_at_euro) == 2:
-                package_name_version_url_import_depimports_commandlineoptions = split_at_euro[0]
-                package_extra_commands_before_install = split_at_euro[1]
-            split_at_pound = package_name_version_url_import_depimports_commandlineoptions.split("£")
-            assert len(split_at_pound) in (1, 2)
-            if len(split_at_pound) == 1:
-                package_name_version_url_import_depimports = split_at_pound[0]
-                package_install_command_line_options = ""
-            elif len(split_at_pound) == 2:
-                package_name_version_url_import_depimports = split_at_pound[0]
-                package_install_command_line_options = split_at_pound[1]
-            split_at_percent = package_name_version_url_import_depimports.split("%")
-            assert len(split_at_percent) in (1, 2)
-            if len(split_at_percent) == 1:
-                package_name_version_url_import = split_at_percent[0]
-                package_dependent_imports = ""
-            elif len(split_at_percent) == 2:
-                package_name_version_url_import = split_at_percent[0]
-                package_dependent_imports = split_at_percent[1]
-            split_at_dollar = package_name_version_url_import.split("$")
-            assert len(split_at_dollar) in (1, 2)
-            if len(split_at_dollar) == 1:
-                package_name_version_url = split_at_dollar[0]
-                package_import = None
-            elif len(split_at_dollar) == 2:
-                package_name_version_url = split_at_dollar[0]
-                package_import = split_at_dollar[1]
-            split_at_at = package_name_version_url.split("@")
-            assert len(split_at_at) in (1, 2, 3)
-            if len(split_at_at) == 1:
-                package_name_version = split_at_at[0]
-                package_url = ""
-            elif len(split_at_at) == 2:
-                package_name_version = split_at_at[0]
-                package_url = split_at_at[1]
-            elif len(split_at_at) == 3:
-                package_name_version = split_at_at[0]
-                package_url = "@".join(split_at_at[1:])
-            package_name = package_name_version
-            for operator in ("==", ">=", ">", "<=", "<", "["):
-                if operator in package_name:
-                    split_at_operator = package_str.split(operator)
-                    assert len(split_at_operator) in (1, 2)
-                    package_name = split_at_operator[0]
-            package_version = package_name_version[len(package_name):]
-            packages_name.append(package_name)
-            packages_version.append(package_version)
-            packages_url.append(package_url)
-            if package_import is None:
-                packages_import.append(package_name)
-            else:
-                packages_import.append(package_import)
-            packages_dependent_imports.append(package_dependent_imports)
-            packages_install_command_line_options.append(package_install_command_line_options)
-            packages_extra_commands_before_install.append(package_extra_commands_before_install)
+    for (
+        package_name, package_version, package_url, package_import, package_dependent_imports,
+        package_install_command_line_options, package_extra_commands_before_install
+    ) in packages_str_to_tuples(packages_str):
+        packages_name.append(package_name)
+        packages_version.append(package_version)
+        packages_url.append(package_url)
+        packages_import.append(package_import)
+        packages_dependent_imports.append(package_dependent_imports)
+        packages_install_command_line_options.append(package_install_command_line_options)
+        packages_extra_commands_before_install.append(package_extra_commands_before_install)
     return (
         packages_name, packages_version, packages_url, packages_import, packages_dependent_imports,
         packages_install_command_line_options, packages_extra_commands_before_install
@@ -0,0 +1,124 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Apply several stages to every notebook, reading and writing each notebook only once."""
+
+import argparse
+
+import nbformat
+
+from open_in_cloud_workflow.add_installation_cells import AddInstallationCellsStage
+from open_in_cloud_workflow.conversion_cache import CONVERSION_CACHE_SIZE, ConversionCache
+from open_in_cloud_workflow.drive_urls_cache import DRIVE_URLS_CACHE_TTL
+from open_in_cloud_workflow.image_optimizer import IMAGE_OPTIMIZER_QUALITY, ImageOptimizer
+from open_in_cloud_workflow.process_notebooks import (
+    add_process_notebooks_arguments, NotebookStageBaseClass, process_notebooks)
+from open_in_cloud_workflow.publish_on import PublishOnBaseClass
+from open_in_cloud_workflow.replace_images_in_markdown import (
+    add_replace_images_in_markdown_arguments, conversion_cache_from_options, image_optimizer_from_options,
+    ReplaceImagesInMarkdownStage, save_conversion_cache)
+from open_in_cloud_workflow.replace_links_in_markdown import (
+    add_drive_urls_cache_arguments, publisher_with_drive_urls_cache, ReplaceLinksInMarkdownStage, save_drive_urls_cache)
+
+
+class Pipeline(NotebookStageBaseClass):
+    """Stage which applies several stages one after the other."""
+
+    def __init__(self, stages: list[NotebookStageBaseClass]) -> None:
+        self.stages = stages
+
+    def update_cells(
+        self, nb_cells: list[nbformat.NotebookNode], nb_filename: str
+    ) -> tuple[list[nbformat.NotebookNode], int]:
+        """Apply every stage in turn, passing the cells updated by a stage to the next one."""
+        substitutions = 0
+        for stage in self.stages:
+            (nb_cells, stage_substitutions) = stage.update_cells(nb_cells, nb_filename)
+            substitutions += stage_substitutions
+        return nb_cells, substitutions
+
+    def get_dependencies(self, nb_filename: str, nb_content: str) -> dict[str, str]:
+        """Return the resources referenced by the notebook content in any stage, prefixed by the stage index."""
+        return {
+            f"{s}:{resource}": value
+            for (s, stage) in enumerate(self.stages)
+            for (resource, value) in stage.get_dependencies(nb_filename, nb_content).items()
+        }
+
+    def get_name(self) -> str:
+        """Return the names of the stages, separated by commas."""
+        return ",".join(stage.get_name() for stage in self.stages)
+
+    def __str__(self) -> str:
+        """Print private attributes as attribute_name=attribute_value, one attribute per line."""
+        return "\n".join(str(stage) for stage in self.stages)
+
+
+def pipeline(
+    work_dir: str, nb_pattern: str, stages: str, cloud_provider: str, fem_on_cloud_packages: str,
+    pip_packages: str, publisher: PublishOnBaseClass, conversion_jobs: int | str = 1,
+    conversion_timeout: float | None = None, conversion_cache: ConversionCache | None = None,
+    max_image_size: int | None = None, image_optimizer: ImageOptimizer | None = None, use_attachments: bool = False,
+    images_exclude_pattern: str = ""
+) -> Pipeline:
+    """Transform a newline separated string containing the stages names to the corresponding pipeline."""
+    stages_list: list[NotebookStageBaseClass] = list()
+    stages_names = stages.strip("\n").split("\n")
+    assert len(stages_names) == len(set(stages_names)), "Every stage can be provided at most once"
+    for stage_name in stages_names:
+        if stage_name == "add_installation_cells":
+            stages_list.append(AddInstallationCellsStage(cloud_provider, fem_on_cloud_packages, pip_packages))
+        elif stage_name == "replace_images_in_markdown":
+            stages_list.append(ReplaceImagesInMarkdownStage(
+                work_dir, nb_pattern, conversion_jobs, conversion_timeout, conversion_cache, max_image_size,
+                image_optimizer, use_attachments, images_exclude_pattern))
+        elif stage_name == "replace_links_in_markdown":
+            stages_list.append(ReplaceLinksInMarkdownStage(work_dir, nb_pattern, cloud_provider, publisher))
+        else:  # pragma: no cover
+            raise RuntimeError(f"Invalid stage {stage_name}")
+    return Pipeline(stages_list)
+
+
+def __main__(  # noqa: N807
+    work_dir: str, nb_pattern: str, stages: str, cloud_provider: str, fem_on_cloud_packages: str,
+    pip_packages: str, publisher: str | PublishOnBaseClass, jobs: int | str = 1,
+    manifest_directory: str | None = None, drive_urls_cache_file: str | None = None,
+    drive_urls_cache_ttl: float = DRIVE_URLS_CACHE_TTL, conversion_jobs: int | str = 1,
+    conversion_timeout: float | None = None, conversion_cache_directory: str | None = None,
+    conversion_cache_size: int = CONVERSION_CACHE_SIZE, max_image_size: int | None = None,
+    optimize_images: bool = False, max_image_dimension: int | None = None, image_format: str = "png",
+    image_quality: int = IMAGE_OPTIMIZER_QUALITY, use_attachments: bool = False, images_exclude_pattern: str = "",
+    fast_io: bool = False, validate_notebooks: bool = False
+) -> None:
+    """Apply the prescribed stages to every notebook in the work directory matching the prescribed pattern."""
+    publisher = publisher_with_drive_urls_cache(publisher, drive_urls_cache_file, drive_urls_cache_ttl)
+    conversion_cache = conversion_cache_from_options(conversion_cache_directory, conversion_cache_size)
+    image_optimizer = image_optimizer_from_options(optimize_images, max_image_dimension, image_format, image_quality)
+
+    process_notebooks(
+        work_dir, nb_pattern,
+        pipeline(
+            work_dir, nb_pattern, stages, cloud_provider, fem_on_cloud_packages, pip_packages, publisher,
+            conversion_jobs, conversion_timeout, conversion_cache, max_image_size, image_optimizer, use_attachments,
+            images_exclude_pattern),
+        jobs, manifest_directory, fast_io, validate_notebooks)
+
+    save_conversion_cache(conversion_cache)
+    save_drive_urls_cache(publisher)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("work_dir")
+    parser.add_argument("nb_pattern")
+    parser.add_argument("stages")
+    parser.add_argument("cloud_provider")
+    parser.add_argument("fem_on_cloud_packages")
+    parser.add_argument("pip_packages")
+    parser.add_argument("publisher")
+    add_process_notebooks_arguments(parser)
+    add_drive_urls_cache_arguments(parser)
+    add_replace_images_in_markdown_arguments(parser)
+    __main__(**vars(parser.parse_args()))
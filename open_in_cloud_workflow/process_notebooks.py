@@ -0,0 +1,222 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Read, update and write every notebook in the work directory matching the prescribed pattern."""
+
+import abc
+import argparse
+import concurrent.futures
+import json
+import os
+import traceback
+
+import nbformat
+
+from open_in_cloud_workflow.fast_notebook import FastNotebook, upgrade_for_cell_ids
+from open_in_cloud_workflow.glob_files import glob_files
+from open_in_cloud_workflow.incremental_manifest import hash_content, IncrementalManifest
+
+
+class NotebookStageBaseClass(abc.ABC):
+    """Base class for a stage which updates the cells of a notebook."""
+
+    @abc.abstractmethod
+    def update_cells(
+        self, nb_cells: list[nbformat.NotebookNode], nb_filename: str
+    ) -> tuple[list[nbformat.NotebookNode], int]:  # pragma: no cover
+        """Return the updated cells of the notebook stored at the provided absolute path, and the substitutions made."""
+        pass
+
+    @abc.abstractmethod
+    def get_dependencies(self, nb_filename: str, nb_content: str) -> dict[str, str]:  # pragma: no cover
+        """Return the resources referenced by the notebook content, associated to the value they are replaced with."""
+        pass
+
+    @abc.abstractmethod
+    def get_name(self) -> str:  # pragma: no cover
+        """Return the name of the stage, which identifies its entries in the manifest."""
+        pass
+
+    @abc.abstractmethod
+    def __str__(self) -> str:  # pragma: no cover
+        """Print private attributes as attribute_name=attribute_value, one attribute per line."""
+        pass
+
+
+def process_notebooks(
+    work_dir: str, nb_pattern: str, stage: NotebookStageBaseClass, jobs: int | str = 1,
+    manifest_directory: str | None = None, fast_io: bool = False, validate_notebooks: bool = False
+) -> None:
+    """
+    Apply a stage to every notebook in the work directory matching the prescribed pattern.
+
+    Notebooks are distributed over a pool of jobs processes, or over as many processes as available CPUs
+    if jobs is auto. Notebooks are processed in sorted order, and errors are collected and reported per notebook
+    once every notebook has been processed.
+
+    If a manifest directory is provided, notebooks which are unchanged since the previous run with the same
+    stage options and dependencies are skipped, and their output is restored from the manifest directory.
+    The same manifest directory may be shared by runs of different stages (or pipelines of stages).
+
+    Notebooks are written only if their content changed, and the number of modified notebooks, of inserted cells
+    and of substitutions is reported once every notebook has been processed.
+
+    If fast_io is enabled, notebooks are read and written with the json module rather than with nbformat.
+    Notebooks are then validated against the nbformat schema only if validate_notebooks is enabled, once every stage
+    has been applied.
+    """
+    nb_filenames = sorted(glob_files(work_dir, nb_pattern))
+    if jobs == "auto":
+        jobs = os.cpu_count() or 1
+    else:
+        jobs = int(jobs)
+        assert jobs > 0, "Please provide a positive number of jobs"
+    if manifest_directory is not None:
+        manifest: IncrementalManifest | None = IncrementalManifest(manifest_directory)
+    else:
+        manifest = None
+    # Entries are keyed by the stage name too, so that several stages can share the same manifest directory
+    manifest_keys = [stage.get_name() + ":" + os.path.relpath(nb_filename, work_dir) for nb_filename in nb_filenames]
+    if jobs == 1 or len(nb_filenames) < 2:
+        results = [
+            _process_notebook(stage, manifest, fast_io, validate_notebooks, nb_filename, manifest_key)
+            for (nb_filename, manifest_key) in zip(nb_filenames, manifest_keys)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(jobs, len(nb_filenames)), initializer=_initialize_worker,
+            initargs=(stage, manifest, fast_io, validate_notebooks)
+        ) as executor:
+            results = list(executor.map(_process_notebook_in_worker, nb_filenames, manifest_keys))
+    if manifest is not None:
+        for (manifest_key, (_, _, manifest_entry, _)) in zip(manifest_keys, results):
+            if manifest_entry is not None:
+                manifest.entries[manifest_key] = manifest_entry
+        manifest.save()
+        skipped = sum(status == "skipped" for (status, _, _, _) in results)
+        rewritten = sum(status == "rewritten" for (status, _, _, _) in results)
+        print(f"{skipped} notebook(s) skipped, {rewritten} notebook(s) rewritten")
+    modified = sum(modified for (_, _, _, (modified, _, _)) in results)
+    cells_inserted = sum(cells_inserted for (_, _, _, (_, cells_inserted, _)) in results)
+    substitutions = sum(substitutions for (_, _, _, (_, _, substitutions)) in results)
+    print(
+        f"{modified} notebook(s) modified, {cells_inserted} cell(s) inserted, {substitutions} substitution(s) made")
+    failures = [
+        (nb_filename, error) for (nb_filename, (_, error, _, _)) in zip(nb_filenames, results) if error is not None]
+    if len(failures) > 0:
+        raise RuntimeError(
+            f"Processing failed for {len(failures)} notebook(s):\n"
+            + "\n".join(f"{nb_filename}:\n{error}" for (nb_filename, error) in failures))
+
+
+def add_process_notebooks_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the command line options of process_notebooks, shared by every stage."""
+    parser.add_argument("--jobs", default="1", help="Number of processes, or auto to use all available CPUs")
+    parser.add_argument(
+        "--manifest-directory", default=None, help="Directory storing the manifest used to skip unchanged notebooks")
+    parser.add_argument(
+        "--fast-io", action="store_true",
+        help="Read and write notebooks with the json module rather than with nbformat, skipping validation")
+    parser.add_argument(
+        "--validate-notebooks", action="store_true", help="Validate notebooks when fast notebook I/O is enabled")
+
+
+def _process_notebook(
+    stage: NotebookStageBaseClass, manifest: IncrementalManifest | None, fast_io: bool, validate_notebooks: bool,
+    nb_filename: str, manifest_key: str
+) -> tuple[str, str | None, dict[str, str] | None, tuple[bool, int, int]]:
+    """
+    Apply a stage to a single notebook.
+
+    Return whether the notebook was skipped, rewritten or failed, the formatted exception if processing failed,
+    the updated manifest entry, and whether the notebook file was modified together with the number of cells
+    inserted and of substitutions made by the stage.
+    """
+    try:
+        with open(nb_filename) as f:
+            nb_content = f.read()
+        if manifest is not None:
+            nb_hash = hash_content(nb_content)
+            options_hash = hash_content(str(stage) + ("\nfast_io=True" if fast_io else ""))
+            manifest_entry = manifest.entries.get(manifest_key)
+            if manifest_entry is not None and manifest_entry["options"] == options_hash:
+                if nb_hash == manifest_entry["output"] and nb_hash != manifest_entry["input"]:
+                    # The notebook was already updated in place by the previous run
+                    return "skipped", None, manifest_entry, (False, 0, 0)
+                dependencies_hash = _hash_dependencies(stage, nb_filename, nb_content)
+                if nb_hash == manifest_entry["input"] and dependencies_hash == manifest_entry["dependencies"]:
+                    if manifest_entry["output"] == manifest_entry["input"]:
+                        # The previous run left the notebook unchanged
+                        return "skipped", None, manifest_entry, (False, 0, 0)
+                    updated_nb_content = manifest.restore(manifest_entry["output"])
+                    if updated_nb_content is not None:
+                        with open(nb_filename, "w") as f:
+                            f.write(updated_nb_content)
+                        return "skipped", None, manifest_entry, (True, 0, 0)
+            else:
+                dependencies_hash = _hash_dependencies(stage, nb_filename, nb_content)
+        if fast_io:
+            fast_nb = FastNotebook(nb_content)
+            num_cells = len(fast_nb.cells)
+            (fast_nb.cells, substitutions) = stage.update_cells(fast_nb.cells, nb_filename)
+            cells_inserted = len(fast_nb.cells) - num_cells
+            if validate_notebooks:
+                fast_nb.validate()
+            updated_nb_content = fast_nb.writes()
+        else:
+            nb = nbformat.reads(nb_content, as_version=4)  # type: ignore[no-untyped-call]
+            num_cells = len(nb.cells)
+            (nb.cells, substitutions) = stage.update_cells(nb.cells, nb_filename)
+            cells_inserted = len(nb.cells) - num_cells
+            nb = nbformat.from_dict(upgrade_for_cell_ids(nb))  # type: ignore[no-untyped-call]
+            updated_nb_content = nbformat.writes(nb)  # type: ignore[no-untyped-call]
+            if not updated_nb_content.endswith("\n"):
+                updated_nb_content += "\n"
+        changes = (updated_nb_content != nb_content, cells_inserted, substitutions)
+        if updated_nb_content != nb_content:
+            with open(nb_filename, "w") as f:
+                f.write(updated_nb_content)
+        if manifest is not None:
+            if updated_nb_content != nb_content:
+                updated_nb_hash = manifest.store(updated_nb_content)
+            else:
+                updated_nb_hash = nb_hash
+            return "rewritten", None, {
+                "input": nb_hash, "options": options_hash, "dependencies": dependencies_hash,
+                "output": updated_nb_hash}, changes
+        else:
+            return "rewritten", None, None, changes
+    except Exception:
+        return "failed", traceback.format_exc(), None, (False, 0, 0)
+
+
+def _hash_dependencies(stage: NotebookStageBaseClass, nb_filename: str, nb_content: str) -> str:
+    """Return the hash of the dependencies referenced by the notebook content."""
+    return hash_content(json.dumps(stage.get_dependencies(nb_filename, nb_content), sort_keys=True))
+
+
+_worker_stage: NotebookStageBaseClass | None = None
+_worker_manifest: IncrementalManifest | None = None
+_worker_fast_io = False
+_worker_validate_notebooks = False
+
+
+def _initialize_worker(
+    stage: NotebookStageBaseClass, manifest: IncrementalManifest | None, fast_io: bool, validate_notebooks: bool
+) -> None:  # pragma: no cover
+    """Store the stage and the manifest in the worker process, so that they are sent to each worker only once."""
+    global _worker_stage, _worker_manifest, _worker_fast_io, _worker_validate_notebooks
+    _worker_stage = stage
+    _worker_manifest = manifest
+    _worker_fast_io = fast_io
+    _worker_validate_notebooks = validate_notebooks
+
+
+def _process_notebook_in_worker(
+    nb_filename: str, manifest_key: str
+) -> tuple[str, str | None, dict[str, str] | None, tuple[bool, int, int]]:  # pragma: no cover
+    """Apply the stage stored in the worker process to a single notebook."""
+    assert _worker_stage is not None
+    return _process_notebook(
+        _worker_stage, _worker_manifest, _worker_fast_io, _worker_validate_notebooks, nb_filename, manifest_key)
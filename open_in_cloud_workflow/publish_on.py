@@ -8,9 +8,12 @@
 import abc
 import sys
 
-from open_in_cloud_workflow.get_colab_drive_url import get_colab_drive_url
+from open_in_cloud_workflow.drive_urls_cache import DriveURLsCache
+from open_in_cloud_workflow.get_colab_drive_url import drive_url_to_colab_url
 from open_in_cloud_workflow.get_colab_github_url import get_colab_github_url
-from open_in_cloud_workflow.get_kaggle_drive_url import get_kaggle_drive_url
+from open_in_cloud_workflow.get_drive_url import get_drive_url
+from open_in_cloud_workflow.get_drive_urls import get_drive_urls
+from open_in_cloud_workflow.get_kaggle_drive_url import drive_url_to_kaggle_url
 from open_in_cloud_workflow.get_kaggle_github_url import get_kaggle_github_url
 
 
@@ -47,19 +50,38 @@ name={self.name}"""
 class PublishOnDrive(PublishOnBaseClass):
     """Store Google Drive publisher and its root directory."""
 
-    def __init__(self, drive_root_directory: str) -> None:
+    def __init__(self, drive_root_directory: str, drive_urls_cache: DriveURLsCache | None = None) -> None:
         self.drive_root_directory = drive_root_directory
+        self.drive_urls_cache = drive_urls_cache
+        self.drive_urls: dict[str, str] | None = None
 
     def get_url(self, cloud_provider: str, relative_path: str) -> str | None:
         """Get the URL used on the cloud when the file at the provided relative path is stored on Google Drive."""
         assert cloud_provider in ("colab", "kaggle")
+        drive_url = self._get_drive_url(relative_path)
+        if drive_url is None:
+            return None
         if cloud_provider == "colab":
-            return get_colab_drive_url(relative_path, self.drive_root_directory)
+            return drive_url_to_colab_url(drive_url)
         elif cloud_provider == "kaggle":
-            return get_kaggle_drive_url(relative_path, self.drive_root_directory)
+            return drive_url_to_kaggle_url(drive_url)
         else:  # pragma: no cover
             raise RuntimeError("Invalid cloud provider")
 
+    def _get_drive_url(self, relative_path: str) -> str | None:
+        """Get the URL that the file at the provided relative path has on Google Drive, using the cache first."""
+        if self.drive_urls_cache is not None:
+            drive_url = self.drive_urls_cache.get(self.drive_root_directory, relative_path)
+            if drive_url is not None:
+                return drive_url
+        if self.drive_urls is None:
+            # List the root directory once, rather than running rclone for every file
+            self.drive_urls = get_drive_urls(self.drive_root_directory)
+        drive_url = get_drive_url(relative_path, self.drive_root_directory, self.drive_urls)
+        if drive_url is not None and self.drive_urls_cache is not None:
+            self.drive_urls_cache.set(self.drive_root_directory, relative_path, drive_url)
+        return drive_url
+
     def __str__(self) -> str:
         """Print private attributes as attribute_name=attribute_value, one attribute per line."""
         return f"""publisher=drive
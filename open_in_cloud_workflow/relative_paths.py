@@ -0,0 +1,30 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Compute paths of files relative to the directory of a notebook, once per directory."""
+
+import collections.abc
+import os
+
+
+class RelativePaths:
+    """
+    Paths of files relative to the directory of a notebook.
+
+    Files are provided as paths relative to the work directory, or as absolute paths. Relative paths are computed
+    only once for every distinct notebook directory, since notebooks in the same directory share the same relative
+    paths, and are associated to the file as it was originally provided.
+    """
+
+    def __init__(self, work_dir: str, files: collections.abc.Iterable[str]) -> None:
+        self.files = {os.path.join(work_dir, file_): file_ for file_ in files}
+        self._relative_files: dict[str, dict[str, str]] = dict()
+
+    def relative_to(self, nb_dirname: str) -> dict[str, str]:
+        """Return the files indexed by their path relative to the provided directory."""
+        if nb_dirname not in self._relative_files:
+            self._relative_files[nb_dirname] = {
+                os.path.relpath(absolute_file, nb_dirname): file_ for (absolute_file, file_) in self.files.items()}
+        return self._relative_files[nb_dirname]
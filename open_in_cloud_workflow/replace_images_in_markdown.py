@@ -5,49 +5,329 @@
 # SPDX-License-Identifier: MIT
 """Replace images with their base64 representation."""
 
-import copy
+import argparse
+import collections.abc
+import functools
 import os
-import sys
+import shutil
+import tempfile
+import weakref
 
 import nbformat
 
+from open_in_cloud_workflow.conversion_cache import CONVERSION_CACHE_SIZE, ConversionCache
+from open_in_cloud_workflow.convert_images import convert_images
+from open_in_cloud_workflow.copy_cell import copy_cell
+from open_in_cloud_workflow.fast_notebook import loads_notebook
 from open_in_cloud_workflow.glob_files import glob_files
-from open_in_cloud_workflow.glob_images import glob_images
+from open_in_cloud_workflow.image_index import ImageIndex
+from open_in_cloud_workflow.image_optimizer import IMAGE_OPTIMIZER_FORMATS, IMAGE_OPTIMIZER_QUALITY, ImageOptimizer
+from open_in_cloud_workflow.image_to_base64 import image_to_base64
+from open_in_cloud_workflow.incremental_manifest import hash_content
+from open_in_cloud_workflow.multiple_replace import MultipleReplace
+from open_in_cloud_workflow.process_notebooks import (
+    add_process_notebooks_arguments, NotebookStageBaseClass, process_notebooks)
+from open_in_cloud_workflow.relative_paths import RelativePaths
 
 
 def replace_images_in_markdown(
     nb_cells: list[nbformat.NotebookNode], images_as_base64: dict[str, str]
 ) -> list[nbformat.NotebookNode]:
     """Replace images with their base64 representation, and return the updated cells."""
+    updated_nb_cells, _ = MultipleReplace(images_as_base64).replace_in_markdown(nb_cells)
+    return updated_nb_cells
+
+
+def attach_images_in_markdown(
+    nb_cells: list[nbformat.NotebookNode], images_as_base64: collections.abc.Mapping[str, str]
+) -> list[nbformat.NotebookNode]:
+    """Replace images with references to cell attachments storing their base64 representation."""
+    updated_nb_cells, _ = _attach_images_in_markdown(nb_cells, MultipleReplace(images_as_base64))
+    return updated_nb_cells
+
+
+def _attach_images_in_markdown(
+    nb_cells: list[nbformat.NotebookNode], compiled_images_as_base64: MultipleReplace
+) -> tuple[list[nbformat.NotebookNode], int]:
+    """
+    Replace images with references to cell attachments storing their base64 representation, counting substitutions.
+
+    Attachments are named after the hash of the base64 representation, so that every distinct image is stored only
+    once in each markdown cell, even if it is referenced several times or by several paths. Since attachments are
+    only visible within the cell which stores them, images referenced by several cells are stored in each of them.
+    """
     updated_nb_cells = list()
+    substitutions = 0
     for cell in nb_cells:
-        if cell.cell_type == "markdown":
-            updated_cell = copy.deepcopy(cell)
-            for (image_file, base64) in images_as_base64.items():
-                updated_cell.source = updated_cell.source.replace(image_file, base64)
-            updated_nb_cells.append(updated_cell)
+        relative_image_files = (
+            compiled_images_as_base64.find(cell.source) if cell.cell_type == "markdown" else set())
+        if len(relative_image_files) > 0:
+            attachments: dict[str, dict[str, str]] = dict()
+            attachment_uris: dict[str, str] = dict()
+            for relative_image_file in relative_image_files:
+                image_as_base64 = compiled_images_as_base64.replacements[relative_image_file]
+                (header, data) = image_as_base64.split(",", 1)
+                mime_type = header.removeprefix("data:").removesuffix(";base64")
+                attachment_name = hash_content(image_as_base64)[:16] + "." + mime_type.split("/")[1]
+                attachments[attachment_name] = {mime_type: data}
+                attachment_uris[relative_image_file] = "attachment:" + attachment_name
+            (updated_source, cell_substitutions) = MultipleReplace(attachment_uris).replace(cell.source)
+            substitutions += cell_substitutions
+            updated_nb_cells.append(copy_cell(
+                cell, source=updated_source, attachments={**cell.get("attachments", dict()), **attachments}))
         else:
             updated_nb_cells.append(cell)
-    return updated_nb_cells
+    return updated_nb_cells, substitutions
 
 
-def __main__(work_dir: str, nb_pattern: str) -> None:  # noqa: N807
-    """Replace images in every notebook in the work directory matching the prescribed pattern."""
-    images_as_base64 = glob_images(work_dir)
+class _ImagesAsBase64(collections.abc.Mapping[str, str]):
+    """Base64 representation of images, computed on demand."""
 
-    for nb_filename in glob_files(work_dir, nb_pattern):
-        with open(nb_filename) as f:
-            nb = nbformat.read(f, as_version=4)  # type: ignore[no-untyped-call]
-        nb_dirname = os.path.dirname(nb_filename)
-        nb_images_as_base64 = {
-            os.path.relpath(os.path.join(work_dir, key), nb_dirname): value
-            for key, value in images_as_base64.items()
+    def __init__(
+        self, relative_images: dict[str, str], images_png: dict[str, str], conversion_cache: ConversionCache | None,
+        images_optimized: dict[str, str]
+    ) -> None:
+        self.relative_images = relative_images
+        self.images_png = images_png
+        self.conversion_cache = conversion_cache
+        self.images_optimized = images_optimized
+
+    def __getitem__(self, relative_image_file: str) -> str:
+        """Return the base64 representation of an image, reusing the optimized, stored or recently computed ones."""
+        image_file = self.relative_images[relative_image_file]
+        if image_file in self.images_optimized:
+            return _cached_image_to_base64(self.images_optimized[image_file])
+        if self.conversion_cache is not None:
+            image_as_base64 = self.conversion_cache.restore_base64(image_file)
+            if image_as_base64 is not None:
+                return image_as_base64
+        return _cached_image_to_base64(self.images_png[image_file])
+
+    def __iter__(self) -> collections.abc.Iterator[str]:
+        """Iterate over images."""
+        return iter(self.relative_images)
+
+    def __len__(self) -> int:
+        """Return the number of images."""
+        return len(self.relative_images)
+
+
+_cached_image_to_base64 = functools.lru_cache(maxsize=32)(image_to_base64)
+
+
+def _read_markdown_sources(nb_filename: str) -> list[str]:
+    """Read the source of every markdown cell, converting the notebook only if it is not stored in nbformat 4."""
+    with open(nb_filename) as f:
+        nb_content = f.read()
+    nb = loads_notebook(nb_content)
+    if nb.get("nbformat") == 4:
+        return [
+            "".join(cell["source"]) if isinstance(cell["source"], list) else cell["source"]
+            for cell in nb["cells"] if cell["cell_type"] == "markdown"]
+    else:
+        nb_cells = nbformat.reads(nb_content, as_version=4).cells  # type: ignore[no-untyped-call]
+        return [cell.source for cell in nb_cells if cell.cell_type == "markdown"]
+
+
+class ReplaceImagesInMarkdownStage(NotebookStageBaseClass):
+    """
+    Stage which replaces images with their base64 representation.
+
+    Only images referenced in the markdown cells of notebooks matching the pattern are converted to PNG, and their
+    base64 representation is computed on demand while processing notebooks. Conversions run over a pool of
+    conversion_jobs threads, and each conversion is stopped after conversion_timeout seconds. If provided, the
+    conversion cache is used to restore images converted by previous runs. If provided, the image optimizer
+    downscales and recompresses images before they are embedded, storing them in a temporary directory which is
+    removed once the stage is garbage collected. Images which are larger than max_image_size bytes after optimization
+    are not replaced, and a warning is printed. If use_attachments is True, images are stored as attachments of the
+    markdown cells which reference them, rather than inlined in their source. Directories matching the newline
+    separated images_exclude_pattern are not searched for images. Notebooks which cannot be read while looking for
+    referenced images are skipped with a warning, and their failure is reported by process_notebooks.
+    """
+
+    def __init__(
+        self, work_dir: str, nb_pattern: str, conversion_jobs: int | str = 1, conversion_timeout: float | None = None,
+        conversion_cache: ConversionCache | None = None, max_image_size: int | None = None,
+        image_optimizer: ImageOptimizer | None = None, use_attachments: bool = False, images_exclude_pattern: str = ""
+    ) -> None:
+        self.work_dir = work_dir
+        self.images_exclude_pattern = images_exclude_pattern
+        self.use_attachments = use_attachments
+        self.conversion_cache = conversion_cache
+        self.max_image_size = max_image_size
+        self.image_optimizer = image_optimizer
+        image_index = ImageIndex(work_dir, images_exclude_pattern)
+        relative_image_files = RelativePaths(work_dir, image_index.all())
+        find_images: dict[str, MultipleReplace] = dict()
+        referenced_image_files: set[str] = set()
+        for nb_filename in glob_files(work_dir, nb_pattern):
+            nb_dirname = os.path.dirname(nb_filename)
+            if nb_dirname not in find_images:
+                find_images[nb_dirname] = MultipleReplace(relative_image_files.relative_to(nb_dirname))
+            try:
+                markdown_sources = _read_markdown_sources(nb_filename)
+            except Exception:
+                # The notebook will be reported as failed when processed, hence it has no image to be replaced
+                print(f"Warning: images in {os.path.relpath(nb_filename, work_dir)} will not be replaced, "
+                      + "since the notebook could not be read")
+                continue
+            for markdown_source in markdown_sources:
+                referenced_image_files.update(
+                    find_images[nb_dirname].replacements[image_file]
+                    for image_file in find_images[nb_dirname].find(markdown_source))
+        self.images_png = convert_images(
+            sorted(referenced_image_files), conversion_jobs, conversion_timeout, conversion_cache,
+            png_files=image_index.png_files())
+        if image_optimizer is not None:
+            # Optimized images are stored on file, so that only their paths are sent to the workers
+            optimized_directory = tempfile.mkdtemp()
+            weakref.finalize(self, shutil.rmtree, optimized_directory, ignore_errors=True)
+            self.images_optimized = image_optimizer.optimize_images(self.images_png, work_dir, optimized_directory)
+        else:
+            self.images_optimized = dict()
+        if max_image_size is not None:
+            for image_file in sorted(self.images_png):
+                image_size = os.path.getsize(self.images_optimized.get(image_file, self.images_png[image_file]))
+                if image_size > max_image_size:
+                    print(
+                        f"Warning: {os.path.relpath(image_file, work_dir)} will not be replaced, since its size "
+                        + f"({image_size} bytes) exceeds the maximum image size ({max_image_size} bytes)")
+                    del self.images_png[image_file]
+        self.relative_images_png = RelativePaths(work_dir, self.images_png)
+        self._compiled_images_as_base64: dict[str, MultipleReplace] = dict()
+
+    def update_cells(
+        self, nb_cells: list[nbformat.NotebookNode], nb_filename: str
+    ) -> tuple[list[nbformat.NotebookNode], int]:
+        """Replace images with their base64 representation, using paths relative to the notebook."""
+        if self.use_attachments:
+            return _attach_images_in_markdown(nb_cells, self._compiled_relative_images_as_base64(nb_filename))
+        else:
+            return self._compiled_relative_images_as_base64(nb_filename).replace_in_markdown(nb_cells)
+
+    def get_dependencies(self, nb_filename: str, nb_content: str) -> dict[str, str]:
+        """Return the images referenced by the notebook content, associated to the hash of their base64 encoding."""
+        compiled_relative_images_as_base64 = self._compiled_relative_images_as_base64(nb_filename)
+        return {
+            image_file: hash_content(compiled_relative_images_as_base64.replacements[image_file])
+            for image_file in compiled_relative_images_as_base64.find(nb_content)
         }
-        nb.cells = replace_images_in_markdown(nb.cells, nb_images_as_base64)
-        with open(nb_filename, "w") as f:
-            nbformat.write(nb, f)  # type: ignore[no-untyped-call]
+
+    def _compiled_relative_images_as_base64(self, nb_filename: str) -> MultipleReplace:
+        """Return the compiled base64 representation of the images, using paths relative to the notebook."""
+        nb_dirname = os.path.dirname(nb_filename)
+        if nb_dirname not in self._compiled_images_as_base64:
+            # Notebooks in the same directory share the same relative paths, hence compile only once per directory
+            self._compiled_images_as_base64[nb_dirname] = MultipleReplace(_ImagesAsBase64(
+                self.relative_images_png.relative_to(nb_dirname),
+                self.images_png, self.conversion_cache, self.images_optimized))
+        return self._compiled_images_as_base64[nb_dirname]
+
+    def get_name(self) -> str:
+        """Return the name of the stage, which identifies its entries in the manifest."""
+        return "replace_images_in_markdown"
+
+    def __str__(self) -> str:
+        """Print private attributes as attribute_name=attribute_value, one attribute per line."""
+        stage_str = f"""stage={self.get_name()}
+work_dir={self.work_dir}
+max_image_size={self.max_image_size}
+use_attachments={self.use_attachments}
+images_exclude_pattern={self.images_exclude_pattern!r}"""
+        if self.image_optimizer is not None:
+            stage_str += "\n" + str(self.image_optimizer)
+        return stage_str
+
+
+def __main__(  # noqa: N807
+    work_dir: str, nb_pattern: str, jobs: int | str = 1, manifest_directory: str | None = None,
+    conversion_jobs: int | str = 1, conversion_timeout: float | None = None,
+    conversion_cache_directory: str | None = None, conversion_cache_size: int = CONVERSION_CACHE_SIZE,
+    max_image_size: int | None = None, optimize_images: bool = False, max_image_dimension: int | None = None,
+    image_format: str = "png", image_quality: int = IMAGE_OPTIMIZER_QUALITY, use_attachments: bool = False,
+    images_exclude_pattern: str = "", fast_io: bool = False, validate_notebooks: bool = False
+) -> None:
+    """Replace images in every notebook in the work directory matching the prescribed pattern."""
+    image_optimizer = image_optimizer_from_options(optimize_images, max_image_dimension, image_format, image_quality)
+    conversion_cache = conversion_cache_from_options(conversion_cache_directory, conversion_cache_size)
+
+    process_notebooks(
+        work_dir, nb_pattern,
+        ReplaceImagesInMarkdownStage(
+            work_dir, nb_pattern, conversion_jobs, conversion_timeout, conversion_cache, max_image_size,
+            image_optimizer, use_attachments, images_exclude_pattern),
+        jobs, manifest_directory, fast_io, validate_notebooks)
+
+    save_conversion_cache(conversion_cache)
+
+
+def image_optimizer_from_options(
+    optimize_images: bool, max_image_dimension: int | None, image_format: str, image_quality: int
+) -> ImageOptimizer | None:
+    """Return the image optimizer if images are to be optimized, or None otherwise."""
+    if optimize_images:
+        return ImageOptimizer(max_image_dimension, image_format, int(image_quality))
+    else:
+        return None
+
+
+def conversion_cache_from_options(
+    conversion_cache_directory: str | None, conversion_cache_size: int
+) -> ConversionCache | None:
+    """Return the image conversion cache if its directory is provided, or None otherwise."""
+    if conversion_cache_directory is not None:
+        return ConversionCache(conversion_cache_directory, int(conversion_cache_size))
+    else:
+        return None
+
+
+def save_conversion_cache(conversion_cache: ConversionCache | None) -> None:
+    """Save the image conversion cache, if any, and print its hits, misses and saved bytes."""
+    if conversion_cache is not None:
+        conversion_cache.save()
+        print(
+            f"Image conversion cache: {conversion_cache.hits} hit(s), {conversion_cache.misses} miss(es), "
+            + f"{conversion_cache.bytes_saved} byte(s) saved")
+
+
+def add_replace_images_in_markdown_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the command line options of image conversion, optimization and replacement."""
+    parser.add_argument(
+        "--conversion-jobs", default="1",
+        help="Number of concurrent image conversions, or auto to use all available CPUs")
+    parser.add_argument(
+        "--conversion-timeout", default=None, type=float,
+        help="Time (in seconds) after which an image conversion fails")
+    parser.add_argument(
+        "--conversion-cache-directory", default=None, help="Directory storing the images converted by previous runs")
+    parser.add_argument(
+        "--conversion-cache-size", default=CONVERSION_CACHE_SIZE,
+        help="Size (in bytes) after which least recently used converted images are evicted from the cache")
+    parser.add_argument(
+        "--max-image-size", default=None, type=int,
+        help="Size (in bytes) of the PNG image after which an image is not replaced with its base64 representation")
+    parser.add_argument(
+        "--optimize-images", action="store_true", help="Downscale and recompress images before replacing them")
+    parser.add_argument(
+        "--max-image-dimension", default=None, type=int,
+        help="Width or height (in pixels) after which an optimized image is downscaled")
+    parser.add_argument(
+        "--image-format", default="png", choices=IMAGE_OPTIMIZER_FORMATS, help="Format of optimized images")
+    parser.add_argument(
+        "--image-quality", default=IMAGE_OPTIMIZER_QUALITY, type=int,
+        help="Quality (between 0 and 100) of optimized images in a lossy format")
+    parser.add_argument(
+        "--use-attachments", action="store_true",
+        help="Store images as attachments of markdown cells, rather than inlining them in the cell source")
+    parser.add_argument(
+        "--images-exclude-pattern", default="",
+        help="Newline separated patterns of directories which are not searched for images")
 
 
 if __name__ == "__main__":  # pragma: no cover
-    assert len(sys.argv) == 3
-    __main__(*sys.argv[1:])
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("work_dir")
+    parser.add_argument("nb_pattern")
+    add_process_notebooks_arguments(parser)
+    add_replace_images_in_markdown_arguments(parser)
+    __main__(**vars(parser.parse_args()))
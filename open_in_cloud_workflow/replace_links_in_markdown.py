@@ -5,15 +5,18 @@
 # SPDX-License-Identifier: MIT
 """Replace links to local file in markdown with links to the corresponding cloud notebooks."""
 
-import copy
+import argparse
 import os
-import sys
 
 import nbformat
 
-from open_in_cloud_workflow.glob_files import glob_files
+from open_in_cloud_workflow.drive_urls_cache import DRIVE_URLS_CACHE_TTL, DriveURLsCache
 from open_in_cloud_workflow.glob_links import glob_links
+from open_in_cloud_workflow.multiple_replace import MultipleReplace
+from open_in_cloud_workflow.process_notebooks import (
+    add_process_notebooks_arguments, NotebookStageBaseClass, process_notebooks)
 from open_in_cloud_workflow.publish_on import publish_on, PublishOnBaseClass, PublishOnDrive
+from open_in_cloud_workflow.relative_paths import RelativePaths
 from open_in_cloud_workflow.upload_files_to_google_drive import upload_files_to_google_drive
 
 
@@ -21,66 +24,150 @@ def replace_links_in_markdown(
     nb_cells: list[nbformat.NotebookNode], links_replacement: dict[str, str | None]
 ) -> list[nbformat.NotebookNode]:
     """Replace links to local file in markdown with links to the corresponding cloud notebooks."""
+    updated_nb_cells, _ = compile_links_replacement(links_replacement).replace_in_markdown(nb_cells)
+    return updated_nb_cells
+
+
+def compile_links_replacement(links_replacement: dict[str, str | None]) -> MultipleReplace:
+    """Compile the links replacement dictionary, so that each markdown cell is scanned only once."""
     add_quotes_or_parentheses = (
         lambda text: '"' + text + '"',
         lambda text: "'" + text + "'",
         lambda text: "(" + text + ")"
     )
-    updated_nb_cells = list()
-    for cell in nb_cells:
-        if cell.cell_type == "markdown":
-            updated_cell = copy.deepcopy(cell)
-            for (local_link, cloud_link) in links_replacement.items():
-                assert cloud_link is not None
-                for preprocess in add_quotes_or_parentheses:
-                    updated_cell.source = updated_cell.source.replace(
-                        preprocess(local_link),  # type: ignore[no-untyped-call]
-                        preprocess(cloud_link))  # type: ignore[no-untyped-call]
-            updated_nb_cells.append(updated_cell)
-        else:
-            updated_nb_cells.append(cell)
-    return updated_nb_cells
+    replacements = dict()
+    for (local_link, cloud_link) in links_replacement.items():
+        assert cloud_link is not None
+        for preprocess in add_quotes_or_parentheses:
+            replacements[preprocess(local_link)] = preprocess(cloud_link)  # type: ignore[no-untyped-call]
+    return MultipleReplace(replacements)
+
+
+class ReplaceLinksInMarkdownStage(NotebookStageBaseClass):
+    """Stage which replaces links to local file in markdown with links to the corresponding cloud notebooks."""
+
+    def __init__(self, work_dir: str, nb_pattern: str, cloud_provider: str, publisher: PublishOnBaseClass) -> None:
+        self.work_dir = work_dir
+        self.cloud_provider = cloud_provider
+        self.publisher = publisher
+        links_replacement = glob_links(work_dir, nb_pattern, cloud_provider, publisher)
+        if isinstance(publisher, PublishOnDrive):
+            # The Google Drive publisher returns cloud links equal to None for any file added by the current commit.
+            # Force an upload to obtain a valid link
+            local_files_with_none_link = [
+                os.path.relpath(local_link, work_dir)
+                for (local_link, cloud_link) in links_replacement.items() if cloud_link is None
+            ]
+            if len(local_files_with_none_link) > 0:  # pragma: no cover
+                for local_link in local_files_with_none_link:
+                    print(os.path.relpath(local_link, work_dir) + " will be created anew")
+                local_files_with_none_link_str = "\n".join(local_files_with_none_link)
+                upload_files_to_google_drive(
+                    work_dir, local_files_with_none_link_str, publisher.drive_root_directory,
+                    publisher.drive_urls_cache)
+                links_replacement.update(
+                    glob_links(work_dir, local_files_with_none_link_str, cloud_provider, publisher))
+        for (local_link, cloud_link) in links_replacement.items():
+            assert cloud_link is not None
+            print(os.path.relpath(local_link, work_dir) + " -> " + cloud_link)
+        self.links_replacement = links_replacement
+        self.relative_links = RelativePaths(work_dir, links_replacement)
+        self._compiled_links_replacement: dict[str, MultipleReplace] = dict()
+        self._compiled_relative_links: dict[str, MultipleReplace] = dict()
+
+    def update_cells(
+        self, nb_cells: list[nbformat.NotebookNode], nb_filename: str
+    ) -> tuple[list[nbformat.NotebookNode], int]:
+        """Replace links to local file in markdown, using paths relative to the notebook."""
+        nb_dirname = os.path.dirname(nb_filename)
+        if nb_dirname not in self._compiled_links_replacement:
+            # Notebooks in the same directory share the same relative paths, hence compile only once per directory
+            self._compiled_links_replacement[nb_dirname] = compile_links_replacement(
+                self._relative_links_replacement(nb_filename))
+        return self._compiled_links_replacement[nb_dirname].replace_in_markdown(nb_cells)
+
+    def get_dependencies(self, nb_filename: str, nb_content: str) -> dict[str, str]:
+        """Return the local files referenced by the notebook content, associated to their cloud links."""
+        nb_dirname = os.path.dirname(nb_filename)
+        if nb_dirname not in self._compiled_relative_links:
+            self._compiled_relative_links[nb_dirname] = MultipleReplace(self.relative_links.relative_to(nb_dirname))
+        compiled_relative_links = self._compiled_relative_links[nb_dirname]
+        return {
+            local_link: cloud_link
+            for local_link in compiled_relative_links.find(nb_content)
+            if (cloud_link := self.links_replacement[compiled_relative_links.replacements[local_link]]) is not None
+        }
+
+    def _relative_links_replacement(self, nb_filename: str) -> dict[str, str | None]:
+        """Return the links replacement dictionary, using paths relative to the notebook."""
+        return {
+            local_link: self.links_replacement[key]
+            for (local_link, key) in self.relative_links.relative_to(os.path.dirname(nb_filename)).items()
+        }
+
+    def get_name(self) -> str:
+        """Return the name of the stage, which identifies its entries in the manifest."""
+        return "replace_links_in_markdown"
+
+    def __str__(self) -> str:
+        """Print private attributes as attribute_name=attribute_value, one attribute per line."""
+        return f"""stage={self.get_name()}
+work_dir={self.work_dir}
+cloud_provider={self.cloud_provider}
+""" + str(self.publisher)
 
 
 def __main__(  # noqa: N807
-    work_dir: str, nb_pattern: str, cloud_provider: str, publisher: str | PublishOnBaseClass
+    work_dir: str, nb_pattern: str, cloud_provider: str, publisher: str | PublishOnBaseClass, jobs: int | str = 1,
+    manifest_directory: str | None = None, drive_urls_cache_file: str | None = None,
+    drive_urls_cache_ttl: float = DRIVE_URLS_CACHE_TTL, fast_io: bool = False, validate_notebooks: bool = False
 ) -> None:
     """Replace links in every notebook in the work directory matching the prescribed pattern."""
+    publisher = publisher_with_drive_urls_cache(publisher, drive_urls_cache_file, drive_urls_cache_ttl)
+
+    process_notebooks(
+        work_dir, nb_pattern, ReplaceLinksInMarkdownStage(work_dir, nb_pattern, cloud_provider, publisher), jobs,
+        manifest_directory, fast_io, validate_notebooks)
+
+    save_drive_urls_cache(publisher)
+
+
+def publisher_with_drive_urls_cache(
+    publisher: str | PublishOnBaseClass, drive_urls_cache_file: str | None, drive_urls_cache_ttl: float
+) -> PublishOnBaseClass:
+    """Convert the publisher name to a publisher, and attach the Google Drive URLs cache if provided."""
     if not isinstance(publisher, PublishOnBaseClass):  # pragma: no cover
         assert isinstance(publisher, str)
         publisher = publish_on(publisher)
+    if isinstance(publisher, PublishOnDrive) and drive_urls_cache_file is not None:
+        publisher.drive_urls_cache = DriveURLsCache(drive_urls_cache_file, float(drive_urls_cache_ttl))
+    return publisher
 
-    links_replacement = glob_links(work_dir, nb_pattern, cloud_provider, publisher)
-    if isinstance(publisher, PublishOnDrive):
-        # The Google Drive publisher returns cloud links equal to None for any file added by the current commit.
-        # Force an upload to obtain a valid link
-        local_files_with_none_link = [
-            os.path.relpath(local_link, work_dir)
-            for (local_link, cloud_link) in links_replacement.items() if cloud_link is None
-        ]
-        if len(local_files_with_none_link) > 0:  # pragma: no cover
-            for local_link in local_files_with_none_link:
-                print(os.path.relpath(local_link, work_dir) + " will be created anew")
-            local_files_with_none_link_str = "\n".join(local_files_with_none_link)
-            upload_files_to_google_drive(work_dir, local_files_with_none_link_str, publisher.drive_root_directory)
-            links_replacement.update(glob_links(work_dir, local_files_with_none_link_str, cloud_provider, publisher))
-    for (local_link, cloud_link) in links_replacement.items():
-        assert cloud_link is not None
-        print(os.path.relpath(local_link, work_dir) + " -> " + cloud_link)
 
-    for nb_filename in glob_files(work_dir, nb_pattern):
-        with open(nb_filename) as f:
-            nb = nbformat.read(f, as_version=4)  # type: ignore[no-untyped-call]
-        nb_dirname = os.path.dirname(nb_filename)
-        nb_links_replacement = {
-            os.path.relpath(os.path.join(work_dir, key), nb_dirname): value
-            for key, value in links_replacement.items()
-        }
-        nb.cells = replace_links_in_markdown(nb.cells, nb_links_replacement)
-        with open(nb_filename, "w") as f:
-            nbformat.write(nb, f)  # type: ignore[no-untyped-call]
+def save_drive_urls_cache(publisher: PublishOnBaseClass) -> None:
+    """Save the Google Drive URLs cache attached to the publisher, if any, and print its hits and misses."""
+    if isinstance(publisher, PublishOnDrive) and publisher.drive_urls_cache is not None:
+        publisher.drive_urls_cache.save()
+        print(
+            f"Google Drive URLs cache: {publisher.drive_urls_cache.hits} hit(s), "
+            + f"{publisher.drive_urls_cache.misses} miss(es)")
+
+
+def add_drive_urls_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the command line options of the Google Drive URLs cache."""
+    parser.add_argument(
+        "--drive-urls-cache-file", default=None, help="File storing the Google Drive URLs obtained by previous runs")
+    parser.add_argument(
+        "--drive-urls-cache-ttl", default=DRIVE_URLS_CACHE_TTL,
+        help="Time (in seconds) after which a cached Google Drive URL is obtained again")
 
 
 if __name__ == "__main__":  # pragma: no cover
-    assert len(sys.argv) == 5
-    __main__(*sys.argv[1:])
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("work_dir")
+    parser.add_argument("nb_pattern")
+    parser.add_argument("cloud_provider")
+    parser.add_argument("publisher")
+    add_process_notebooks_arguments(parser)
+    add_drive_urls_cache_arguments(parser)
+    __main__(**vars(parser.parse_args()))
@@ -5,21 +5,33 @@
 # SPDX-License-Identifier: MIT
 """Upload all files matching at least one pattern to Google Drive."""
 
+import os
 import subprocess
 import sys
 
+from open_in_cloud_workflow.drive_urls_cache import DriveURLsCache
 from open_in_cloud_workflow.get_rclone_env import get_rclone_env
+from open_in_cloud_workflow.glob_files import glob_files
 from open_in_cloud_workflow.publish_on import publish_on, PublishOnDrive
 
 
-def upload_files_to_google_drive(work_dir: str, pattern: str, drive_root_directory: str) -> None:
-    """Upload all files matching at least one pattern to Google Drive."""
+def upload_files_to_google_drive(
+    work_dir: str, pattern: str, drive_root_directory: str, drive_urls_cache: DriveURLsCache | None = None
+) -> None:
+    """
+    Upload all files matching at least one pattern to Google Drive.
+
+    If provided, the cached URLs of the uploaded files are discarded, since files may have been created anew.
+    """
     subprocess.check_call(
         (
             f"rclone -q sync {work_dir} drive:{drive_root_directory} "
             + " ".join(f"--include {pattern_}" for pattern_ in pattern.strip("\n").split("\n"))
         ).split(" "),
         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=get_rclone_env())
+    if drive_urls_cache is not None:
+        drive_urls_cache.invalidate(
+            drive_root_directory, [os.path.relpath(f, work_dir) for f in glob_files(work_dir, pattern)])
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -327,3 +327,20 @@ except ImportError:
     !pip3 install kaleido
     import kaleido"""
         assert updated_nb.cells[1] == nb.cells[0]
+
+
+def test_add_installation_cells_similar_package_name() -> None:
+    """Test that no installation cell is added for a package whose name is a prefix of the imported one."""
+    nb_cells = [nbformat.v4.new_code_cell("import numpy_financial\nimport scipy.linalg as la")]  # type: ignore[no-untyped-call]
+    updated_cells, new_cells_position = add_installation_cells(nb_cells, "colab", "", "numpy\nscipy")
+    assert new_cells_position == [0]
+    assert updated_cells[0].id == "scipy_install"
+
+
+def test_add_installation_cells_shares_original_cells() -> None:
+    """Test that original cells are shared with the updated notebook, and that the input list is not modified."""
+    nb_cells = [nbformat.v4.new_code_cell("import numpy")]  # type: ignore[no-untyped-call]
+    updated_cells, new_cells_position = add_installation_cells(nb_cells, "colab", "", "numpy")
+    assert new_cells_position == [0]
+    assert len(nb_cells) == 1
+    assert updated_cells[1] is nb_cells[0]
@@ -0,0 +1,110 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.conversion_cache package."""
+
+import os
+import shutil
+import tempfile
+
+from open_in_cloud_workflow.conversion_cache import ConversionCache
+from open_in_cloud_workflow.convert_images import convert_images
+from open_in_cloud_workflow.image_converters import get_image_converter
+from open_in_cloud_workflow.image_to_base64 import image_to_base64
+
+
+def _black_png(root_directory: str) -> str:
+    """Return the path of the black PNG image used as a mock conversion result."""
+    return os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images", "black.png")
+
+
+def test_conversion_cache_store_and_restore(root_directory: str) -> None:
+    """Test that converted images stored by a previous run are restored, and that hits and misses are counted."""
+    with tempfile.TemporaryDirectory() as tmp_cache_directory, tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file = os.path.join(tmp_images_directory, "image.jpg")
+        with open(image_file, "w") as f:
+            f.write("Original image")
+        cache = ConversionCache(tmp_cache_directory, 1024 * 1024)
+        key = cache.key(image_file, ["convert"])
+        assert not cache.restore(key, os.path.join(tmp_images_directory, "image.png"))
+        cache.store(key, _black_png(root_directory))
+        cache.save()
+
+        cache = ConversionCache(tmp_cache_directory, 1024 * 1024)
+        assert cache.restore_base64(image_file) is None
+        assert cache.restore(cache.key(image_file, ["convert"]), os.path.join(tmp_images_directory, "image.png"))
+        assert cache.restore_base64(image_file) == image_to_base64(_black_png(root_directory))
+        assert cache.hits == 1
+        assert cache.misses == 0
+        assert cache.bytes_saved == os.path.getsize(_black_png(root_directory))
+
+
+def test_conversion_cache_key() -> None:
+    """Test that the key changes with the content of the original image and with the conversion commands."""
+    with tempfile.TemporaryDirectory() as tmp_cache_directory, tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file = os.path.join(tmp_images_directory, "image.jpg")
+        with open(image_file, "w") as f:
+            f.write("Original image")
+        cache = ConversionCache(tmp_cache_directory, 1024 * 1024)
+        key = cache.key(image_file, ["convert"])
+        assert cache.key(image_file, ["convert"]) == key
+        assert cache.key(image_file, ["inkscape"]) != key
+        with open(image_file, "w") as f:
+            f.write("Updated image")
+        assert cache.key(image_file, ["convert"]) != key
+
+
+def test_conversion_cache_eviction(root_directory: str) -> None:
+    """Test that least recently used entries are evicted when the cache exceeds its size."""
+    with tempfile.TemporaryDirectory() as tmp_cache_directory:
+        cache = ConversionCache(tmp_cache_directory, 1024 * 1024)
+        for key in ("first", "second", "third"):
+            cache.store(key, _black_png(root_directory))
+        entry_size = cache.entries["first"]["size"]
+        cache.entries["first"]["last_used"] = 3
+        cache.entries["second"]["last_used"] = 1
+        cache.entries["third"]["last_used"] = 2
+        cache.max_size = int(2 * entry_size)
+        cache.save()
+        assert set(cache.entries) == {"first", "third"}
+        assert sorted(os.listdir(os.path.join(tmp_cache_directory, "objects"))) == [
+            "first.base64", "first.png", "third.base64", "third.png"]
+        assert set(ConversionCache(tmp_cache_directory, 1024 * 1024).entries) == {"first", "third"}
+
+
+def test_conversion_cache_convert_images(root_directory: str) -> None:
+    """Test that convert_images restores cached images, replacing stale PNG images left by previous conversions."""
+    with tempfile.TemporaryDirectory() as tmp_cache_directory, tempfile.TemporaryDirectory() as tmp_images_directory:
+        # This is not a valid image, hence any conversion would fail
+        image_file = os.path.join(tmp_images_directory, "image.jpg")
+        with open(image_file, "w") as f:
+            f.write("Original image")
+        image_file_png = os.path.join(tmp_images_directory, "image.png")
+        with open(image_file_png, "w") as f:
+            f.write("Stale image")
+        image_converter = get_image_converter(".jpg")
+        assert image_converter is not None
+        cache = ConversionCache(tmp_cache_directory, 1024 * 1024)
+        cache.store(cache.key(image_file, image_converter.describe(".jpg")), _black_png(root_directory))
+        assert convert_images([image_file], conversion_cache=cache) == {image_file: image_file_png}
+        with open(image_file_png, "rb") as f, open(_black_png(root_directory), "rb") as g:
+            assert f.read() == g.read()
+        assert cache.hits == 1
+
+
+def test_conversion_cache_convert_images_store(root_directory: str) -> None:
+    """Test that convert_images stores converted images, so that they are restored by the next conversion."""
+    images_directory = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images")
+    with tempfile.TemporaryDirectory() as tmp_cache_directory, tempfile.TemporaryDirectory() as tmp_images_directory:
+        red = os.path.join(tmp_images_directory, "red.jpg")
+        shutil.copyfile(os.path.join(images_directory, "red.jpg"), red)
+        cache = ConversionCache(tmp_cache_directory, 1024 * 1024)
+        convert_images([red], conversion_cache=cache)
+        assert cache.misses == 1
+        assert len(cache.entries) == 1
+        os.remove(red.replace(".jpg", ".png"))
+        convert_images([red], conversion_cache=cache)
+        assert cache.hits == 1
+        assert os.path.isfile(red.replace(".jpg", ".png"))
@@ -0,0 +1,48 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.convert_images package."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from open_in_cloud_workflow.convert_images import convert_images
+
+
+def test_convert_images_png(root_directory: str) -> None:
+    """Test that PNG images are associated to themselves."""
+    black = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images", "black.png")
+    assert convert_images([black]) == {black: black}
+
+
+def test_convert_images_existing_png(root_directory: str) -> None:
+    """Test that conversion is skipped when a PNG image with the same name already exists."""
+    images_directory = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images")
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        red = os.path.join(tmp_images_directory, "red.jpg")
+        red_png = os.path.join(tmp_images_directory, "red.png")
+        shutil.copyfile(os.path.join(images_directory, "red.jpg"), red)
+        shutil.copyfile(os.path.join(images_directory, "black.png"), red_png)
+        assert convert_images([red]) == {red: red_png}
+        with open(red_png, "rb") as f, open(os.path.join(images_directory, "black.png"), "rb") as g:
+            assert f.read() == g.read()
+
+
+@pytest.mark.parametrize("jobs", [1, 2, "auto"])
+def test_convert_images_failures_reported_per_image(jobs: int | str) -> None:
+    """Test that a failed conversion does not prevent converting the remaining images, and that it is reported."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        invalid_images = [os.path.join(tmp_images_directory, f"invalid{i}.jpg") for i in range(2)]
+        for invalid_image in invalid_images:
+            with open(invalid_image, "w") as f:
+                f.write("This is not an image")
+        with pytest.raises(RuntimeError) as excinfo:
+            convert_images(invalid_images, jobs, timeout=60)
+        assert "Image conversion failed for 2 image(s)" in str(excinfo.value)
+        for invalid_image in invalid_images:
+            assert invalid_image in str(excinfo.value)
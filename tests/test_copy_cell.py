@@ -0,0 +1,22 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.copy_cell package."""
+
+import nbformat
+
+from open_in_cloud_workflow.copy_cell import copy_cell
+
+
+def test_copy_cell() -> None:
+    """Test that the copy has the updated fields, and shares every other field with the original cell."""
+    cell = nbformat.v4.new_code_cell("a = 1")  # type: ignore[no-untyped-call]
+    cell.outputs = [nbformat.v4.new_output("stream", text="Large output")]  # type: ignore[no-untyped-call]
+    updated_cell = copy_cell(cell, source="a = 2")
+    assert isinstance(updated_cell, nbformat.NotebookNode)
+    assert updated_cell.source == "a = 2"
+    assert cell.source == "a = 1"
+    assert updated_cell.outputs is cell.outputs
+    assert updated_cell.metadata is cell.metadata
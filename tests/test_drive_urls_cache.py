@@ -0,0 +1,70 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.drive_urls_cache package."""
+
+import os
+import tempfile
+import time
+
+from open_in_cloud_workflow.drive_urls_cache import DriveURLsCache
+from open_in_cloud_workflow.publish_on import PublishOnDrive
+
+
+def test_drive_urls_cache_hits_and_misses() -> None:
+    """Test that URLs are cached per root directory, and that hits and misses are counted."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        cache = DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60)
+        assert cache.get("root", "file.ipynb") is None
+        cache.set("root", "file.ipynb", "https://drive.google.com/open?id=1")
+        assert cache.get("root", "file.ipynb") == "https://drive.google.com/open?id=1"
+        assert cache.get("other_root", "file.ipynb") is None
+        assert cache.hits == 1
+        assert cache.misses == 2
+
+
+def test_drive_urls_cache_save_and_load() -> None:
+    """Test that URLs stored by a previous run are available to the next run."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        cache = DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60)
+        cache.set("root", "file.ipynb", "https://drive.google.com/open?id=1")
+        cache.save()
+        cache = DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60)
+        assert cache.get("root", "file.ipynb") == "https://drive.google.com/open?id=1"
+
+
+def test_drive_urls_cache_ttl() -> None:
+    """Test that expired URLs are not returned, and are not saved."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        cache = DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60)
+        cache.set("root", "file.ipynb", "https://drive.google.com/open?id=1")
+        cache.entries["root"]["file.ipynb"] = ("https://drive.google.com/open?id=1", time.time() - 120)
+        assert cache.get("root", "file.ipynb") is None
+        cache.save()
+        assert DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60).entries == {"root": {}}
+
+
+def test_drive_urls_cache_invalidate() -> None:
+    """Test that invalidated URLs are not returned anymore."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        cache = DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60)
+        cache.set("root", "file.ipynb", "https://drive.google.com/open?id=1")
+        cache.set("root", "other_file.ipynb", "https://drive.google.com/open?id=2")
+        cache.invalidate("root", ["file.ipynb", "missing_file.ipynb"])
+        assert cache.get("root", "file.ipynb") is None
+        assert cache.get("root", "other_file.ipynb") == "https://drive.google.com/open?id=2"
+
+
+def test_drive_urls_cache_publish_on_drive() -> None:
+    """Test that the Google Drive publisher does not run rclone for files whose URL is cached."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        cache = DriveURLsCache(os.path.join(tmp_directory, "cache.json"), 60)
+        cache.set("root", "file.ipynb", "https://drive.google.com/open?id=1")
+        publisher = PublishOnDrive("root", cache)
+        assert publisher.get_url("colab", "file.ipynb") == "https://colab.research.google.com/drive/1"
+        assert publisher.get_url("kaggle", "file.ipynb") == (
+            "https://kaggle.com/kernels/welcome?src=https://drive.google.com/uc?id=1")
+        assert publisher.drive_urls is None
+        assert cache.hits == 2
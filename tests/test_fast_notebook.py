@@ -0,0 +1,159 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.fast_notebook package."""
+
+import json
+import os
+import shutil
+import tempfile
+
+import nbformat
+import pytest
+
+import open_in_cloud_workflow.fast_notebook
+from open_in_cloud_workflow.add_installation_cells import AddInstallationCellsStage
+from open_in_cloud_workflow.fast_notebook import FastNotebook
+from open_in_cloud_workflow.glob_files import glob_files
+from open_in_cloud_workflow.process_notebooks import process_notebooks
+
+
+def test_fast_notebook_round_trip(root_directory: str) -> None:
+    """Test that writing back a notebook which was not updated returns exactly the original content."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_filenames = glob_files(data_directory, os.path.join("**", "*.ipynb"))
+    assert len(nb_filenames) > 0
+    for nb_filename in nb_filenames:
+        with open(nb_filename) as f:
+            nb_content = f.read()
+        fast_nb = FastNotebook(nb_content)
+        assert all(isinstance(cell.source, str) for cell in fast_nb.cells)
+        assert fast_nb.writes() == nb_content
+
+
+def test_fast_notebook_without_orjson(root_directory: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that notebooks are parsed with the json module when orjson is not available."""
+    monkeypatch.setattr(open_in_cloud_workflow.fast_notebook, "has_orjson", False)
+    with open(os.path.join(root_directory, "tests", "data", "add_installation_cells", "import_numpy.ipynb")) as f:
+        nb_content = f.read()
+    fast_nb = FastNotebook(nb_content)
+    assert fast_nb.nb == json.loads(nb_content)
+    assert fast_nb.writes() == nb_content
+
+
+def test_fast_notebook_preserves_formatting() -> None:
+    """Test that indentation, key order and line splitting of unchanged cells are preserved."""
+    nb_content = json.dumps({
+        "nbformat": 4, "nbformat_minor": 5, "metadata": {},
+        "cells": [
+            {"source": ["first line", "\n", "second line"], "cell_type": "markdown", "id": "unchanged", "metadata": {}},
+            {"source": "Link", "cell_type": "markdown", "id": "updated", "metadata": {}}
+        ]
+    }, indent=2)
+    fast_nb = FastNotebook(nb_content)
+    assert fast_nb.cells[0].source == "first line\nsecond line"
+    fast_nb.cells[1] = nbformat.v4.new_markdown_cell("Updated\nlink")  # type: ignore[no-untyped-call]
+    fast_nb.cells[1].id = "updated"
+    updated_nb_content = fast_nb.writes()
+    assert not updated_nb_content.endswith("\n")
+    assert updated_nb_content.startswith('{\n  "nbformat": 4,\n  "nbformat_minor": 5,')
+    updated_nb = json.loads(updated_nb_content)
+    assert list(updated_nb["cells"][0]) == ["source", "cell_type", "id", "metadata"]
+    assert updated_nb["cells"][0]["source"] == ["first line", "\n", "second line"]
+    assert list(updated_nb["cells"][1]) == ["cell_type", "id", "metadata", "source"]
+    assert updated_nb["cells"][1]["source"] == ["Updated\n", "link"]
+
+
+def test_fast_notebook_validate(root_directory: str) -> None:
+    """Test that validation is carried out only when requested."""
+    with open(os.path.join(root_directory, "tests", "data", "add_installation_cells", "import_numpy.ipynb")) as f:
+        fast_nb = FastNotebook(f.read())
+    fast_nb.validate()
+    fast_nb.cells[0].cell_type = "invalid"
+    fast_nb.writes()
+    with pytest.raises(nbformat.ValidationError):
+        fast_nb.validate()
+
+
+def test_process_notebooks_fast_io_same_as_nbformat(root_directory: str) -> None:
+    """Test that notebooks processed with fast notebook I/O are the same as the ones processed with nbformat."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_pattern = os.path.join("add_installation_cells", "*.ipynb")
+    stage = AddInstallationCellsStage("colab", "mpi4py", "numpy\nscipy\npython-dateutil$dateutil")
+
+    with (
+        tempfile.TemporaryDirectory(dir=data_directory) as tmp_nbformat_directory,
+        tempfile.TemporaryDirectory(dir=data_directory) as tmp_fast_io_directory
+    ):
+        for tmp_data_directory in (tmp_nbformat_directory, tmp_fast_io_directory):
+            shutil.copytree(
+                os.path.join(data_directory, "add_installation_cells"),
+                os.path.join(tmp_data_directory, "add_installation_cells"))
+        process_notebooks(tmp_nbformat_directory, nb_pattern, stage)
+        process_notebooks(tmp_fast_io_directory, nb_pattern, stage, fast_io=True, validate_notebooks=True)
+        for nb_filename in os.listdir(os.path.join(data_directory, "add_installation_cells")):
+            with open(os.path.join(tmp_nbformat_directory, "add_installation_cells", nb_filename)) as f:
+                nbformat_content = f.read()
+            with open(os.path.join(tmp_fast_io_directory, "add_installation_cells", nb_filename)) as f:
+                fast_io_content = f.read()
+            assert fast_io_content == nbformat_content
+
+
+def test_process_notebooks_fast_io_skips_unchanged(root_directory: str) -> None:
+    """Test that notebooks which are not updated by the stage are not written with fast notebook I/O."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_pattern = os.path.join("add_installation_cells", "*.ipynb")
+    stage = AddInstallationCellsStage("colab", "", "")
+
+    with tempfile.TemporaryDirectory(dir=data_directory) as tmp_data_directory:
+        shutil.copytree(
+            os.path.join(data_directory, "add_installation_cells"),
+            os.path.join(tmp_data_directory, "add_installation_cells"))
+        nb_filenames = glob_files(tmp_data_directory, nb_pattern)
+        for nb_filename in nb_filenames:
+            os.utime(nb_filename, ns=(0, 0))
+        process_notebooks(tmp_data_directory, nb_pattern, stage, fast_io=True)
+        assert all(os.stat(nb_filename).st_mtime_ns == 0 for nb_filename in nb_filenames)
+
+
+def test_process_notebooks_fast_io_upgrades_to_cell_ids() -> None:
+    """Test that notebooks stored in nbformat 4.4 are upgraded to nbformat 4.5 once a cell with an id is inserted."""
+    nb_content = json.dumps({
+        "nbformat": 4, "nbformat_minor": 4, "metadata": {},
+        "cells": [
+            {"cell_type": "code", "execution_count": None, "metadata": {}, "outputs": [], "source": ["import numpy"]}]
+    }, indent=1) + "\n"
+    stage = AddInstallationCellsStage("colab", "", "numpy")
+
+    updated_nbs = list()
+    for fast_io in (False, True):
+        with tempfile.TemporaryDirectory() as tmp_data_directory:
+            with open(os.path.join(tmp_data_directory, "nb.ipynb"), "w") as f:
+                f.write(nb_content)
+            process_notebooks(tmp_data_directory, "*.ipynb", stage, fast_io=fast_io, validate_notebooks=fast_io)
+            with open(os.path.join(tmp_data_directory, "nb.ipynb")) as f:
+                updated_nb = json.load(f)
+        nbformat.validate(updated_nb)
+        assert updated_nb["nbformat_minor"] == 5
+        assert updated_nb["cells"][0]["id"] == "numpy_install"
+        assert len(updated_nb["cells"][1]["id"]) == 8
+        # The id of the cells which were read from the notebook is random
+        del updated_nb["cells"][1]["id"]
+        updated_nbs.append(updated_nb)
+    assert updated_nbs[0] == updated_nbs[1]
+
+
+def test_fast_notebook_no_upgrade_without_cell_ids() -> None:
+    """Test that notebooks stored in nbformat 4.4 are not upgraded when no cell has an id."""
+    nb_content = json.dumps({
+        "nbformat": 4, "nbformat_minor": 4, "metadata": {},
+        "cells": [{"cell_type": "markdown", "metadata": {}, "source": ["Text"]}]
+    }, indent=1) + "\n"
+    fast_nb = FastNotebook(nb_content)
+    fast_nb.cells[0] = nbformat.v4.new_markdown_cell("Updated text")  # type: ignore[no-untyped-call]
+    del fast_nb.cells[0]["id"]
+    updated_nb = json.loads(fast_nb.writes())
+    assert updated_nb["nbformat_minor"] == 4
+    assert "id" not in updated_nb["cells"][0]
@@ -0,0 +1,136 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.file_index package."""
+
+import glob
+import os
+import shutil
+import tempfile
+import typing
+import warnings
+
+import pytest
+
+from open_in_cloud_workflow.file_index import FileIndex, get_file_index
+
+
+@pytest.mark.parametrize("pattern", [
+    os.path.join("**", "*.ipynb"),
+    os.path.join("**", "*.png"),
+    os.path.join("replace_images_in_markdown", "*.ipynb"),
+    os.path.join("replace_images_in_markdown", "**", "*.[ps][nv]g"),
+    os.path.join("*", "images", "?lue.*"),
+    os.path.join("*", "[!r]*.ipynb"),
+    os.path.join("replace_images_in_markdown", "**"),
+    "*"
+])
+def test_file_index_agrees_with_glob(root_directory: str, pattern: str) -> None:
+    """Test that patterns matched against the index return the same files as a recursive glob."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    expected = {
+        path.removesuffix(os.sep) for path in glob.glob(os.path.join(data_directory, pattern), recursive=True)}
+    assert FileIndex(data_directory).glob(pattern) == sorted(expected)
+
+
+@pytest.mark.parametrize("pattern", ["*" + os.sep, os.path.join("**", "")])
+def test_file_index_trailing_separator(root_directory: str, pattern: str) -> None:
+    """Test that patterns with a trailing separator match directories only, as in a recursive glob."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    expected = glob.glob(os.path.join(data_directory, pattern), recursive=True)
+    assert os.path.join(data_directory, "replace_images_in_markdown", "") in expected
+    assert FileIndex(data_directory).glob(pattern) == sorted(expected)
+
+
+@pytest.mark.parametrize("pattern", ["x[[]1].ipynb", "x[[&~|]1].ipynb", "x[!&]1].ipynb", "x[^&]1].ipynb"])
+def test_file_index_character_class_special_characters(pattern: str) -> None:
+    """Test that characters denoting nested sets or set operations in regular expressions are literal in a class."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        for filename in ("x[1].ipynb", "x&1].ipynb", "x1.ipynb"):
+            open(os.path.join(tmp_directory, filename), "w").close()
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            files = FileIndex(tmp_directory).glob(pattern)
+        assert files == sorted(glob.glob(os.path.join(tmp_directory, pattern)))
+        assert len(files) > 0
+
+
+def test_file_index_double_star_only(root_directory: str) -> None:
+    """Test that a pattern made of a double star only matches every file and directory in the work directory."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    expected = {path.removesuffix(os.sep) for path in glob.glob(os.path.join(data_directory, "**"), recursive=True)}
+    # The recursive glob also returns the work directory itself, which is not stored in the index
+    expected.remove(data_directory)
+    assert FileIndex(data_directory).glob("**") == sorted(expected)
+
+
+def test_file_index_multiple_patterns_sorted(root_directory: str) -> None:
+    """Test that files matching several patterns are returned once, in sorted order."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    files = FileIndex(data_directory).glob(
+        os.path.join("**", "*.txt") + "\n" + os.path.join("**", "*.ipynb") + "\n" + os.path.join("*", "*.txt"))
+    assert files == sorted(files)
+    assert len(files) == len(set(files))
+    assert os.path.join(data_directory, "upload_file_to_google_drive", "new_file.txt") in files
+
+
+def test_file_index_refresh() -> None:
+    """Test that the shared index lists again only directories which changed, and skips hidden files."""
+    with tempfile.TemporaryDirectory() as tmp_work_directory:
+        os.makedirs(os.path.join(tmp_work_directory, "unchanged"))
+        os.makedirs(os.path.join(tmp_work_directory, "changed"))
+        for filename in (os.path.join("unchanged", "a.txt"), os.path.join("changed", "b.txt"), ".hidden.txt"):
+            with open(os.path.join(tmp_work_directory, filename), "w") as f:
+                f.write("Content")
+        file_index = get_file_index(tmp_work_directory)
+        assert file_index.glob(os.path.join("**", "*.txt")) == [
+            os.path.join(tmp_work_directory, "changed", "b.txt"),
+            os.path.join(tmp_work_directory, "unchanged", "a.txt")]
+        unchanged_listing = file_index.directories["unchanged"]
+        with open(os.path.join(tmp_work_directory, "changed", "c.txt"), "w") as f:
+            f.write("Content")
+        os.makedirs(os.path.join(tmp_work_directory, "new"))
+        with open(os.path.join(tmp_work_directory, "new", "d.txt"), "w") as f:
+            f.write("Content")
+        # Force a different modification time, in case the file system has a coarse time resolution
+        for directory in ("", "changed"):
+            os.utime(os.path.join(tmp_work_directory, directory), ns=(0, 0))
+        assert get_file_index(tmp_work_directory) is file_index
+        assert file_index.directories["unchanged"] is unchanged_listing
+        assert file_index.glob(os.path.join("**", "*.txt")) == [
+            os.path.join(tmp_work_directory, "changed", "b.txt"),
+            os.path.join(tmp_work_directory, "changed", "c.txt"),
+            os.path.join(tmp_work_directory, "new", "d.txt"),
+            os.path.join(tmp_work_directory, "unchanged", "a.txt")]
+        shutil.rmtree(os.path.join(tmp_work_directory, "new"))
+        os.utime(tmp_work_directory, ns=(1, 1))
+        file_index.refresh()
+        assert "new" not in file_index.directories
+        assert file_index.glob(os.path.join("**", "*.txt")) == [
+            os.path.join(tmp_work_directory, "changed", "b.txt"),
+            os.path.join(tmp_work_directory, "changed", "c.txt"),
+            os.path.join(tmp_work_directory, "unchanged", "a.txt")]
+
+
+def test_file_index_exclude_pattern(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that directories matching the exclusion patterns are pruned from the walk, and never listed."""
+    with tempfile.TemporaryDirectory() as tmp_work_directory:
+        for subdirectory in ("images", os.path.join("node_modules", "package"), os.path.join("docs", "build")):
+            os.makedirs(os.path.join(tmp_work_directory, subdirectory))
+        listed_directories = list()
+        scandir = os.scandir
+
+        def recording_scandir(path: str) -> typing.Any:  # noqa: ANN401
+            """List the directory, and record its path."""
+            listed_directories.append(os.path.relpath(path, tmp_work_directory))
+            return scandir(path)
+
+        with monkeypatch.context() as context:
+            context.setattr(os, "scandir", recording_scandir)
+            file_index = get_file_index(tmp_work_directory, "node_modules\ndocs/build")
+        assert sorted(listed_directories) == [".", "docs", "images"]
+        assert sorted(file_index.directories) == ["", "docs", "images"]
+        assert get_file_index(tmp_work_directory) is not file_index
+        assert "node_modules" in get_file_index(tmp_work_directory).directories
@@ -10,7 +10,7 @@ import tempfile
 
 import pytest
 
-from open_in_cloud_workflow.get_colab_drive_url import get_colab_drive_url
+from open_in_cloud_workflow.get_colab_drive_url import drive_url_to_colab_url, get_colab_drive_url
 
 
 @pytest.mark.skipif("RCLONE_CONFIG_DRIVE_TOKEN" not in os.environ, reason="Missing rclone environment variables")
@@ -32,3 +32,16 @@ def test_get_drive_url_new(root_directory: str) -> None:
         relative_path = os.path.relpath(tmp.name, root_directory)
         url = get_colab_drive_url(relative_path, "GitHub/open_in_colab_workflow")
         assert url is None
+
+
+def test_get_colab_drive_url_listed() -> None:
+    """Test Google Colab URL for a file which was found while listing the root directory on Google Drive."""
+    drive_urls = {"listed_file.txt": "https://drive.google.com/open?id=listed_file_id"}
+    url = get_colab_drive_url("listed_file.txt", "GitHub/open_in_colab_workflow", drive_urls)
+    assert url == "https://colab.research.google.com/drive/listed_file_id"
+
+
+def test_drive_url_to_colab_url() -> None:
+    """Test conversion of a Google Drive URL to the corresponding Google Colab URL."""
+    url = drive_url_to_colab_url("https://drive.google.com/open?id=file_id")
+    assert url == "https://colab.research.google.com/drive/file_id"
@@ -32,3 +32,10 @@ def test_get_drive_url_new(root_directory: str) -> None:
         relative_path = os.path.relpath(tmp.name, root_directory)
         url = get_drive_url(relative_path, "GitHub/open_in_colab_workflow")
         assert url is None
+
+
+def test_get_drive_url_listed() -> None:
+    """Test Google Drive URL for a file which was found while listing the root directory."""
+    drive_urls = {"listed_file.txt": "https://drive.google.com/open?id=listed_file_id"}
+    url = get_drive_url("listed_file.txt", "GitHub/open_in_colab_workflow", drive_urls)
+    assert url == "https://drive.google.com/open?id=listed_file_id"
@@ -0,0 +1,29 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.get_drive_urls package."""
+
+import os
+
+import pytest
+
+from open_in_cloud_workflow.get_drive_urls import get_drive_urls
+
+
+@pytest.mark.skipif("RCLONE_CONFIG_DRIVE_TOKEN" not in os.environ, reason="Missing rclone environment variables")
+def test_get_drive_urls_existing(root_directory: str) -> None:
+    """Test Google Drive URLs obtained by listing a directory which was previously uploaded."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    absolute_path = os.path.join(data_directory, "upload_file_to_google_drive", "existing_file.txt")
+    relative_path = os.path.relpath(absolute_path, root_directory)
+    urls = get_drive_urls("GitHub/open_in_colab_workflow")
+    assert urls[relative_path] == "https://drive.google.com/open?id=1MUq5LVW4ScYDE1f1sHRi3XDupYe5jOra"
+
+
+@pytest.mark.skipif("RCLONE_CONFIG_DRIVE_TOKEN" not in os.environ, reason="Missing rclone environment variables")
+def test_get_drive_urls_new() -> None:
+    """Test Google Drive URLs obtained by listing a directory which was never uploaded."""
+    urls = get_drive_urls("GitHub/open_in_colab_workflow/this_directory_does_not_exist")
+    assert urls == {}
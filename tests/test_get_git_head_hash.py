@@ -6,8 +6,9 @@
 """Tests for the open_in_cloud_workflow.get_git_head_hash package."""
 
 import subprocess
+import tempfile
 
-from open_in_cloud_workflow.get_git_head_hash import get_git_head_hash
+from open_in_cloud_workflow.get_git_head_hash import get_git_head_hash, prefetch_git_head_hashes
 
 
 def test_get_git_head_hash() -> None:
@@ -23,3 +24,37 @@ def test_get_git_head_hash() -> None:
         "git rev-parse origin/main".split(" "),
         capture_output=True, check=True).stdout.decode("utf-8").strip("\n")[:7]
     assert head_commit == expected_head_commit
+
+
+def _commit(repo_directory: str) -> str:
+    """Add an empty commit to a local Git repository, and return the abbreviated hash of the new HEAD commit."""
+    subprocess.run(
+        "git -c user.name=test -c user.email=test commit -q --allow-empty -m commit".split(" "),
+        capture_output=True, check=True, cwd=repo_directory)
+    return subprocess.run(
+        "git rev-parse HEAD".split(" "),
+        capture_output=True, check=True, cwd=repo_directory).stdout.decode("utf-8").strip("\n")[:7]
+
+
+def test_get_git_head_hash_memoized() -> None:
+    """Test that the Git HEAD hash of a remote is obtained only once."""
+    with tempfile.TemporaryDirectory() as repo_directory:
+        subprocess.run("git init -q".split(" "), capture_output=True, check=True, cwd=repo_directory)
+        first_head_commit = _commit(repo_directory)
+        assert get_git_head_hash(repo_directory, "HEAD") == first_head_commit
+        second_head_commit = _commit(repo_directory)
+        assert second_head_commit != first_head_commit
+        assert get_git_head_hash(repo_directory, "HEAD") == first_head_commit
+
+
+def test_prefetch_git_head_hashes() -> None:
+    """Test that the Git HEAD hashes of several remotes are obtained up front."""
+    with tempfile.TemporaryDirectory() as repo_directory_1, tempfile.TemporaryDirectory() as repo_directory_2:
+        head_commits = list()
+        for repo_directory in (repo_directory_1, repo_directory_2):
+            subprocess.run("git init -q".split(" "), capture_output=True, check=True, cwd=repo_directory)
+            head_commits.append(_commit(repo_directory))
+        prefetch_git_head_hashes({(repo_directory_1, "HEAD"), (repo_directory_2, "HEAD")})
+        for (repo_directory, head_commit) in zip((repo_directory_1, repo_directory_2), head_commits):
+            _commit(repo_directory)
+            assert get_git_head_hash(repo_directory, "HEAD") == head_commit
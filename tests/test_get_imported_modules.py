@@ -0,0 +1,36 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.get_imported_modules package."""
+
+import pytest
+
+from open_in_cloud_workflow.get_imported_modules import get_imported_modules
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        ("import numpy", {"numpy"}),
+        ("import numpy as np", {"numpy"}),
+        ("from numpy import linalg", {"numpy"}),
+        ("import numpy, scipy as sp", {"numpy", "scipy"}),
+        ("import numpy.linalg as la", {"numpy", "numpy.linalg"}),
+        ("from mpl_toolkits.mplot3d import Axes3D", {"mpl_toolkits", "mpl_toolkits.mplot3d"}),
+        ("from numpy import (\n    linalg, fft)", {"numpy"}),
+        ("import numpy, \\\n    scipy", {"numpy", "scipy"}),
+        ("import os; import numpy  # import scipy", {"os", "numpy"}),
+        ("try:\n    import numpy\nexcept ImportError:\n    pass", {"numpy"}),
+        ("try: import numpy\nexcept ImportError: pass", {"numpy"}),
+        ("if True: import numpy as np", {"numpy"}),
+        ("if True: from numpy import linalg", {"numpy"}),
+        ("from . import module", set()),
+        ("import foo_bar", {"foo_bar"}),
+        ("print('this is not an import')", set())
+    ]
+)
+def test_get_imported_modules(source: str, expected: set[str]) -> None:
+    """Test detection of imported modules in several forms of import statements."""
+    assert get_imported_modules(source) == expected
@@ -10,7 +10,7 @@ import tempfile
 
 import pytest
 
-from open_in_cloud_workflow.get_kaggle_drive_url import get_kaggle_drive_url
+from open_in_cloud_workflow.get_kaggle_drive_url import drive_url_to_kaggle_url, get_kaggle_drive_url
 
 
 @pytest.mark.skipif("RCLONE_CONFIG_DRIVE_TOKEN" not in os.environ, reason="Missing rclone environment variables")
@@ -35,3 +35,16 @@ def test_get_drive_url_new(root_directory: str) -> None:
         relative_path = os.path.relpath(tmp.name, root_directory)
         url = get_kaggle_drive_url(relative_path, "GitHub/open_in_kaggle_workflow")
         assert url is None
+
+
+def test_get_kaggle_drive_url_listed() -> None:
+    """Test Kaggle URL for a file which was found while listing the root directory on Google Drive."""
+    drive_urls = {"listed_file.txt": "https://drive.google.com/open?id=listed_file_id"}
+    url = get_kaggle_drive_url("listed_file.txt", "GitHub/open_in_colab_workflow", drive_urls)
+    assert url == "https://kaggle.com/kernels/welcome?src=https://drive.google.com/uc?id=listed_file_id"
+
+
+def test_drive_url_to_kaggle_url() -> None:
+    """Test conversion of a Google Drive URL to the corresponding Kaggle URL."""
+    url = drive_url_to_kaggle_url("https://drive.google.com/open?id=file_id")
+    assert url == "https://kaggle.com/kernels/welcome?src=https://drive.google.com/uc?id=file_id"
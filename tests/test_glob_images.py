@@ -17,7 +17,8 @@ def test_glob_images(root_directory: str) -> None:
     black_base64_trail = "DUOgAAAABJRU5ErkJggg=="
     red = os.path.join(nb_directory, "images", "red.jpg")
     red_converted = red.replace(".jpg", ".png")
-    red_base64_trail = ["BJQwAAAABJRU5ErkJggg==", "tgSUMAAAAASUVORK5CYII=", "PodQAAAABJRU5ErkJggg=="]
+    red_base64_trail = [
+        "BJQwAAAABJRU5ErkJggg==", "tgSUMAAAAASUVORK5CYII=", "PodQAAAABJRU5ErkJggg==", "wjBPIAAAAASUVORK5CYII="]
     blue = os.path.join(nb_directory, "images", "blue.svg")
     blue_converted = blue.replace(".svg", ".png")
     blue_base64_trail = ["Zm1CLDAAAAAElFTkSuQmCC", "bUIsMAAAAASUVORK5CYII="]
@@ -60,3 +61,13 @@ def test_glob_images(root_directory: str) -> None:
     assert any([blue_base64_trail_ in images_as_base64[blue] for blue_base64_trail_ in blue_base64_trail])
     assert blue_converted in images_as_base64
     assert any([blue_base64_trail_ in images_as_base64[blue_converted] for blue_base64_trail_ in blue_base64_trail])
+
+
+def test_glob_images_filter(root_directory: str) -> None:
+    """Test that only the images in the provided set are transformed to their base64 representation."""
+    nb_directory = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown")
+    black = os.path.join(nb_directory, "images", "black.png")
+    black_base64_trail = "DUOgAAAABJRU5ErkJggg=="
+    images_as_base64 = glob_images(nb_directory, {black, os.path.join(nb_directory, "images", "missing.png")})
+    assert len(images_as_base64) == 1
+    assert black_base64_trail in images_as_base64[black]
@@ -0,0 +1,121 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.image_converters package."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from open_in_cloud_workflow.convert_images import convert_images
+from open_in_cloud_workflow.image_converters import (
+    get_image_converter, has_pillow, ImageConverterBaseClass, PillowImageConverter, SubprocessImageConverter)
+
+
+class CopyImageConverter(ImageConverterBaseClass):
+    """Mock backend which copies the black PNG image in place of every converted image."""
+
+    def __init__(self, black_png: str) -> None:
+        self.black_png = black_png
+        self.converted: list[str] = list()
+
+    def supports(self, extension: str) -> bool:
+        """Return whether the extension is jpg."""
+        return extension == ".jpg"
+
+    def describe(self, extension: str) -> list[str]:
+        """Return the name of the mock backend."""
+        return ["copy"]
+
+    def convert(self, image_file: str, image_file_png: str, timeout: float | None) -> str | None:
+        """Copy the black PNG image."""
+        self.converted.append(image_file)
+        shutil.copyfile(self.black_png, image_file_png)
+        return None
+
+
+def test_subprocess_image_converter_missing_executable() -> None:
+    """Test that commands whose executable is not available are discarded."""
+    converter = SubprocessImageConverter({
+        ".jpg": ["missing-executable {image_file} {image_file_png}", "cp {image_file} {image_file_png}"],
+        ".svg": ["missing-executable {image_file} {image_file_png}"]
+    })
+    assert converter.supports(".jpg")
+    assert not converter.supports(".svg")
+    assert not converter.supports(".gif")
+    assert converter.describe(".svg") == ["missing-executable {image_file} {image_file_png}"]
+
+
+def test_subprocess_image_converter_fallback() -> None:
+    """Test that commands are tried in turn, and that the errors of every command are returned if all fail."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file = os.path.join(tmp_images_directory, "image.jpg")
+        image_file_png = os.path.join(tmp_images_directory, "image.png")
+        with open(image_file, "w") as f:
+            f.write("Image")
+        converter = SubprocessImageConverter({".jpg": ["false {image_file}", "cp {image_file} {image_file_png}"]})
+        assert converter.convert(image_file, image_file_png, None) is None
+        assert os.path.isfile(image_file_png)
+        os.remove(image_file_png)
+        converter = SubprocessImageConverter({".jpg": ["false {image_file}", "false {image_file_png}"]})
+        errors = converter.convert(image_file, image_file_png, None)
+        assert errors is not None
+        assert errors.split("\n") == [
+            f"    false {image_file}: Command '['false', '{image_file}']' returned non-zero exit status 1.",
+            f"    false {image_file_png}: Command '['false', '{image_file_png}']' returned non-zero exit status 1."]
+        assert not os.path.isfile(image_file_png)
+
+
+def test_get_image_converter_order() -> None:
+    """Test that the first backend which supports the extension is returned."""
+    first_converter = SubprocessImageConverter({".jpg": ["cp {image_file} {image_file_png}"]})
+    second_converter = SubprocessImageConverter({
+        ".jpg": ["cp {image_file} {image_file_png}"], ".svg": ["cp {image_file} {image_file_png}"]})
+    assert get_image_converter(".jpg", [first_converter, second_converter]) is first_converter
+    assert get_image_converter(".svg", [first_converter, second_converter]) is second_converter
+    assert get_image_converter(".gif", [first_converter, second_converter]) is None
+
+
+def test_convert_images_custom_converter(root_directory: str) -> None:
+    """Test that convert_images uses the provided backends, and reports images which no backend supports."""
+    black_png = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images", "black.png")
+    converter = CopyImageConverter(black_png)
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file = os.path.join(tmp_images_directory, "image.jpg")
+        with open(image_file, "w") as f:
+            f.write("This is not an image")
+        assert convert_images([image_file], image_converters=[converter]) == {
+            image_file: image_file.replace(".jpg", ".png")}
+        assert converter.converted == [image_file]
+
+        svg_image_file = os.path.join(tmp_images_directory, "vector.svg")
+        with open(svg_image_file, "w") as f:
+            f.write("This is not an image")
+        with pytest.raises(RuntimeError) as excinfo:
+            convert_images([svg_image_file], image_converters=[converter])
+        assert "no converter is available for .svg images" in str(excinfo.value)
+
+
+@pytest.mark.skipif(not has_pillow, reason="Pillow is not installed")
+def test_pillow_image_converter(root_directory: str) -> None:
+    """Test that Pillow converts JPEG images within the current process."""
+    images_directory = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images")
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        red = os.path.join(tmp_images_directory, "red.jpg")
+        shutil.copyfile(os.path.join(images_directory, "red.jpg"), red)
+        converter = PillowImageConverter()
+        assert converter.supports(".jpg")
+        assert not converter.supports(".svg")
+        assert converter.convert(red, red.replace(".jpg", ".png"), None) is None
+        with open(red.replace(".jpg", ".png"), "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+        invalid = os.path.join(tmp_images_directory, "invalid.jpg")
+        with open(invalid, "w") as f:
+            f.write("This is not an image")
+        error = converter.convert(invalid, invalid.replace(".jpg", ".png"), None)
+        assert error is not None
+        assert "PIL" in error
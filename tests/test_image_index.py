@@ -0,0 +1,51 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.image_index package."""
+
+import os
+import tempfile
+
+from open_in_cloud_workflow.convert_images import convert_images
+from open_in_cloud_workflow.glob_files import glob_files
+from open_in_cloud_workflow.image_index import ImageIndex
+
+
+def test_image_index_agrees_with_glob_files(root_directory: str) -> None:
+    """Test that the index contains the same images as a recursive glob for each extension."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    image_index = ImageIndex(data_directory)
+    for extension in (".png", ".jpg", ".svg"):
+        assert image_index.image_files[extension] == set(
+            glob_files(data_directory, os.path.join("**", "*" + extension)))
+    assert image_index.all() == set(glob_files(
+        data_directory, "\n".join(os.path.join("**", "*" + extension) for extension in (".png", ".jpg", ".svg"))))
+    assert image_index.png_files() == image_index.image_files[".png"]
+
+
+def test_image_index_exclude_pattern() -> None:
+    """Test that hidden directories and directories matching the exclusion patterns are skipped."""
+    with tempfile.TemporaryDirectory() as tmp_work_directory:
+        for subdirectory in ("images", "node_modules", os.path.join("docs", "build"), ".hidden"):
+            os.makedirs(os.path.join(tmp_work_directory, subdirectory))
+            with open(os.path.join(tmp_work_directory, subdirectory, "image.png"), "w") as f:
+                f.write("Image")
+        assert ImageIndex(tmp_work_directory).all() == {
+            os.path.join(tmp_work_directory, subdirectory, "image.png")
+            for subdirectory in ("images", "node_modules", os.path.join("docs", "build"))
+        }
+        assert ImageIndex(tmp_work_directory, "node_modules\ndocs/build").all() == {
+            os.path.join(tmp_work_directory, "images", "image.png")}
+
+
+def test_convert_images_png_files() -> None:
+    """Test that the existence of PNG images is checked against the provided container, if any."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        # This is not a valid image, hence any conversion would fail
+        image_file = os.path.join(tmp_images_directory, "image.jpg")
+        with open(image_file, "w") as f:
+            f.write("This is not an image")
+        image_file_png = os.path.join(tmp_images_directory, "image.png")
+        assert convert_images([image_file], png_files={image_file_png}) == {image_file: image_file_png}
@@ -0,0 +1,148 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.image_optimizer package."""
+
+import os
+import shutil
+import tempfile
+
+import nbformat
+import pytest
+
+from open_in_cloud_workflow.glob_images import glob_images
+from open_in_cloud_workflow.image_converters import has_pillow
+from open_in_cloud_workflow.image_optimizer import ImageOptimizer
+from open_in_cloud_workflow.replace_images_in_markdown import (
+    __main__ as replace_images_in_markdown_main, ReplaceImagesInMarkdownStage)
+
+if has_pillow:
+    import PIL.Image
+
+pytestmark = pytest.mark.skipif(not has_pillow, reason="Pillow is not installed")
+
+
+def _write_gradient_png(image_file_png: str, width: int, height: int) -> None:
+    """Write a PNG image containing a gradient, stored without compression."""
+    image = PIL.Image.new("RGB", (width, height))
+    image.putdata([(x % 256, y % 256, (x + y) % 256) for y in range(height) for x in range(width)])
+    image.save(image_file_png, format="PNG", compress_level=0)
+
+
+@pytest.mark.parametrize("image_format", ["png", "jpeg", "webp"])
+def test_image_optimizer_downscale(image_format: str) -> None:
+    """Test that images are downscaled preserving their aspect ratio, and compressed with the prescribed format."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file_png = os.path.join(tmp_images_directory, "gradient.png")
+        _write_gradient_png(image_file_png, 400, 200)
+        image_file_optimized = ImageOptimizer(100, image_format).optimize(image_file_png, tmp_images_directory)
+        assert image_file_optimized.endswith("." + image_format)
+        assert os.path.getsize(image_file_optimized) < os.path.getsize(image_file_png)
+        with PIL.Image.open(image_file_optimized) as image:
+            assert image.size == (100, 50)
+            assert image.format == image_format.upper()
+
+
+def test_image_optimizer_keep_original() -> None:
+    """Test that the original PNG image is kept when the optimized image is not smaller."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file_png = os.path.join(tmp_images_directory, "pixel.png")
+        PIL.Image.new("RGB", (1, 1)).save(image_file_png, format="PNG", optimize=True)
+        image_file_optimized = ImageOptimizer(image_format="jpeg", quality=100).optimize(
+            image_file_png, tmp_images_directory)
+        assert image_file_optimized == image_file_png
+        assert os.listdir(tmp_images_directory) == ["pixel.png"]
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA", "P"])
+def test_image_optimizer_jpeg_transparency(mode: str) -> None:
+    """Test that transparent pixels are filled with white, rather than black, when optimizing images as JPEG."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file_png = os.path.join(tmp_images_directory, "transparent.png")
+        image = PIL.Image.new("RGBA", (200, 200), (0, 0, 0, 0))
+        image.paste((255, 0, 0, 255), (100, 0, 200, 200))
+        if mode == "LA":
+            image = image.convert("LA")
+        elif mode == "P":
+            image = image.convert("P")
+            image.info["transparency"] = image.getpixel((0, 0))
+        image.save(image_file_png, format="PNG", compress_level=0)
+        image_file_optimized = ImageOptimizer(image_format="jpeg").optimize(image_file_png, tmp_images_directory)
+        assert image_file_optimized.endswith(".jpeg")
+        with PIL.Image.open(image_file_optimized) as image_optimized:
+            transparent_pixel = image_optimized.getpixel((10, 10))
+            opaque_pixel = image_optimized.getpixel((190, 10))
+            assert isinstance(transparent_pixel, tuple) and isinstance(opaque_pixel, tuple)
+            assert all(channel > 250 for channel in transparent_pixel)
+            assert opaque_pixel[1] < 100
+
+
+def test_image_optimizer_invalid_options() -> None:
+    """Test that invalid options are rejected."""
+    with pytest.raises(AssertionError):
+        ImageOptimizer(0)
+    with pytest.raises(AssertionError):
+        ImageOptimizer(image_format="gif")
+    with pytest.raises(AssertionError):
+        ImageOptimizer(quality=101)
+
+
+def test_glob_images_image_optimizer(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that glob_images computes the base64 representation of optimized images, and reports their size."""
+    with tempfile.TemporaryDirectory() as tmp_images_directory:
+        image_file_png = os.path.join(tmp_images_directory, "gradient.png")
+        _write_gradient_png(image_file_png, 400, 200)
+        images_as_base64 = glob_images(tmp_images_directory, image_optimizer=ImageOptimizer(100, "webp"))
+        assert images_as_base64[image_file_png].startswith("data:image/webp;base64,")
+        assert f"gradient.png: {os.path.getsize(image_file_png)} bytes -> " in capsys.readouterr().out
+
+
+def test_replace_images_in_markdown_stage_image_optimizer(root_directory: str) -> None:
+    """Test that the stage replaces images with the base64 representation of optimized images."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb"))
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        shutil.copyfile(os.path.join(root_directory, data_subdirectory, "images", "red.jpg"), red)
+        # Provide a large image as the result of the conversion of the red one, so that conversion is skipped
+        _write_gradient_png(red.replace(".jpg", ".png"), 400, 200)
+        stage = ReplaceImagesInMarkdownStage(
+            tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"),
+            image_optimizer=ImageOptimizer(100, "jpeg"))
+        assert "image_format=jpeg" in str(stage)
+        nb_filename = os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb")
+        nb = nbformat.read(nb_filename, as_version=4)  # type: ignore[no-untyped-call]
+        updated_cells, _ = stage.update_cells(nb.cells, nb_filename)
+        assert any("data:image/jpeg;base64," in cell.source for cell in updated_cells)
+
+
+def test_replace_images_in_markdown_main_optimize_images(
+    root_directory: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that images are optimized when requested to the main function, and that reruns are skipped."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory() as tmp_manifest_directory
+    ):
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        nb_filename = os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb")
+        shutil.copyfile(os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"), nb_filename)
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        shutil.copyfile(os.path.join(root_directory, data_subdirectory, "images", "red.jpg"), red)
+        _write_gradient_png(red.replace(".jpg", ".png"), 400, 200)
+        for _ in range(2):
+            replace_images_in_markdown_main(
+                tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"),
+                manifest_directory=tmp_manifest_directory, optimize_images=True, max_image_dimension=100,
+                image_format="webp")
+        with open(nb_filename) as f:
+            assert "data:image/webp;base64," in f.read()
+        assert "1 notebook(s) skipped, 0 notebook(s) rewritten" in capsys.readouterr().out
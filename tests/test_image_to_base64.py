@@ -0,0 +1,33 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.image_to_base64 package."""
+
+import base64
+import os
+
+import pytest
+
+import open_in_cloud_workflow.image_to_base64
+from open_in_cloud_workflow.image_to_base64 import image_to_base64, image_to_base64_chunks
+
+
+def test_image_to_base64(root_directory: str) -> None:
+    """Test that a PNG image is correctly transformed to its base64 representation."""
+    black = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images", "black.png")
+    black_base64 = image_to_base64(black)
+    assert black_base64.startswith("data:image/png;base64,")
+    assert black_base64.endswith("DUOgAAAABJRU5ErkJggg==")
+
+
+@pytest.mark.parametrize("chunk_size", [3, 6, 3 * 1024])
+def test_image_to_base64_chunks(root_directory: str, chunk_size: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that encoding a PNG image one chunk at a time agrees with encoding it at once."""
+    black = os.path.join(root_directory, "tests", "data", "replace_images_in_markdown", "images", "black.png")
+    monkeypatch.setattr(open_in_cloud_workflow.image_to_base64, "IMAGE_TO_BASE64_CHUNK_SIZE", chunk_size)
+    chunks = list(image_to_base64_chunks(black))
+    assert len(chunks) == 1 + (os.path.getsize(black) + chunk_size - 1) // chunk_size
+    with open(black, "rb") as f:
+        assert "".join(chunks) == "data:image/png;base64," + base64.b64encode(f.read()).decode("utf-8")
@@ -0,0 +1,46 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.installation_plan package."""
+
+from open_in_cloud_workflow.get_fem_on_cloud_installation_cell_code import get_fem_on_cloud_installation_cell_code
+from open_in_cloud_workflow.get_git_head_hash import get_git_head_hash
+from open_in_cloud_workflow.get_pip_installation_cell_code import get_pip_installation_cell_code
+from open_in_cloud_workflow.installation_plan import InstallationPlan
+from open_in_cloud_workflow.package_spec import PackageSpec
+
+
+def test_installation_plan() -> None:
+    """Test that the installation plan contains the parsed packages and their installation cell code."""
+    installation_plan = InstallationPlan(
+        "colab", "mpi4py", "numpy\npython-dateutil$dateutil\nmatplotlib%mpl_toolkits pylab")
+    assert installation_plan.packages == [
+        PackageSpec("mpi4py", "", "", "mpi4py"), PackageSpec("numpy", "", "", "numpy"),
+        PackageSpec("python-dateutil", "", "", "dateutil"),
+        PackageSpec("matplotlib", "", "", "matplotlib", ("mpl_toolkits", "pylab"))
+    ]
+    assert installation_plan.packages_install_code == [
+        get_fem_on_cloud_installation_cell_code("colab", "mpi4py", "", "", "mpi4py", "", ""),
+        get_pip_installation_cell_code("numpy", "", "", "numpy", "", ""),
+        get_pip_installation_cell_code("python-dateutil", "", "", "dateutil", "", ""),
+        get_pip_installation_cell_code("matplotlib", "", "", "matplotlib", "", "")
+    ]
+
+
+def test_installation_plan_empty() -> None:
+    """Test the installation plan when no package is provided."""
+    installation_plan = InstallationPlan("colab", "", "")
+    assert installation_plan.packages == []
+    assert installation_plan.packages_install_code == []
+
+
+def test_installation_plan_current_commit() -> None:
+    """Test that the installation plan resolves the current commit of FEM on Cloud and pip packages."""
+    installation_plan = InstallationPlan("colab", "gmsh@current", "numpy@https://github.com/numpy/numpy.git@current")
+    fem_on_cloud_head_commit = get_git_head_hash(
+        "https://github.com/fem-on-colab/fem-on-colab.github.io.git", "gh-pages")
+    pip_head_commit = get_git_head_hash("https://github.com/numpy/numpy.git", "HEAD")
+    assert f"/raw/{fem_on_cloud_head_commit}/releases/" in installation_plan.packages_install_code[0]
+    assert f"numpy.git@{pip_head_commit}" in installation_plan.packages_install_code[1]
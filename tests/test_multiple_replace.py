@@ -0,0 +1,73 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.multiple_replace package."""
+
+import nbformat
+
+from open_in_cloud_workflow.multiple_replace import MultipleReplace
+
+
+def test_multiple_replace_longest_first() -> None:
+    """Test that the longest substring is replaced when several ones start at the same position."""
+    multiple_replace = MultipleReplace({"a.png": "A", "a.png.png": "B", "sub/a.png": "C"})
+    assert multiple_replace.replace("a.png a.png.png sub/a.png") == ("A B C", 3)
+
+
+def test_multiple_replace_find() -> None:
+    """Test that substrings occurring in the text are found."""
+    multiple_replace = MultipleReplace({"a.png": "A", "sub/a.png": "B", "b.png": "C"})
+    assert multiple_replace.find("a.png and sub/a.png") == {"a.png", "sub/a.png"}
+
+
+def test_multiple_replace_no_rescan() -> None:
+    """Test that replaced text is not scanned again."""
+    multiple_replace = MultipleReplace({"a": "b", "b": "c"})
+    assert multiple_replace.replace("ab") == ("bc", 2)
+
+
+def test_multiple_replace_empty() -> None:
+    """Test that text is unchanged when no replacement is provided."""
+    assert MultipleReplace({}).replace("a.png") == ("a.png", 0)
+    assert MultipleReplace({}).find("a.png") == set()
+
+
+def test_multiple_replace_in_markdown() -> None:
+    """Test that only markdown cells are updated."""
+    nb_cells = [
+        nbformat.v4.new_markdown_cell("a.png"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_code_cell("a.png")  # type: ignore[no-untyped-call]
+    ]
+    (updated_nb_cells, _) = MultipleReplace({"a.png": "A"}).replace_in_markdown(nb_cells)
+    assert updated_nb_cells[0].source == "A"
+    assert updated_nb_cells[1].source == "a.png"
+    assert nb_cells[0].source == "a.png"
+
+
+def test_multiple_replace_in_markdown_shares_unchanged_cells() -> None:
+    """Test that only markdown cells whose source changes are copied."""
+    nb_cells = [
+        nbformat.v4.new_markdown_cell("a.png"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_markdown_cell("b.png"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_code_cell("a.png")  # type: ignore[no-untyped-call]
+    ]
+    (updated_nb_cells, _) = MultipleReplace({"a.png": "A"}).replace_in_markdown(nb_cells)
+    assert updated_nb_cells[0] is not nb_cells[0]
+    assert updated_nb_cells[0].metadata is nb_cells[0].metadata
+    assert updated_nb_cells[1] is nb_cells[1]
+    assert updated_nb_cells[2] is nb_cells[2]
+
+
+def test_multiple_replace_counts_substitutions() -> None:
+    """Test that every substitution is counted, both in text and in markdown cells only."""
+    multiple_replace = MultipleReplace({"a.png": "A", "b.png": "B"})
+    assert multiple_replace.replace("a.png b.png a.png c.png") == ("A B A c.png", 3)
+    nb_cells = [
+        nbformat.v4.new_markdown_cell("a.png b.png"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_code_cell("a.png"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_markdown_cell("a.png")  # type: ignore[no-untyped-call]
+    ]
+    (_, substitutions) = multiple_replace.replace_in_markdown(nb_cells)
+    assert substitutions == 3
@@ -0,0 +1,124 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.package_spec package."""
+
+import json
+import os
+import tempfile
+
+import pytest
+
+from open_in_cloud_workflow.installation_plan import InstallationPlan
+from open_in_cloud_workflow.package_spec import package_specs, PackageSpec
+
+packages_str = """numpy
+python-dateutil$dateutil
+matplotlib>=3.0%mpl_toolkits pylab
+mpi4py@https://github.com/mpi4py/mpi4py.git$£--no-build-isolation€export CC=mpicc"""
+
+expected_specs = [
+    PackageSpec("numpy", "", "", "numpy"),
+    PackageSpec("python-dateutil", "", "", "dateutil"),
+    PackageSpec("matplotlib", ">=3.0", "", "matplotlib", ("mpl_toolkits", "pylab")),
+    PackageSpec(
+        "mpi4py", "", "https://github.com/mpi4py/mpi4py.git", "", (), "--no-build-isolation", "export CC=mpicc")
+]
+
+expected_specs_toml = """[[packages]]
+name = "numpy"
+
+[[packages]]
+name = "python-dateutil"
+import = "dateutil"
+
+[[packages]]
+name = "matplotlib"
+version = ">=3.0"
+dependent_imports = ["mpl_toolkits", "pylab"]
+
+[[packages]]
+name = "mpi4py"
+url = "https://github.com/mpi4py/mpi4py.git"
+import = ""
+install_command_line_options = "--no-build-isolation"
+extra_commands_before_install = "export CC=mpicc"
+"""
+
+expected_specs_yaml = """- name: numpy
+- name: python-dateutil
+  import: dateutil
+- name: matplotlib
+  version: ">=3.0"
+  dependent_imports: [mpl_toolkits, pylab]
+- name: mpi4py
+  url: https://github.com/mpi4py/mpi4py.git
+  import: ""
+  install_command_line_options: --no-build-isolation
+  extra_commands_before_install: export CC=mpicc
+"""
+
+
+def _write_packages_file(directory: str, filename: str, content: str) -> str:
+    """Write a structured file containing the packages, and return its path."""
+    packages_file = os.path.join(directory, filename)
+    with open(packages_file, "w") as f:
+        f.write(content)
+    return packages_file
+
+
+def test_package_specs_from_str() -> None:
+    """Test that the legacy string format is converted to package specifications."""
+    assert package_specs(packages_str) == expected_specs
+    assert package_specs("") == []
+
+
+def test_package_specs_from_str_named_as_file() -> None:
+    """Test that a package whose name ends with the extension of a structured file is not read as a file."""
+    assert package_specs("ruamel.yaml") == [PackageSpec("ruamel.yaml", "", "", "ruamel.yaml")]
+    assert package_specs("ruamel.yaml$ruamel") == [PackageSpec("ruamel.yaml", "", "", "ruamel")]
+
+
+@pytest.mark.parametrize("filename", ["packages.json", "packages.toml", "packages.yaml"])
+def test_package_specs_from_file(filename: str) -> None:
+    """Test that structured files are converted to the same package specifications as the legacy string format."""
+    content = {
+        "packages.json": json.dumps({"packages": [
+            {"name": "numpy"},
+            {"name": "python-dateutil", "import": "dateutil"},
+            {"name": "matplotlib", "version": ">=3.0", "dependent_imports": ["mpl_toolkits", "pylab"]},
+            {
+                "name": "mpi4py", "url": "https://github.com/mpi4py/mpi4py.git", "import": "",
+                "install_command_line_options": "--no-build-isolation",
+                "extra_commands_before_install": "export CC=mpicc"
+            }
+        ]}),
+        "packages.toml": expected_specs_toml,
+        "packages.yaml": expected_specs_yaml
+    }[filename]
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        packages_file = _write_packages_file(tmp_directory, filename, content)
+        assert package_specs(packages_file) == expected_specs
+        assert InstallationPlan("colab", "", packages_file).packages == expected_specs
+
+
+@pytest.mark.parametrize("content,error", [
+    ('{"name": "numpy"}', "expected a list of packages"),
+    ('["numpy"]', "packages[0]: expected a table, got str"),
+    ('[{"version": ">=1.0"}]', "packages[0]: missing mandatory key name"),
+    ('[{"name": "numpy"}, {"name": "scipy", "imports": "scipy"}]', "packages[1]: unknown key imports"),
+    ('[{"name": "numpy", "url": 1}]', "packages[0].url: expected a string, got 1"),
+    ('[{"name": "numpy", "dependent_imports": "numpy.linalg"}]', "packages[0].dependent_imports: expected a list"),
+    ('[{"name": ""}]', "packages[0].name: expected a non-empty string"),
+    ('[{"name": "numpy", "version": "1.0"}]', "packages[0].version: expected a string starting with one of")
+])
+def test_package_specs_from_file_invalid(content: str, error: str) -> None:
+    """Test that invalid structured files are reported with the package and the key of the invalid entry."""
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        packages_file = _write_packages_file(tmp_directory, "packages.json", content)
+        with pytest.raises(RuntimeError) as excinfo:
+            package_specs(packages_file)
+        assert str(excinfo.value).startswith(packages_file + ": ")
+        assert error in str(excinfo.value)
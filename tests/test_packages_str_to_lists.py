@@ -5,7 +5,11 @@
 # SPDX-License-Identifier: MIT
 """Tests for the open_in_cloud_workflow.packages_str_to_lists package."""
 
-from open_in_cloud_workflow.packages_str_to_lists import packages_str_to_lists
+import hypothesis
+import hypothesis.strategies as st
+import pytest
+
+from open_in_cloud_workflow.packages_str_to_lists import packages_str_to_lists, packages_str_to_tuples
 
 
 def test_single_package_str_to_list() -> None:
@@ -392,3 +396,145 @@ def test_no_package_str_to_list() -> None:
     assert len(packages_dependent_imports) == 0
     assert len(packages_extra_commands_before_install) == 0
     assert len(packages_install_command_line_options) == 0
+
+
+def test_packages_str_operator_in_command_line_options() -> None:
+    """Test that version operators are looked for only in the package name, and not in the rest of the line."""
+    assert list(packages_str_to_tuples("numpy==1.22.0£--config-settings=setup-args==-Dblas=openblas")) == [
+        ("numpy", "==1.22.0", "", "numpy", "", "--config-settings=setup-args==-Dblas=openblas", "")]
+
+
+@pytest.mark.parametrize("packages_str,error", [
+    ("numpy%mpi4py%petsc4py", "line 1, column 13: unexpected %"),
+    ("numpy\nscipy$scipy$scipy.linalg", "line 2, column 12: unexpected $"),
+    ("numpy@https://a@b@c", "line 1, column 18: unexpected @"),
+    ("numpy€cd /tmp€ls", "line 1, column 14: unexpected €")
+])
+def test_packages_str_invalid(packages_str: str, error: str) -> None:
+    """Test that malformed packages are reported with the line and column of the unexpected character."""
+    with pytest.raises(RuntimeError) as excinfo:
+        packages_str_to_lists(packages_str)
+    assert error in str(excinfo.value)
+
+
+def _packages_str_to_lists_reference(packages_str: str) -> tuple[
+        list[str], list[str], list[str], list[str], list[str],
+        list[str], list[str]]:
+    """Convert a string representing a list of packages, splitting every line once per special character."""
+    packages_name = list()
+    packages_version = list()
+    packages_url = list()
+    packages_import = list()
+    packages_dependent_imports = list()
+    packages_install_command_line_options = list()
+    packages_extra_commands_before_install = list()
+    if packages_str != "":
+        for package_str in packages_str.strip("\n").split("\n"):
+            split_at_euro = package_str.split("€")
+            assert len(split_at_euro) in (1, 2)
+            if len(split_at_euro) == 1:
+                package_name_version_url_import_depimports_commandlineoptions = split_at_euro[0]
+                package_extra_commands_before_install = ""
+            elif len(split_at_euro) == 2:
+                package_name_version_url_import_depimports_commandlineoptions = split_at_euro[0]
+                package_extra_commands_before_install = split_at_euro[1]
+            split_at_pound = package_name_version_url_import_depimports_commandlineoptions.split("£")
+            assert len(split_at_pound) in (1, 2)
+            if len(split_at_pound) == 1:
+                package_name_version_url_import_depimports = split_at_pound[0]
+                package_install_command_line_options = ""
+            elif len(split_at_pound) == 2:
+                package_name_version_url_import_depimports = split_at_pound[0]
+                package_install_command_line_options = split_at_pound[1]
+            split_at_percent = package_name_version_url_import_depimports.split("%")
+            assert len(split_at_percent) in (1, 2)
+            if len(split_at_percent) == 1:
+                package_name_version_url_import = split_at_percent[0]
+                package_dependent_imports = ""
+            elif len(split_at_percent) == 2:
+                package_name_version_url_import = split_at_percent[0]
+                package_dependent_imports = split_at_percent[1]
+            split_at_dollar = package_name_version_url_import.split("$")
+            assert len(split_at_dollar) in (1, 2)
+            if len(split_at_dollar) == 1:
+                package_name_version_url = split_at_dollar[0]
+                package_import = None
+            elif len(split_at_dollar) == 2:
+                package_name_version_url = split_at_dollar[0]
+                package_import = split_at_dollar[1]
+            split_at_at = package_name_version_url.split("@")
+            assert len(split_at_at) in (1, 2, 3)
+            if len(split_at_at) == 1:
+                package_name_version = split_at_at[0]
+                package_url = ""
+            elif len(split_at_at) == 2:
+                package_name_version = split_at_at[0]
+                package_url = split_at_at[1]
+            elif len(split_at_at) == 3:
+                package_name_version = split_at_at[0]
+                package_url = "@".join(split_at_at[1:])
+            package_name = package_name_version
+            for operator in ("==", ">=", ">", "<=", "<", "["):
+                if operator in package_name:
+                    split_at_operator = package_str.split(operator)
+                    assert len(split_at_operator) in (1, 2)
+                    package_name = split_at_operator[0]
+            package_version = package_name_version[len(package_name):]
+            packages_name.append(package_name)
+            packages_version.append(package_version)
+            packages_url.append(package_url)
+            if package_import is None:
+                packages_import.append(package_name)
+            else:
+                packages_import.append(package_import)
+            packages_dependent_imports.append(package_dependent_imports)
+            packages_install_command_line_options.append(package_install_command_line_options)
+            packages_extra_commands_before_install.append(package_extra_commands_before_install)
+    return (
+        packages_name, packages_version, packages_url, packages_import, packages_dependent_imports,
+        packages_install_command_line_options, packages_extra_commands_before_install
+    )
+
+
+@hypothesis.given(st.text(alphabet="ab1.-= <>[]@$%£€\n", max_size=40))
+def test_packages_str_same_as_reference(packages_str: str) -> None:
+    """Test that the conversion agrees with the reference implementation on every string it accepts."""
+    try:
+        expected = _packages_str_to_lists_reference(packages_str)
+    except AssertionError:
+        # The reference implementation also rejects valid strings which contain a version operator both in
+        # the package name and in a later field, hence the conversion may only succeed or raise
+        try:
+            packages_str_to_lists(packages_str)
+        except RuntimeError:
+            pass
+    else:
+        assert packages_str_to_lists(packages_str) == expected
+
+
+@hypothesis.given(
+    st.text(alphabet="ab1.- ", min_size=1, max_size=10),
+    st.one_of(st.just(""), st.builds(
+        lambda operator, version: operator + version, st.sampled_from(["==", ">=", ">", "<=", "<", "["]),
+        st.text(alphabet="ab1.,=<>[]", max_size=10))),
+    st.one_of(st.just(""), st.text(alphabet="ab1.:/", min_size=1, max_size=10), st.builds(
+        lambda url, tag: url + "@" + tag, st.text(alphabet="ab1.:/", max_size=10),
+        st.text(alphabet="ab1.", max_size=5))),
+    st.one_of(st.none(), st.text(alphabet="ab1.@", max_size=10)),
+    st.text(alphabet="ab1. @$", max_size=10),
+    st.text(alphabet="ab1.-= @$%", max_size=10),
+    st.text(alphabet="ab1.-= /@$%£", max_size=10)
+)
+def test_packages_str_round_trip(
+    name: str, version: str, url: str, import_: str | None, dependent_imports: str, install_command_line_options: str,
+    extra_commands_before_install: str
+) -> None:
+    """Test that every field of a package formatted with special characters is recovered by the conversion."""
+    packages_str = (
+        name + version + ("@" + url if url != "" else "") + ("$" + import_ if import_ is not None else "")
+        + ("%" + dependent_imports if dependent_imports != "" else "")
+        + ("£" + install_command_line_options if install_command_line_options != "" else "")
+        + ("€" + extra_commands_before_install if extra_commands_before_install != "" else ""))
+    assert list(packages_str_to_tuples(packages_str)) == [(
+        name, version, url, import_ if import_ is not None else name, dependent_imports,
+        install_command_line_options, extra_commands_before_install)]
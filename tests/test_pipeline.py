@@ -0,0 +1,241 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.pipeline package."""
+
+import argparse
+import inspect
+import os
+import shutil
+import tempfile
+import typing
+
+import _pytest.fixtures
+import nbformat
+import pytest
+
+from open_in_cloud_workflow.add_installation_cells import (
+    __main__ as add_installation_cells_main, AddInstallationCellsStage)
+from open_in_cloud_workflow.conversion_cache import CONVERSION_CACHE_SIZE, ConversionCache
+from open_in_cloud_workflow.drive_urls_cache import DriveURLsCache
+from open_in_cloud_workflow.image_converters import get_image_converter
+from open_in_cloud_workflow.pipeline import __main__ as pipeline_main, Pipeline
+from open_in_cloud_workflow.process_notebooks import add_process_notebooks_arguments
+from open_in_cloud_workflow.publish_on import PublishOnArtifact, PublishOnBaseClass, PublishOnDrive, PublishOnGitHub
+from open_in_cloud_workflow.replace_images_in_markdown import add_replace_images_in_markdown_arguments
+from open_in_cloud_workflow.replace_links_in_markdown import (
+    __main__ as replace_links_in_markdown_main, add_drive_urls_cache_arguments, ReplaceLinksInMarkdownStage)
+
+
+@pytest.fixture(params=["publish_on_artifact", "publish_on_github"])
+def publisher(request: _pytest.fixtures.SubRequest) -> PublishOnBaseClass:
+    """Parameterize over publishers which do not require rclone environment variables."""
+    return request.getfixturevalue(request.param)  # type: ignore[no-any-return]
+
+
+def _copy_notebooks(root_directory: str, tmp_root_directory: str, data_subdirectory: str) -> None:
+    """Copy all test notebooks in the data subdirectory to a temporary root directory."""
+    os.makedirs(os.path.join(tmp_root_directory, data_subdirectory))
+    for nb_filename in os.listdir(os.path.join(root_directory, data_subdirectory)):
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, nb_filename),
+            os.path.join(tmp_root_directory, data_subdirectory, nb_filename)
+        )
+
+
+def test_pipeline_main(
+    root_directory: str, open_notebook: typing.Callable[[str, str, str], nbformat.NotebookNode],
+    publisher: PublishOnBaseClass
+) -> None:
+    """Test addition of installation cells and replacement of links in a single pass."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    pattern = os.path.join(data_subdirectory, "*.ipynb")
+    expected_link = {
+        PublishOnArtifact: "main_notebook.ipynb",
+        PublishOnGitHub: (
+            "https://colab.research.google.com/github/fem-on-colab/open-in-colab-workflow/blob/"
+            + "open-in-colab/tests/data/replace_links_in_markdown/main_notebook.ipynb"
+        )
+    }
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        _copy_notebooks(root_directory, tmp_root_directory, data_subdirectory)
+        pipeline_main(
+            tmp_root_directory, pattern, "add_installation_cells\nreplace_links_in_markdown", "colab", "", "numpy",
+            publisher)
+        updated_nb = open_notebook(
+            "replace_links_in_markdown", "link_and_code", os.path.join(tmp_root_directory, "tests", "data"))
+        assert len(updated_nb.cells) == 3
+        assert updated_nb.cells[0].cell_type == "markdown"
+        assert updated_nb.cells[0].source == f"[Link to the main notebook]({expected_link[type(publisher)]})"
+        assert updated_nb.cells[1].cell_type == "code"
+        assert updated_nb.cells[1].source == """try:
+    import numpy
+except ImportError:
+    !pip3 install numpy
+    import numpy"""
+        assert updated_nb.cells[2].cell_type == "code"
+        assert updated_nb.cells[2].source == "import numpy as np  # noqa: F401"
+
+
+def test_pipeline_main_same_as_separate_stages(root_directory: str, publisher: PublishOnBaseClass) -> None:
+    """Test that the pipeline produces the same notebooks as running every stage separately."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    pattern = os.path.join(data_subdirectory, "*.ipynb")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_pipeline_directory,
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_stages_directory
+    ):
+        _copy_notebooks(root_directory, tmp_pipeline_directory, data_subdirectory)
+        pipeline_main(
+            tmp_pipeline_directory, pattern, "add_installation_cells\nreplace_links_in_markdown", "colab", "",
+            "numpy", publisher)
+        _copy_notebooks(root_directory, tmp_stages_directory, data_subdirectory)
+        add_installation_cells_main(tmp_stages_directory, pattern, "colab", "", "numpy")
+        replace_links_in_markdown_main(tmp_stages_directory, pattern, "colab", publisher)
+        for nb_filename in os.listdir(os.path.join(tmp_pipeline_directory, data_subdirectory)):
+            with open(os.path.join(tmp_pipeline_directory, data_subdirectory, nb_filename)) as f:
+                pipeline_content = f.read()
+            with open(os.path.join(tmp_stages_directory, data_subdirectory, nb_filename)) as f:
+                stages_content = f.read()
+            assert pipeline_content == stages_content
+
+
+def test_pipeline_main_manifest(
+    root_directory: str, publisher: PublishOnBaseClass, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a second run of the pipeline with a manifest skips every notebook."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    pattern = os.path.join(data_subdirectory, "*.ipynb")
+    num_notebooks = len(os.listdir(os.path.join(root_directory, data_subdirectory)))
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_manifest_directory
+    ):
+        _copy_notebooks(root_directory, tmp_root_directory, data_subdirectory)
+        for num_skipped in (0, num_notebooks):
+            pipeline_main(
+                tmp_root_directory, pattern, "add_installation_cells\nreplace_links_in_markdown", "colab", "",
+                "numpy", publisher, manifest_directory=tmp_manifest_directory)
+            assert (
+                f"{num_skipped} notebook(s) skipped, {num_notebooks - num_skipped} notebook(s) rewritten"
+                in capsys.readouterr().out)
+
+
+def test_pipeline_main_images_and_links(
+    root_directory: str, open_notebook: typing.Callable[[str, str, str], nbformat.NotebookNode],
+    publisher: PublishOnBaseClass, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test replacement of images and links in a single pass, and that a second run with a manifest skips it."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+    pattern = os.path.join(data_subdirectory, "*.ipynb")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_manifest_directory
+    ):
+        _copy_notebooks(root_directory, tmp_root_directory, os.path.join(data_subdirectory, "images"))
+        for nb_filename in os.listdir(os.path.join(root_directory, data_subdirectory)):
+            if nb_filename.endswith(".ipynb"):
+                shutil.copyfile(
+                    os.path.join(root_directory, data_subdirectory, nb_filename),
+                    os.path.join(tmp_root_directory, data_subdirectory, nb_filename))
+        for num_skipped in (0, 4):
+            pipeline_main(
+                tmp_root_directory, pattern, "replace_images_in_markdown\nreplace_links_in_markdown", "colab", "",
+                "", publisher, manifest_directory=tmp_manifest_directory)
+            assert f"{num_skipped} notebook(s) skipped, {4 - num_skipped} notebook(s) rewritten" in (
+                capsys.readouterr().out)
+        updated_nb = open_notebook(
+            "replace_images_in_markdown", "markdown_image", os.path.join(tmp_root_directory, "tests", "data"))
+        assert len(updated_nb.cells) == 1
+        assert updated_nb.cells[0].source.startswith("""This is the red image.
+![Red](data:image/png;base64""")
+
+
+def test_pipeline_main_drive_urls_cache(root_directory: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test replacement of links with Google Drive URLs which were cached by a previous run."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    pattern = os.path.join(data_subdirectory, "*.ipynb")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory() as tmp_cache_directory
+    ):
+        _copy_notebooks(root_directory, tmp_root_directory, data_subdirectory)
+        cache = DriveURLsCache(os.path.join(tmp_cache_directory, "cache.json"), 60)
+        for nb_filename in os.listdir(os.path.join(root_directory, data_subdirectory)):
+            cache.set(
+                "GitHub/open_in_colab_workflow", os.path.join(data_subdirectory, nb_filename),
+                "https://drive.google.com/open?id=" + nb_filename)
+        cache.save()
+        pipeline_main(
+            tmp_root_directory, pattern, "add_installation_cells\nreplace_links_in_markdown", "colab", "", "numpy",
+            PublishOnDrive("GitHub/open_in_colab_workflow"),
+            drive_urls_cache_file=os.path.join(tmp_cache_directory, "cache.json"))
+        assert "Google Drive URLs cache: 5 hit(s), 0 miss(es)" in capsys.readouterr().out
+        with open(os.path.join(tmp_root_directory, data_subdirectory, "link_and_code.ipynb")) as f:
+            assert "https://colab.research.google.com/drive/main_notebook.ipynb" in f.read()
+
+
+def test_pipeline_main_conversion_cache(root_directory: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test replacement of images with images converted by a previous run."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+    images_directory = os.path.join(root_directory, data_subdirectory, "images")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory() as tmp_cache_directory
+    ):
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb"))
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        shutil.copyfile(os.path.join(images_directory, "red.jpg"), red)
+        # Store the black image as the result of the conversion of the red one
+        image_converter = get_image_converter(".jpg")
+        assert image_converter is not None
+        cache = ConversionCache(tmp_cache_directory, CONVERSION_CACHE_SIZE)
+        cache.store(cache.key(red, image_converter.describe(".jpg")), os.path.join(images_directory, "black.png"))
+        cache.save()
+        pipeline_main(
+            tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"), "replace_images_in_markdown", "colab", "",
+            "", PublishOnArtifact("open-in-colab"), conversion_cache_directory=tmp_cache_directory)
+        assert "Image conversion cache: 1 hit(s), 0 miss(es)" in capsys.readouterr().out
+
+
+def test_pipeline_main_arguments() -> None:
+    """Test that the shared command line options are accepted by the main function of the pipeline."""
+    parser = argparse.ArgumentParser()
+    for positional in (
+        "work_dir", "nb_pattern", "stages", "cloud_provider", "fem_on_cloud_packages", "pip_packages", "publisher"
+    ):
+        parser.add_argument(positional)
+    add_process_notebooks_arguments(parser)
+    add_drive_urls_cache_arguments(parser)
+    add_replace_images_in_markdown_arguments(parser)
+    arguments = vars(parser.parse_args([
+        "work_dir", "*.ipynb", "add_installation_cells", "colab", "", "numpy", "github@owner/repo@branch",
+        "--jobs", "auto", "--fast-io", "--drive-urls-cache-ttl", "60", "--optimize-images", "--image-format", "webp"
+    ]))
+    assert arguments["jobs"] == "auto"
+    assert arguments["fast_io"]
+    assert arguments["image_format"] == "webp"
+    inspect.signature(pipeline_main).bind(**arguments)
+
+
+def test_pipeline_get_name(root_directory: str, publish_on_github: PublishOnGitHub) -> None:
+    """Test that the name of the pipeline joins the names of its stages."""
+    nb_pattern = os.path.join("tests", "data", "replace_links_in_markdown", "*.ipynb")
+    pipeline = Pipeline([
+        AddInstallationCellsStage("colab", "", "numpy"),
+        ReplaceLinksInMarkdownStage(root_directory, nb_pattern, "colab", publish_on_github)
+    ])
+    assert pipeline.get_name() == "add_installation_cells,replace_links_in_markdown"
+    assert [line for line in str(pipeline).split("\n") if line.startswith("stage=")] == [
+        "stage=add_installation_cells", "stage=replace_links_in_markdown"]
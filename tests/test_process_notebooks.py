@@ -0,0 +1,243 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.process_notebooks package."""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from open_in_cloud_workflow.add_installation_cells import AddInstallationCellsStage
+from open_in_cloud_workflow.process_notebooks import process_notebooks
+from open_in_cloud_workflow.publish_on import PublishOnGitHub
+from open_in_cloud_workflow.replace_links_in_markdown import ReplaceLinksInMarkdownStage
+
+
+def _copy_notebooks(root_directory: str, tmp_data_directory: str) -> None:
+    """Copy all add_installation_cells test notebooks to a temporary data directory."""
+    data_subdirectory = os.path.join(root_directory, "tests", "data", "add_installation_cells")
+    os.mkdir(os.path.join(tmp_data_directory, "add_installation_cells"))
+    for nb_filename in os.listdir(data_subdirectory):
+        shutil.copyfile(
+            os.path.join(data_subdirectory, nb_filename),
+            os.path.join(tmp_data_directory, "add_installation_cells", nb_filename))
+
+
+def _read_notebooks(tmp_data_directory: str) -> dict[str, str]:
+    """Read the content of every notebook in the temporary data directory."""
+    notebooks_content = dict()
+    for nb_filename in sorted(os.listdir(os.path.join(tmp_data_directory, "add_installation_cells"))):
+        with open(os.path.join(tmp_data_directory, "add_installation_cells", nb_filename)) as f:
+            notebooks_content[nb_filename] = f.read()
+    return notebooks_content
+
+
+@pytest.mark.parametrize("jobs", [2, "2", "auto"])
+def test_process_notebooks_parallel_same_as_serial(root_directory: str, jobs: int | str) -> None:
+    """Test that processing notebooks over a pool of processes produces the same notebooks as a serial run."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_pattern = os.path.join("add_installation_cells", "*.ipynb")
+    stage = AddInstallationCellsStage("colab", "mpi4py", "numpy\nscipy\npython-dateutil$dateutil")
+
+    with (
+        tempfile.TemporaryDirectory(dir=data_directory) as tmp_serial_directory,
+        tempfile.TemporaryDirectory(dir=data_directory) as tmp_parallel_directory
+    ):
+        _copy_notebooks(root_directory, tmp_serial_directory)
+        process_notebooks(tmp_serial_directory, nb_pattern, stage)
+        _copy_notebooks(root_directory, tmp_parallel_directory)
+        process_notebooks(tmp_parallel_directory, nb_pattern, stage, jobs)
+        serial_content = _read_notebooks(tmp_serial_directory)
+        parallel_content = _read_notebooks(tmp_parallel_directory)
+        assert serial_content == parallel_content
+        assert len(serial_content) == len(os.listdir(os.path.join(data_directory, "add_installation_cells")))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_process_notebooks_errors_reported_per_file(root_directory: str, jobs: int) -> None:
+    """Test that an invalid notebook does not prevent processing the remaining ones, and that it is reported."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_pattern = os.path.join("add_installation_cells", "*.ipynb")
+    stage = AddInstallationCellsStage("colab", "", "numpy")
+
+    with tempfile.TemporaryDirectory(dir=data_directory) as tmp_data_directory:
+        _copy_notebooks(root_directory, tmp_data_directory)
+        invalid_nb_filename = os.path.join(tmp_data_directory, "add_installation_cells", "invalid.ipynb")
+        with open(invalid_nb_filename, "w") as f:
+            f.write("This is not a notebook")
+        with pytest.raises(RuntimeError) as excinfo:
+            process_notebooks(tmp_data_directory, nb_pattern, stage, jobs)
+        assert "Processing failed for 1 notebook(s)" in str(excinfo.value)
+        assert invalid_nb_filename in str(excinfo.value)
+        updated_content = _read_notebooks(tmp_data_directory)
+        assert "!pip3 install numpy" in updated_content["import_numpy.ipynb"]
+
+
+def test_process_notebooks_manifest(root_directory: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the manifest allows to skip notebooks which are unchanged since the previous run."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_pattern = os.path.join("add_installation_cells", "*.ipynb")
+    num_notebooks = len(os.listdir(os.path.join(data_directory, "add_installation_cells")))
+    stage = AddInstallationCellsStage("colab", "", "numpy")
+
+    with (
+        tempfile.TemporaryDirectory(dir=data_directory) as tmp_data_directory,
+        tempfile.TemporaryDirectory(dir=data_directory) as tmp_manifest_directory
+    ):
+        # First run: every notebook is processed
+        _copy_notebooks(root_directory, tmp_data_directory)
+        process_notebooks(tmp_data_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+        assert f"0 notebook(s) skipped, {num_notebooks} notebook(s) rewritten" in capsys.readouterr().out
+        first_run_content = _read_notebooks(tmp_data_directory)
+        assert first_run_content["import_numpy.ipynb"].count("!pip3 install numpy") == 1
+
+        # Second run on the same directory: notebooks were already processed, and must not be processed again
+        process_notebooks(tmp_data_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+        assert f"{num_notebooks} notebook(s) skipped, 0 notebook(s) rewritten" in capsys.readouterr().out
+        assert _read_notebooks(tmp_data_directory) == first_run_content
+
+        # Third run on a fresh copy of the input notebooks: outputs are restored from the manifest directory
+        shutil.rmtree(os.path.join(tmp_data_directory, "add_installation_cells"))
+        _copy_notebooks(root_directory, tmp_data_directory)
+        process_notebooks(tmp_data_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+        assert f"{num_notebooks} notebook(s) skipped, 0 notebook(s) rewritten" in capsys.readouterr().out
+        assert _read_notebooks(tmp_data_directory) == first_run_content
+
+        # Fourth run on a fresh copy of the input notebooks with different options: every notebook is processed
+        shutil.rmtree(os.path.join(tmp_data_directory, "add_installation_cells"))
+        _copy_notebooks(root_directory, tmp_data_directory)
+        process_notebooks(
+            tmp_data_directory, nb_pattern, AddInstallationCellsStage("colab", "", "numpy\nscipy"),
+            manifest_directory=tmp_manifest_directory)
+        assert f"0 notebook(s) skipped, {num_notebooks} notebook(s) rewritten" in capsys.readouterr().out
+        assert "!pip3 install scipy" in _read_notebooks(tmp_data_directory)["import_numpy_scipy.ipynb"]
+
+        # Fifth run on a fresh copy of the input notebooks after the stored outputs were lost: notebooks which
+        # the previous run left unchanged are skipped, while the remaining ones are processed again
+        shutil.rmtree(os.path.join(tmp_data_directory, "add_installation_cells"))
+        _copy_notebooks(root_directory, tmp_data_directory)
+        shutil.rmtree(os.path.join(tmp_manifest_directory, "objects"))
+        os.mkdir(os.path.join(tmp_manifest_directory, "objects"))
+        process_notebooks(
+            tmp_data_directory, nb_pattern, AddInstallationCellsStage("colab", "", "numpy\nscipy"),
+            manifest_directory=tmp_manifest_directory)
+        assert f"{num_notebooks - 5} notebook(s) skipped, 5 notebook(s) rewritten" in capsys.readouterr().out
+
+
+def test_process_notebooks_manifest_dependencies(
+    root_directory: str, publish_on_github: PublishOnGitHub, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the manifest does not skip notebooks whose referenced links have changed since the previous run."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    main_nb_pattern = os.path.join(data_subdirectory, "main_notebook.ipynb")
+    link_nb_pattern = os.path.join(data_subdirectory, "markdown_link.ipynb")
+    nb_pattern = main_nb_pattern + "\n" + link_nb_pattern
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_manifest_directory
+    ):
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory))
+        for pattern in (main_nb_pattern, link_nb_pattern):
+            shutil.copyfile(os.path.join(root_directory, pattern), os.path.join(tmp_root_directory, pattern))
+        # First run: the main notebook does not match the pattern, hence its link is not replaced
+        stage = ReplaceLinksInMarkdownStage(tmp_root_directory, link_nb_pattern, "colab", publish_on_github)
+        process_notebooks(tmp_root_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+        assert "0 notebook(s) skipped, 2 notebook(s) rewritten" in capsys.readouterr().out
+        with open(os.path.join(tmp_root_directory, link_nb_pattern)) as f:
+            assert "(main_notebook.ipynb)" in f.read()
+
+        # Second run on a fresh copy: the main notebook now has a link, so the notebook linking to it is updated
+        for pattern in (main_nb_pattern, link_nb_pattern):
+            shutil.copyfile(os.path.join(root_directory, pattern), os.path.join(tmp_root_directory, pattern))
+        stage = ReplaceLinksInMarkdownStage(tmp_root_directory, nb_pattern, "colab", publish_on_github)
+        process_notebooks(tmp_root_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+        assert "1 notebook(s) skipped, 1 notebook(s) rewritten" in capsys.readouterr().out
+        with open(os.path.join(tmp_root_directory, link_nb_pattern)) as f:
+            assert "(https://colab.research.google.com/github/" in f.read()
+
+
+@pytest.mark.parametrize("fast_io", [False, True])
+def test_process_notebooks_skips_unchanged_and_reports_changes(
+    root_directory: str, publish_on_github: PublishOnGitHub, capsys: pytest.CaptureFixture[str], fast_io: bool
+) -> None:
+    """Test that notebooks unchanged by the stage are not written, and that a summary of the changes is printed."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    nb_pattern = os.path.join(data_subdirectory, "*.ipynb")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        shutil.copytree(
+            os.path.join(root_directory, data_subdirectory), os.path.join(tmp_root_directory, data_subdirectory))
+        nb_filenames = sorted(os.listdir(os.path.join(tmp_root_directory, data_subdirectory)))
+        for nb_filename in nb_filenames:
+            os.utime(os.path.join(tmp_root_directory, data_subdirectory, nb_filename), ns=(0, 0))
+        stage = ReplaceLinksInMarkdownStage(tmp_root_directory, nb_pattern, "colab", publish_on_github)
+        process_notebooks(tmp_root_directory, nb_pattern, stage, fast_io=fast_io)
+        assert "4 notebook(s) modified, 0 cell(s) inserted, 4 substitution(s) made" in capsys.readouterr().out
+        modified_nb_filenames = [
+            nb_filename for nb_filename in nb_filenames
+            if os.stat(os.path.join(tmp_root_directory, data_subdirectory, nb_filename)).st_mtime_ns != 0]
+        assert modified_nb_filenames == [
+            "html_link_double_quotes.ipynb", "html_link_single_quotes.ipynb", "link_and_code.ipynb",
+            "markdown_link.ipynb"]
+
+        # Second run on the same directory: every link has already been replaced, hence nothing is written
+        for nb_filename in nb_filenames:
+            os.utime(os.path.join(tmp_root_directory, data_subdirectory, nb_filename), ns=(0, 0))
+        process_notebooks(tmp_root_directory, nb_pattern, stage, fast_io=fast_io)
+        assert "0 notebook(s) modified, 0 cell(s) inserted, 0 substitution(s) made" in capsys.readouterr().out
+        assert all(
+            os.stat(os.path.join(tmp_root_directory, data_subdirectory, nb_filename)).st_mtime_ns == 0
+            for nb_filename in nb_filenames)
+
+
+def test_process_notebooks_reports_inserted_cells(root_directory: str, capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that the summary reports the number of installation cells inserted in the notebooks."""
+    data_directory = os.path.join(root_directory, "tests", "data")
+    nb_pattern = os.path.join("add_installation_cells", "*.ipynb")
+
+    with tempfile.TemporaryDirectory(dir=data_directory) as tmp_data_directory:
+        _copy_notebooks(root_directory, tmp_data_directory)
+        process_notebooks(tmp_data_directory, nb_pattern, AddInstallationCellsStage("colab", "mpi4py", "numpy\nscipy"))
+        assert "6 notebook(s) modified, 8 cell(s) inserted, 0 substitution(s) made" in capsys.readouterr().out
+
+
+def test_process_notebooks_manifest_shared_by_stages(
+    root_directory: str, publish_on_github: PublishOnGitHub, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that two stages run one after the other on the same manifest directory do not evict each other."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    nb_pattern = os.path.join(data_subdirectory, "*.ipynb")
+    num_notebooks = len(os.listdir(os.path.join(root_directory, data_subdirectory)))
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_manifest_directory
+    ):
+        shutil.copytree(
+            os.path.join(root_directory, data_subdirectory), os.path.join(tmp_root_directory, data_subdirectory))
+        stages = [
+            AddInstallationCellsStage("colab", "", "numpy"),
+            ReplaceLinksInMarkdownStage(tmp_root_directory, nb_pattern, "colab", publish_on_github)
+        ]
+        for stage in stages:
+            process_notebooks(tmp_root_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+            assert f"0 notebook(s) skipped, {num_notebooks} notebook(s) rewritten" in capsys.readouterr().out
+        updated_content = dict()
+        for nb_filename in os.listdir(os.path.join(tmp_root_directory, data_subdirectory)):
+            with open(os.path.join(tmp_root_directory, data_subdirectory, nb_filename)) as f:
+                updated_content[nb_filename] = f.read()
+        # Second run on a fresh copy of the input notebooks: the output of both stages is restored
+        shutil.rmtree(os.path.join(tmp_root_directory, data_subdirectory))
+        shutil.copytree(
+            os.path.join(root_directory, data_subdirectory), os.path.join(tmp_root_directory, data_subdirectory))
+        for stage in stages:
+            process_notebooks(tmp_root_directory, nb_pattern, stage, manifest_directory=tmp_manifest_directory)
+            assert f"{num_notebooks} notebook(s) skipped, 0 notebook(s) rewritten" in capsys.readouterr().out
+        for (nb_filename, content) in updated_content.items():
+            with open(os.path.join(tmp_root_directory, data_subdirectory, nb_filename)) as f:
+                assert f.read() == content
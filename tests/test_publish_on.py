@@ -6,9 +6,11 @@
 """Tests for the open_in_cloud_workflow.publish_on package."""
 
 import os
+import tempfile
 
 import pytest
 
+from open_in_cloud_workflow.drive_urls_cache import DriveURLsCache
 from open_in_cloud_workflow.publish_on import PublishOnArtifact, PublishOnDrive, PublishOnGitHub
 
 
@@ -36,6 +38,20 @@ def test_publish_on_drive(publish_on_drive: PublishOnDrive) -> None:
 drive_root_directory=GitHub/open_in_colab_workflow"""
 
 
+
+def test_publish_on_drive_cached() -> None:
+    """Test URLs of Google Drive publisher when the Google Drive URL is cached."""
+    with tempfile.TemporaryDirectory() as tmp_cache_directory:
+        drive_urls_cache = DriveURLsCache(os.path.join(tmp_cache_directory, "drive_urls.json"), 3600)
+        drive_urls_cache.set(
+            "GitHub/open_in_colab_workflow", "cached_file.txt", "https://drive.google.com/open?id=cached_file_id")
+        publish_on_drive = PublishOnDrive("GitHub/open_in_colab_workflow", drive_urls_cache)
+        assert publish_on_drive.get_url("colab", "cached_file.txt") == (
+            "https://colab.research.google.com/drive/cached_file_id")
+        assert publish_on_drive.get_url("kaggle", "cached_file.txt") == (
+            "https://kaggle.com/kernels/welcome?src=https://drive.google.com/uc?id=cached_file_id")
+        assert publish_on_drive.drive_urls is None
+
 def test_publish_on_github(publish_on_github: PublishOnGitHub) -> None:
     """Test content of GitHub publisher."""
     assert publish_on_github.repository == "fem-on-colab/open-in-colab-workflow"
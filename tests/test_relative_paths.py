@@ -0,0 +1,40 @@
+# Copyright (C) 2021-2026 by the FEM on Colab authors
+#
+# This file is part of FEM on Colab-related actions.
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the open_in_cloud_workflow.relative_paths package."""
+
+import os
+
+import pytest
+
+from open_in_cloud_workflow.relative_paths import RelativePaths
+
+
+def test_relative_paths_relative_to() -> None:
+    """Test that files are indexed by their path relative to the directory, and associated to the provided file."""
+    relative_paths = RelativePaths("/work", ["a.ipynb", "sub/b.ipynb", "/work/images/c.png"])
+    assert relative_paths.relative_to("/work") == {
+        "a.ipynb": "a.ipynb", os.path.join("sub", "b.ipynb"): "sub/b.ipynb",
+        os.path.join("images", "c.png"): "/work/images/c.png"}
+    assert relative_paths.relative_to("/work/sub") == {
+        os.path.join("..", "a.ipynb"): "a.ipynb", "b.ipynb": "sub/b.ipynb",
+        os.path.join("..", "images", "c.png"): "/work/images/c.png"}
+
+
+def test_relative_paths_once_per_directory(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that relative paths are computed only once for every distinct directory."""
+    relative_paths = RelativePaths("/work", ["a.ipynb", "sub/b.ipynb"])
+    relpath_calls = list()
+    relpath = os.path.relpath
+
+    def counting_relpath(path: str, start: str) -> str:
+        """Count calls to os.path.relpath."""
+        relpath_calls.append(path)
+        return relpath(path, start)
+
+    monkeypatch.setattr(os.path, "relpath", counting_relpath)
+    for nb_dirname in ("/work", "/work/sub", "/work", "/work/sub"):
+        relative_paths.relative_to(nb_dirname)
+    assert len(relpath_calls) == 4
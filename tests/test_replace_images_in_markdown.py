@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: MIT
 """Tests for the open_in_cloud_workflow.replace_images_in_markdown package."""
 
+import json
 import os
 import shutil
 import tempfile
@@ -13,8 +14,12 @@ import typing
 import nbformat
 import pytest
 
+from open_in_cloud_workflow.conversion_cache import CONVERSION_CACHE_SIZE, ConversionCache
+from open_in_cloud_workflow.image_converters import get_image_converter
+from open_in_cloud_workflow.image_to_base64 import image_to_base64
 from open_in_cloud_workflow.replace_images_in_markdown import (
-    __main__ as replace_images_in_markdown_main, replace_images_in_markdown)
+    __main__ as replace_images_in_markdown_main, attach_images_in_markdown, replace_images_in_markdown,
+    ReplaceImagesInMarkdownStage)
 
 
 @pytest.fixture
@@ -156,3 +161,196 @@ def test_replace_images_in_markdown_main(
                             assert expected_c_part in updated_nb.cells[c].source
                     else:
                         raise ValueError("Invalid expected string")
+
+
+def test_replace_images_in_markdown_overlapping_paths() -> None:
+    """Test replacement of images whose paths end with the same file name."""
+    nb_cells = [
+        nbformat.v4.new_markdown_cell(  # type: ignore[no-untyped-call]
+            "![Sub](images/sub/black.png) and ![Black](images/black.png)")
+    ]
+    updated_cells = replace_images_in_markdown(
+        nb_cells, {"images/black.png": "Base64 of black.png", "images/sub/black.png": "Base64 of sub/black.png"})
+    assert updated_cells[0].source == "![Sub](Base64 of sub/black.png) and ![Black](Base64 of black.png)"
+
+
+def test_attach_images_in_markdown() -> None:
+    """Test that identical images are stored once per cell as attachments, and that other cells are unchanged."""
+    nb_cells = [
+        nbformat.v4.new_markdown_cell(  # type: ignore[no-untyped-call]
+            '![Black](images/black.png), ![Copy](images/copy.png) and <img src="images/black.png">'),
+        nbformat.v4.new_markdown_cell("![Red](images/red.jpg)"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_code_cell("images/black.png"),  # type: ignore[no-untyped-call]
+        nbformat.v4.new_markdown_cell("No images")  # type: ignore[no-untyped-call]
+    ]
+    images_as_base64 = {
+        "images/black.png": "data:image/png;base64,QmxhY2s=",
+        "images/copy.png": "data:image/png;base64,QmxhY2s=",
+        "images/red.jpg": "data:image/webp;base64,UmVk"
+    }
+    updated_cells = attach_images_in_markdown(nb_cells, images_as_base64)
+    assert len(updated_cells[0].attachments) == 1
+    ((black_name, black_attachment), ) = updated_cells[0].attachments.items()
+    assert black_name.endswith(".png")
+    assert black_attachment == {"image/png": "QmxhY2s="}
+    assert updated_cells[0].source == (
+        f'![Black](attachment:{black_name}), ![Copy](attachment:{black_name}) and <img src="attachment:{black_name}">')
+    ((red_name, red_attachment), ) = updated_cells[1].attachments.items()
+    assert red_name.endswith(".webp")
+    assert red_attachment == {"image/webp": "UmVk"}
+    assert updated_cells[1].source == f"![Red](attachment:{red_name})"
+    assert updated_cells[2] is nb_cells[2]
+    assert updated_cells[3] is nb_cells[3]
+    assert "attachments" not in nb_cells[0]
+
+
+def test_replace_images_in_markdown_stage_use_attachments(root_directory: str) -> None:
+    """Test that the stage stores images as attachments, and that the updated notebook is valid."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "html_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "html_image.ipynb"))
+        black = os.path.join(tmp_root_directory, data_subdirectory, "images", "black.png")
+        shutil.copyfile(os.path.join(root_directory, data_subdirectory, "images", "black.png"), black)
+        replace_images_in_markdown_main(
+            tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"), use_attachments=True)
+        updated_nb = nbformat.read(  # type: ignore[no-untyped-call]
+            os.path.join(tmp_root_directory, data_subdirectory, "html_image.ipynb"), as_version=4)
+        nbformat.validate(updated_nb)
+        ((black_name, black_attachment), ) = updated_nb.cells[0].attachments.items()
+        assert f'<img src="attachment:{black_name}" alt="Black">' in updated_nb.cells[0].source
+        assert "data:image/png;base64," + black_attachment["image/png"] == image_to_base64(black)
+
+
+def test_replace_images_in_markdown_stage_referenced_images_only(root_directory: str) -> None:
+    """Test that the stage converts only images referenced in the markdown cells of matched notebooks."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb"))
+        for img_file in ("black.png", "blue.svg", "red.jpg"):
+            shutil.copyfile(
+                os.path.join(root_directory, data_subdirectory, "images", img_file),
+                os.path.join(tmp_root_directory, data_subdirectory, "images", img_file))
+        # An image which is not referenced by any notebook, and which would fail to convert
+        with open(os.path.join(tmp_root_directory, data_subdirectory, "images", "unused.svg"), "w") as f:
+            f.write("This is not an image")
+        stage = ReplaceImagesInMarkdownStage(tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"))
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        assert stage.images_png == {red: red.replace(".jpg", ".png")}
+        assert not os.path.isfile(os.path.join(tmp_root_directory, data_subdirectory, "images", "blue.png"))
+
+
+def test_replace_images_in_markdown_stage_nbformat_3(root_directory: str) -> None:
+    """Test that images referenced by notebooks stored in nbformat 3 are found as well."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        shutil.copyfile(os.path.join(root_directory, data_subdirectory, "images", "red.jpg"), red)
+        with open(os.path.join(tmp_root_directory, data_subdirectory, "markdown_image_v3.ipynb"), "w") as f:
+            json.dump({
+                "nbformat": 3, "nbformat_minor": 0, "metadata": {"name": ""},
+                "worksheets": [{
+                    "cells": [{"cell_type": "markdown", "metadata": {}, "source": ["![Red](images/red.jpg)"]}],
+                    "metadata": {}
+                }]
+            }, f)
+        stage = ReplaceImagesInMarkdownStage(tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"))
+        assert stage.images_png == {red: red.replace(".jpg", ".png")}
+
+
+def test_replace_images_in_markdown_stage_max_image_size(
+    root_directory: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the stage does not replace images larger than the maximum image size, and prints a warning."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+    images_directory = os.path.join(root_directory, data_subdirectory, "images")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb"))
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        shutil.copyfile(os.path.join(images_directory, "red.jpg"), red)
+        # Provide the black image as the result of the conversion of the red one, so that conversion is skipped
+        shutil.copyfile(os.path.join(images_directory, "black.png"), red.replace(".jpg", ".png"))
+        red_png_size = os.path.getsize(red.replace(".jpg", ".png"))
+        stage = ReplaceImagesInMarkdownStage(
+            tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"), max_image_size=red_png_size)
+        assert stage.images_png == {red: red.replace(".jpg", ".png")}
+        assert "Warning" not in capsys.readouterr().out
+        stage = ReplaceImagesInMarkdownStage(
+            tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"), max_image_size=red_png_size - 1)
+        assert stage.images_png == {}
+        assert (
+            f"Warning: {os.path.relpath(red, tmp_root_directory)} will not be replaced, since its size "
+            + f"({red_png_size} bytes) exceeds the maximum image size ({red_png_size - 1} bytes)"
+        ) in capsys.readouterr().out
+
+
+def test_replace_images_in_markdown_main_conversion_cache(
+    root_directory: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test replacement of images with images converted by a previous run."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+    images_directory = os.path.join(root_directory, data_subdirectory, "images")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory() as tmp_cache_directory
+    ):
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb"))
+        red = os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg")
+        shutil.copyfile(os.path.join(images_directory, "red.jpg"), red)
+        # Store the black image as the result of the conversion of the red one
+        image_converter = get_image_converter(".jpg")
+        assert image_converter is not None
+        cache = ConversionCache(tmp_cache_directory, CONVERSION_CACHE_SIZE)
+        cache.store(cache.key(red, image_converter.describe(".jpg")), os.path.join(images_directory, "black.png"))
+        cache.save()
+        replace_images_in_markdown_main(
+            tmp_root_directory, os.path.join(data_subdirectory, "*.ipynb"),
+            conversion_cache_directory=tmp_cache_directory)
+        assert "Image conversion cache: 1 hit(s), 0 miss(es)" in capsys.readouterr().out
+        with open(os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb")) as f:
+            assert image_to_base64(os.path.join(images_directory, "black.png")) in f.read()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_replace_images_in_markdown_main_unreadable_notebook(
+    root_directory: str, jobs: int, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a notebook which cannot be read is reported, without preventing to process the remaining ones."""
+    data_subdirectory = os.path.join("tests", "data", "replace_images_in_markdown")
+
+    with tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory:
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory, "images"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "markdown_image.ipynb"),
+            os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb"))
+        shutil.copyfile(
+            os.path.join(root_directory, data_subdirectory, "images", "red.jpg"),
+            os.path.join(tmp_root_directory, data_subdirectory, "images", "red.jpg"))
+        bad_nb_filename = os.path.join(tmp_root_directory, data_subdirectory, "bad.ipynb")
+        with open(bad_nb_filename, "w") as f:
+            f.write("This is not a notebook")
+        pattern = os.path.join(data_subdirectory, "*.ipynb")
+        with pytest.raises(RuntimeError) as excinfo:
+            replace_images_in_markdown_main(tmp_root_directory, pattern, jobs=jobs)
+        assert "Warning: images in " + os.path.relpath(bad_nb_filename, tmp_root_directory) in capsys.readouterr().out
+        assert "Processing failed for 1 notebook(s)" in str(excinfo.value)
+        assert bad_nb_filename in str(excinfo.value)
+        with open(os.path.join(tmp_root_directory, data_subdirectory, "markdown_image.ipynb")) as f:
+            assert "data:image/png;base64," in f.read()
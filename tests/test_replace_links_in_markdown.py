@@ -13,6 +13,7 @@ import typing
 import nbformat
 import pytest
 
+from open_in_cloud_workflow.drive_urls_cache import DriveURLsCache
 from open_in_cloud_workflow.publish_on import PublishOnArtifact, PublishOnBaseClass, PublishOnDrive, PublishOnGitHub
 from open_in_cloud_workflow.replace_links_in_markdown import (
     __main__ as replace_links_in_markdown_main, replace_links_in_markdown)
@@ -156,3 +157,46 @@ def test_replace_links_in_markdown_main(
                 "replace_links_in_markdown", nb_name, os.path.join(tmp_root_directory, "tests", "data"))
             assert updated_nb.cells[0].cell_type == "markdown"
             assert updated_nb.cells[0].source == expected[type(publisher)]
+
+
+def test_replace_links_in_markdown_main_drive_urls_cache(
+    root_directory: str, open_notebook: typing.Callable[[str, str, str], nbformat.NotebookNode],
+    capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test replacement of links with Google Drive URLs which were cached by a previous run."""
+    data_subdirectory = os.path.join("tests", "data", "replace_links_in_markdown")
+    pattern = os.path.join(data_subdirectory, "*.ipynb")
+
+    with (
+        tempfile.TemporaryDirectory(dir=root_directory) as tmp_root_directory,
+        tempfile.TemporaryDirectory() as tmp_cache_directory
+    ):
+        os.makedirs(os.path.join(tmp_root_directory, data_subdirectory))
+        cache = DriveURLsCache(os.path.join(tmp_cache_directory, "cache.json"), 60)
+        for (n, nb_filename) in enumerate(sorted(os.listdir(os.path.join(root_directory, data_subdirectory)))):
+            shutil.copyfile(
+                os.path.join(root_directory, data_subdirectory, nb_filename),
+                os.path.join(tmp_root_directory, data_subdirectory, nb_filename))
+            cache.set(
+                "GitHub/open_in_colab_workflow", os.path.join(data_subdirectory, nb_filename),
+                f"https://drive.google.com/open?id={n}")
+        cache.save()
+        replace_links_in_markdown_main(
+            tmp_root_directory, pattern, "colab", PublishOnDrive("GitHub/open_in_colab_workflow"),
+            drive_urls_cache_file=os.path.join(tmp_cache_directory, "cache.json"))
+        assert "Google Drive URLs cache: 5 hit(s), 0 miss(es)" in capsys.readouterr().out
+        updated_nb = open_notebook(
+            "replace_links_in_markdown", "markdown_link", os.path.join(tmp_root_directory, "tests", "data"))
+        assert updated_nb.cells[0].source == (
+            "[Link to the main notebook](https://colab.research.google.com/drive/3)")
+
+
+def test_replace_links_in_markdown_overlapping_paths() -> None:
+    """Test replacement of links whose local paths end with the same file name."""
+    nb_cells = [
+        nbformat.v4.new_markdown_cell(  # type: ignore[no-untyped-call]
+            "[Link](sub/a.ipynb), <a href='a.ipynb'>link</a> and <a href=\"sub/a.ipynb\">link</a>")
+    ]
+    updated_cells = replace_links_in_markdown(nb_cells, {"a.ipynb": "Cloud a", "sub/a.ipynb": "Cloud sub/a"})
+    assert updated_cells[0].source == (
+        "[Link](Cloud sub/a), <a href='Cloud a'>link</a> and <a href=\"Cloud sub/a\">link</a>")